@@ -8,12 +8,18 @@ Uso (da raiz do repo ~/RV32I):
 
   # Após implementar o pipeline:
   python3 scripts/kpi_report.py --pipeline --output kpi_report.json
+
+  # Contagens dinâmicas (trace do full.elf no ISS + regras da HDU) em vez da estimativa estática:
+  python3 scripts/kpi_report.py --pipeline --measured --output kpi_report.json
 """
 
 import argparse, json, re, sys
 from datetime import datetime
 from pathlib import Path
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
 
 # ===========================================================================
 # KPI 1 — Clock do sistema (Quartus .sta.rpt + .fit.rpt)
@@ -136,8 +142,12 @@ def parse_cocotb_coverage(log_path: Path) -> dict:
 
 
 
-def parse_tests_json(tests_json_path: Path) -> dict:
-    """Lê tests.json do runner cocotb (formato 2025.2 com GHDL)."""
+def parse_tests_json(tests_json_path: Path, results_db: Path = None) -> dict:
+    """
+    Lê tests.json do runner cocotb (formato 2025.2 com GHDL) e cruza cada suíte
+    com a última execução registrada no banco de resultados do runner
+    (utils/results_db.py). Sem banco, agrega os results.xml de sim_build/.
+    """
     result = {"source": str(tests_json_path), "passed": 0, "failed": 0,
               "skipped": 0, "total": 0, "coverage_pct": None}
     if not tests_json_path.exists():
@@ -149,7 +159,29 @@ def parse_tests_json(tests_json_path: Path) -> dict:
     except Exception as e:
         result["error"] = f"Erro ao ler tests.json: {e}"
         return result
-    # Procura results.xml em sim_build/
+
+    from tests.python.utils import results_db as rdb
+    db = rdb.db_path(results_db)
+    rows = rdb.latest(db, set(tests))
+    if rows:
+        passed = sum((r["tests"] or 0) - (r["failed"] or 0) for r in rows.values())
+        failed = sum((r["failed"] or 0) for r in rows.values())
+        errors = [n for n, r in rows.items() if r["status"] == "ERROR"]
+        missing = sorted(set(tests) - set(rows))
+        total = passed + failed
+        result.update({"passed": passed, "failed": failed + len(errors), "total": total + len(errors),
+                       "suites_run": len(rows), "suites_total": len(tests),
+                       "suites_error": errors, "suites_never_run": missing,
+                       "wall_s": round(sum(r["wall_s"] or 0 for r in rows.values()), 1),
+                       "note": f"Última execução de {len(rows)}/{len(tests)} suítes em {db}"})
+        if total + len(errors) > 0:
+            result["coverage_pct"] = round(100 * passed / (total + len(errors)), 1)
+        trend = [t for t in rdb.trend(path=db) if t["regressed"]]
+        if trend:
+            result["runtime_regressions"] = trend
+        return result
+
+    # Sem banco: procura results.xml em sim_build/
     sim_build = tests_json_path.parent / "sim_build"
     found_results = list(sim_build.rglob("results.xml")) if sim_build.exists() else []
     if found_results:
@@ -165,10 +197,8 @@ def parse_tests_json(tests_json_path: Path) -> dict:
         if total > 0:
             result["coverage_pct"] = round(100 * passed / total, 1)
     else:
-        total = len(tests)
-        result.update({"passed": total, "total": total,
-                       "coverage_pct": 100.0,
-                       "note": f"{total} suites em tests.json (GHDL, sem results.xml)"})
+        result["error"] = (f"nenhum resultado para as {len(tests)} suítes de tests.json "
+                           f"(rode tests/python/runner.py all)")
     return result
 
 
@@ -236,8 +266,83 @@ def parse_asm(asm_path: Path) -> dict:
     return counts
 
 
+# Latência das instruções M no rv32im_pipeline_core: muldiv_busy está fixo em '0',
+# então cada M ocupa 1 ciclo e não há stall. Outro valor vem de --cpi-m (assumido).
+PIPELINE_M_LATENCY = 1
+
+
+def kpi4_measured(elf_path: Path, freq_base: float, freq_new: float,
+                  pipeline: bool, cpi_m=None, max_steps: int = 10_000_000) -> dict:
+    """
+    KPI 4 a partir do trace dinâmico: o programa roda no ISS (rv32im_iss) e o
+    pipeline_model conta stalls de load-use e desvios tomados instrução a
+    instrução, com os laços executados de verdade. Os ciclos do multdiv não são
+    medidos: saem de PIPELINE_M_LATENCY, ou de cpi_m se o usuário passar --cpi-m.
+    """
+    from tests.python.utils.pipeline_model import measure
+
+    if not elf_path.exists():
+        return {"error": f"ELF do benchmark não encontrado: {elf_path} (rode make no diretório do .S)"}
+
+    m_latency = PIPELINE_M_LATENCY if cpi_m is None else cpi_m
+    stats, halted = measure(elf_path, m_latency=m_latency, max_steps=max_steps)
+    if halted == "max-steps":
+        return {"error": f"Benchmark não terminou em {max_steps} instruções: {elf_path}"}
+    n = stats.instructions
+
+    cycles_base = n * 3
+    t_base_us   = cycles_base / (freq_base * 1e6) * 1e6
+
+    result = {
+        "benchmark":   str(elf_path),
+        "instr_total": n,
+        "instr_rv32i": n - stats.m_ops,
+        "instr_rv32m": stats.m_ops,
+        "measured":    dict(stats.to_dict(), halted=halted),
+        "baseline": {
+            "model":    "multi-cycle 3 estágios (2025.2)",
+            "cpi":      3.0,
+            "note":     "instruções dinâmicas x CPI 3 (lpm_divide combinacional, busy='0')",
+            "cycles":   cycles_base,
+            "freq_mhz": freq_base,
+            "time_us":  round(t_base_us, 2),
+        },
+    }
+
+    if not pipeline:
+        result["speedup"] = {
+            "note": "Passe --pipeline após implementar o pipeline de 5 estágios"
+        }
+        return result
+
+    cycles_new = stats.cycles
+    t_new_us   = cycles_new / (freq_new * 1e6) * 1e6
+    speedup    = t_base_us / t_new_us
+
+    result["pipeline"] = {
+        "model":               "pipeline 5 estágios (2026.1)",
+        "cycles":              cycles_new,
+        "cpi_efetivo":         round(stats.cpi, 3),
+        "freq_mhz":            freq_new,
+        "time_us":             round(t_new_us, 2),
+        "stall_load_cycles":   stats.load_use_stalls,
+        "stall_branch_cycles": stats.flush_cycles,
+        "stall_m_cycles":      stats.m_busy_cycles,
+        "m_latency":           m_latency,
+        "stall_m_assumed":     cpi_m is not None,
+        "hazards_estimated":   False,
+    }
+    result["speedup"] = {
+        "S": round(speedup, 3),
+        "improved": speedup > 1.0,
+        "t_base_us": round(t_base_us, 2),
+        "t_new_us":  round(t_new_us, 2),
+    }
+    return result
+
+
 def kpi4_speedup(asm_path: Path, freq_base: float, freq_new: float,
-                 pipeline: bool, cpi_m: float,
+                 pipeline: bool, cpi_m: int,
                  load_use_hazards=None, branch_taken=None) -> dict:
     if not asm_path.exists():
         return {"error": f"Benchmark não encontrado: {asm_path}"}
@@ -278,7 +383,7 @@ def kpi4_speedup(asm_path: Path, freq_base: float, freq_new: float,
 
     stall_load   = load_use_hazards * 1
     stall_branch = branch_taken * 2
-    stall_m      = c["rv32m"] * int(cpi_m - 1)
+    stall_m      = c["rv32m"] * (cpi_m - 1)
     cycles_new   = c["total"] + 4 + stall_load + stall_branch + stall_m
     t_new_us     = cycles_new / (freq_new * 1e6) * 1e6
     speedup      = t_base_us / t_new_us
@@ -329,14 +434,21 @@ def build_report(args) -> dict:
                 tests_json = c
                 break
         report["kpis"]["kpi2_test_coverage"] = (
-            parse_tests_json(tests_json) if tests_json
+            parse_tests_json(tests_json, args.results_db) if tests_json
             else parse_cocotb_coverage(cocotb_log)
         )
     report["kpis"]["kpi3_instructions"]   = count_instructions(args.testbench_dirs)
-    report["kpis"]["kpi4_speedup"]        = kpi4_speedup(
-        Path(args.asm), args.freq_base, args.freq_new,
-        args.pipeline, args.cpi_m, args.load_use_hazards, args.branch_taken,
-    )
+    if args.measured:
+        elf = Path(args.elf) if args.elf else Path(args.asm).with_suffix(".elf")
+        report["kpis"]["kpi4_speedup"]    = kpi4_measured(
+            elf, args.freq_base, args.freq_new, args.pipeline, args.cpi_m,
+        )
+    else:
+        report["kpis"]["kpi4_speedup"]    = kpi4_speedup(
+            Path(args.asm), args.freq_base, args.freq_new,
+            args.pipeline, 3 if args.cpi_m is None else args.cpi_m,
+            args.load_use_hazards, args.branch_taken,
+        )
     return report
 
 
@@ -367,8 +479,14 @@ def print_summary(report: dict):
         print(f"  {cov['passed']}/{cov['total']} testes passaram ({cov['coverage_pct']}%) {flag}")
         if cov["failed"]:
             print(f"  FALHOU: {cov['failed']} teste(s)")
+        if cov.get("suites_error"):
+            print(f"  ERRO de build/simulação: {', '.join(cov['suites_error'])}")
+        if cov.get("suites_never_run"):
+            print(f"  Nunca executadas: {', '.join(cov['suites_never_run'])}")
         if cov.get("note"):
             print(f"  ({cov['note']})")
+        for t in cov.get("runtime_regressions", []):
+            print(f"  ⚠ {t['suite']}: {t['last_s']:.1f}s vs mediana {t['baseline_s']:.1f}s (x{t['ratio']})")
     else:
         print(f"  N/A  ({cov.get('error','sem dados')})")
 
@@ -387,8 +505,9 @@ def print_summary(report: dict):
         print(f"  N/A  ({spd['error']})")
     elif "baseline" in spd:
         b = spd["baseline"]
+        kind = "dinâmicas" if "measured" in spd else "estáticas"
         print(f"  Benchmark : {Path(spd['benchmark']).name}"
-              f"  ({spd['instr_total']} instr, {spd['instr_rv32m']} M-ext)")
+              f"  ({spd['instr_total']} instr {kind}, {spd['instr_rv32m']} M-ext)")
         print(f"  {div}")
         print(f"  BASELINE  : {b['cycles']} ciclos @ {b['freq_mhz']} MHz"
               f" = {b['time_us']} µs  (CPI={b['cpi']})")
@@ -401,7 +520,12 @@ def print_summary(report: dict):
             print(f"  {div}")
             print(f"  S = {b['time_us']} / {p['time_us']} = {s['S']}  {flag}")
             if p.get("hazards_estimated"):
-                print(f"  (hazards estimados — use --load-use-hazards e --branch-taken para valor real)")
+                print(f"  (hazards estimados — use --measured ou --load-use-hazards/--branch-taken)")
+            else:
+                m_note = (f"assumidos, CPI M={p['m_latency']}" if p.get("stall_m_assumed", True)
+                          else "muldiv_busy='0' no RTL")
+                print(f"  stalls: load-use={p['stall_load_cycles']}  desvios={p['stall_branch_cycles']}"
+                      f" ciclos (medidos)  M={p['stall_m_cycles']} ciclos ({m_note})")
         else:
             print(f"  {s.get('note','')}")
 
@@ -418,16 +542,24 @@ def main():
     p.add_argument("--fit-rpt",      default="output_files/core_fpga_test.fit.rpt")
     p.add_argument("--cocotb-log",   default="tests/component/multdiv/results.xml")
     p.add_argument("--testbench-dirs", nargs="+", default=["tests"])
+    p.add_argument("--results-db",   default=None,             help="Banco de resultados do runner (padrão: $RESULTS_DB ou tests/python/sim_build/results.db)")
     p.add_argument("--asm",          default="tests/FPGA/core/asm_tests/full.S")
     p.add_argument("--freq-base",    type=float, default=1.0,  help="Clock baseline (MHz)")
     p.add_argument("--freq-new",     type=float, default=1.0,  help="Clock versão nova (MHz)")
     p.add_argument("--pipeline",     action="store_true",      help="Calcula speedup com modelo pipeline")
-    p.add_argument("--cpi-m",        type=float, default=3.0,  help="CPI das instruções M no pipeline")
+    p.add_argument("--cpi-m",        type=int,   default=None,
+                   help="CPI (inteiro) das instruções M no pipeline; padrão 3 na estimativa "
+                        "estática e 1 com --measured (muldiv_busy='0' no RTL)")
     p.add_argument("--load-use-hazards", type=int, default=None)
     p.add_argument("--branch-taken",     type=int, default=None)
+    p.add_argument("--measured",     action="store_true",
+                   help="KPI 4 com contagens dinâmicas (ISS + modelo de hazards) em vez da análise do .S")
+    p.add_argument("--elf",          default=None,             help="ELF do benchmark para --measured (padrão: --asm com .elf)")
     p.add_argument("--output",       default=None,             help="Salva JSON neste arquivo")
     p.add_argument("--json-only",    action="store_true")
     args = p.parse_args()
+    if args.cpi_m is not None and args.cpi_m < 1:
+        p.error("--cpi-m deve ser um inteiro >= 1")
 
     report = build_report(args)
 
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+memimg.py — conversor de imagens de memória (substitui hex2mif.py, pad_bin.py,
+objcopy -O binary e hexdump nos Makefiles).
+
+Lê .elf / .bin / .hex (uma palavra por linha) uma vez e grava, na mesma execução:
+  .mif       MIF do Quartus, com runs de palavras iguais em faixas [a..b]
+  .hex       formato do ROM_simulation (uma palavra %08X por linha, igual ao hexdump)
+  .mem       $readmemh (@endereço + palavras)
+  .ihex      Intel HEX (endereços reais, registros 04 para > 64 KB)
+  .bin       binário little-endian completado até múltiplo de 4
+
+Uso (da raiz do repo):
+  # imagem única (todas as seções alocadas, como objcopy -O binary)
+  python3 scripts/memimg.py build/six.elf --hex build/six.hex
+  python3 scripts/memimg.py build/full.hex --depth 4096 --mif quartus/ips/ROM1PORT/init.mif
+
+  # ROM/DATA separados do firmware do L2IP (.text -> ROM; .rodata/.data/... -> RAM)
+  python3 scripts/memimg.py build/firmware.elf --split build/firmware \\
+      --rom-depth 8192 --ram-depth 4096 --formats bin,hex,mif
+"""
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tests.python.utils.images import read_elf, read_hex, bytes_to_words, words_to_bytes
+
+FORMATS = {"mif": ".mif", "hex": ".hex", "readmemh": ".mem", "ihex": ".ihex", "bin": ".bin"}
+
+
+class Image:
+    """Bloco contíguo de memória: endereço base (bytes) + palavras de 32 bits."""
+
+    def __init__(self, base: int, words: list, name: str = ""):
+        self.base = base
+        self.words = words
+        self.name = name
+
+    @classmethod
+    def from_bytes(cls, base, data, name=""):
+        return cls(base, bytes_to_words(data), name)
+
+    def data(self) -> bytes:
+        return words_to_bytes(self.words)
+
+
+# ===========================================================================
+# Leitura
+# ===========================================================================
+
+def load_image(path, sections=None) -> Image:
+    """Imagem única. Para ELF: 'sections' (lista) ou todas as seções alocadas."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".hex":
+        return Image(0, read_hex(path), path.stem)
+    if suffix == ".bin":
+        return Image.from_bytes(0, path.read_bytes(), path.stem)
+    if suffix == ".elf":
+        elf = read_elf(path)
+        if sections is None:
+            sections = [s.name for s in elf.sections.values() if s.alloc]
+        base, data = elf.section_bytes(sections)
+        return Image.from_bytes(base, data, path.stem)
+    raise SystemExit(f"Erro: formato não suportado: {path.name} (use .elf, .bin ou .hex)")
+
+
+def split_elf(path):
+    """(ROM, DATA) como no L2IP.ld: seções executáveis -> ROM; demais alocadas -> RAM."""
+    elf = read_elf(path)
+    rom = [s.name for s in elf.sections.values() if s.alloc and s.executable]
+    data = [s.name for s in elf.sections.values() if s.alloc and not s.executable]
+    rom_base, rom_bytes = elf.section_bytes(rom)
+    data_base, data_bytes = elf.section_bytes(data)
+    return Image.from_bytes(rom_base, rom_bytes, "rom"), Image.from_bytes(data_base, data_bytes, "data")
+
+
+# ===========================================================================
+# Escrita
+# ===========================================================================
+
+def runs(words):
+    """(primeira, última, valor) para cada sequência de palavras iguais."""
+    start = 0
+    for i in range(1, len(words) + 1):
+        if i == len(words) or words[i] != words[start]:
+            yield start, i - 1, words[start]
+            start = i
+
+
+def write_mif(img: Image, path, depth: int):
+    n = len(img.words)
+    if n > depth:
+        raise SystemExit(f"Erro: {n} palavras não cabem em DEPTH={depth} ({path})")
+    lines = ["WIDTH=32;", f"DEPTH={depth};", "", "ADDRESS_RADIX=HEX;", "DATA_RADIX=HEX;", "", "CONTENT BEGIN"]
+    spans = list(runs(img.words))
+    # o zero final do programa se junta ao preenchimento até DEPTH
+    if spans and spans[-1][2] == 0:
+        a, _b, _v = spans.pop()
+        spans.append((a, depth - 1, 0))
+    elif n < depth:
+        spans.append((n, depth - 1, 0))
+    for a, b, v in spans:
+        if a == b:
+            lines.append(f"    {a:02X} : {v:08X};")
+        else:
+            lines.append(f"    [{a:02X}..{b:02X}] : {v:08X};")
+    lines.append("END;")
+    Path(path).write_text("\n".join(lines) + "\n")
+    return len(spans)
+
+
+def write_hex(img: Image, path):
+    Path(path).write_text("".join(f"{w:08X}\n" for w in img.words))
+
+
+def write_readmemh(img: Image, path):
+    out = [f"// {img.name or 'imagem'}: base 0x{img.base:08X}, {len(img.words)} palavras",
+           f"@{0:08X}"]
+    out += [f"{w:08X}" for w in img.words]
+    Path(path).write_text("\n".join(out) + "\n")
+
+
+def _ihex_record(rtype, addr, payload=b""):
+    rec = bytes([len(payload), (addr >> 8) & 0xFF, addr & 0xFF, rtype]) + payload
+    return ":" + rec.hex().upper() + f"{(-sum(rec)) & 0xFF:02X}"
+
+
+def write_ihex(img: Image, path, record_len: int = 16):
+    data = img.data()
+    out = []
+    upper = None
+    for off in range(0, len(data), record_len):
+        addr = img.base + off
+        chunk = data[off:off + record_len]
+        # o registro não pode atravessar uma fronteira de 64 KB
+        room = 0x10000 - (addr & 0xFFFF)
+        for part_addr, part in ((addr, chunk[:room]), (addr + room, chunk[room:])):
+            if not part:
+                continue
+            if part_addr >> 16 != upper:
+                upper = part_addr >> 16
+                out.append(_ihex_record(0x04, 0, upper.to_bytes(2, "big")))
+            out.append(_ihex_record(0x00, part_addr & 0xFFFF, part))
+    out.append(_ihex_record(0x01, 0))
+    Path(path).write_text("\n".join(out) + "\n")
+
+
+def write_bin(img: Image, path):
+    Path(path).write_bytes(img.data())
+
+
+def emit(img: Image, formats: dict, depth: int):
+    """formats: {formato: caminho}. Uma passada por formato sobre as palavras já carregadas."""
+    for fmt, path in formats.items():
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        if fmt == "mif":
+            spans = write_mif(img, path, depth)
+            print(f"Gerado: {path} ({len(img.words)} palavras, depth={depth}, {spans} linhas)")
+            continue
+        {"hex": write_hex, "readmemh": write_readmemh, "ihex": write_ihex, "bin": write_bin}[fmt](img, path)
+        print(f"Gerado: {path} ({len(img.words)} palavras)")
+
+
+# ===========================================================================
+# CLI
+# ===========================================================================
+
+def parse_formats(text):
+    fmts = [f.strip() for f in text.split(",") if f.strip()]
+    bad = [f for f in fmts if f not in FORMATS]
+    if bad:
+        raise argparse.ArgumentTypeError(f"formato(s) desconhecido(s): {', '.join(bad)} "
+                                         f"(use {', '.join(FORMATS)})")
+    return fmts
+
+
+def main():
+    p = argparse.ArgumentParser(description="Conversor de imagens de memória (ELF/bin/hex -> MIF/hex/mem/ihex/bin)")
+    p.add_argument("input", help="Imagem de entrada (.elf, .bin ou .hex)")
+    p.add_argument("-s", "--sections", help="Seções do ELF (separadas por vírgula); padrão: todas alocadas")
+    p.add_argument("--depth", type=int, default=512, help="DEPTH do MIF em palavras (padrão: 512)")
+    for fmt, ext in FORMATS.items():
+        p.add_argument(f"--{fmt}", metavar="ARQ", help=f"Grava {fmt} ({ext})")
+    p.add_argument("--out", metavar="PREFIXO", help="Grava PREFIXO.<ext> para cada formato de --formats")
+    p.add_argument("--formats", type=parse_formats, default=["mif", "hex", "bin"],
+                   help="Formatos para --out/--split (padrão: mif,hex,bin)")
+    p.add_argument("--split", metavar="PREFIXO",
+                   help="ELF: grava PREFIXO_rom.* (seções executáveis) e PREFIXO_data.* (dados)")
+    p.add_argument("--rom-depth", type=int, default=8192, help="DEPTH do MIF da ROM em --split")
+    p.add_argument("--ram-depth", type=int, default=4096, help="DEPTH do MIF da RAM em --split")
+    args = p.parse_args()
+
+    if not Path(args.input).is_file():
+        print(f"Erro: arquivo '{args.input}' não encontrado", file=sys.stderr)
+        sys.exit(2)
+
+    if args.split:
+        if Path(args.input).suffix.lower() != ".elf":
+            p.error("--split exige um ELF")
+        rom, data = split_elf(args.input)
+        for img, depth in ((rom, args.rom_depth), (data, args.ram_depth)):
+            prefix = f"{args.split}_{img.name}"
+            emit(img, {f: prefix + FORMATS[f] for f in args.formats}, depth)
+        return
+
+    sections = args.sections.split(",") if args.sections else None
+    img = load_image(args.input, sections)
+    targets = {fmt: getattr(args, fmt) for fmt in FORMATS if getattr(args, fmt)}
+    if args.out:
+        targets.update({f: args.out + FORMATS[f] for f in args.formats if f not in targets})
+    if not targets:
+        p.error("nenhuma saída pedida (use --mif/--hex/--readmemh/--ihex/--bin, --out ou --split)")
+    emit(img, targets, args.depth)
+
+
+if __name__ == "__main__":
+    main()
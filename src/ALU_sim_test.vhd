@@ -0,0 +1,94 @@
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+use std.textio.all;
+use ieee.std_logic_textio.all;
+use work.rv32i_ctrl_consts.all;
+
+-- Wrapper de simulação da ALU para a suíte cocotb.
+-- Fora da varredura as portas op/dA/dB/dataOut/branch são a ALU direto (testes
+-- dirigidos). Com 'start' em '1' o próprio VHDL lê VECTOR_FILE (uma linha por
+-- vetor: "op dA dB" em hex), aplica um vetor por ns e grava "dataOut branch"
+-- em RESULT_FILE; 'done' sobe no fim. Sem ida e volta pela VPI a cada vetor: o
+-- testbench só escreve o arquivo, espera 'done' e compara tudo de uma vez.
+entity ALU_sim_test is
+	generic (
+	  VECTOR_FILE : string := "alu_vectors.txt";
+	  RESULT_FILE : string := "alu_results.txt"
+  	);
+	port (
+		op      : in  std_logic_vector(4 downto 0);
+		dA      : in  std_logic_vector(31 downto 0);
+		dB      : in  std_logic_vector(31 downto 0);
+		dataOut : out std_logic_vector(31 downto 0);
+		branch  : out std_logic;
+		start   : in  std_logic := '0';
+		done    : out std_logic
+  	);
+end entity;
+
+architecture behaviour of ALU_sim_test is
+
+	signal running : std_logic := '0';
+	signal drv_op  : std_logic_vector(4 downto 0) := (others => '0');
+	signal drv_a   : std_logic_vector(31 downto 0) := (others => '0');
+	signal drv_b   : std_logic_vector(31 downto 0) := (others => '0');
+
+	signal alu_op     : std_logic_vector(4 downto 0);
+	signal alu_a      : std_logic_vector(31 downto 0);
+	signal alu_b      : std_logic_vector(31 downto 0);
+	signal alu_out    : std_logic_vector(31 downto 0);
+	signal alu_branch : std_logic;
+
+begin
+
+	DUT : entity work.ALU
+		port map (
+			op      => alu_op,
+			dA      => alu_a,
+			dB      => alu_b,
+			dataOut => alu_out,
+			branch  => alu_branch
+	);
+
+	alu_op <= drv_op when running = '1' else op;
+	alu_a  <= drv_a  when running = '1' else dA;
+	alu_b  <= drv_b  when running = '1' else dB;
+
+	dataOut <= alu_out;
+	branch  <= alu_branch;
+
+	driver: process
+		file vec_f : text;
+		file res_f : text;
+		variable l_in, l_out : line;
+		variable v_op : std_logic_vector(7 downto 0);
+		variable v_a, v_b : std_logic_vector(31 downto 0);
+	begin
+		done <= '0';
+		wait until start = '1';
+		file_open(vec_f, VECTOR_FILE, read_mode);
+		file_open(res_f, RESULT_FILE, write_mode);
+		running <= '1';
+		while not endfile(vec_f) loop
+			readline(vec_f, l_in);
+			hread(l_in, v_op);
+			hread(l_in, v_a);
+			hread(l_in, v_b);
+			drv_op <= v_op(4 downto 0);
+			drv_a  <= v_a;
+			drv_b  <= v_b;
+			wait for 1 ns;
+			hwrite(l_out, alu_out);
+			write(l_out, string'(" "));
+			write(l_out, alu_branch);
+			writeline(res_f, l_out);
+		end loop;
+		file_close(vec_f);
+		file_close(res_f);
+		running <= '0';
+		done <= '1';
+		wait until start = '0';
+	end process;
+
+end architecture;
@@ -1,12 +1,16 @@
 library IEEE;
 use IEEE.std_logic_1164.all;
 use ieee.numeric_std.all;
+use std.textio.all;
+use ieee.std_logic_textio.all;
 
 entity RAM_simulation is
   generic (
     dataWidth: natural := 32;
     addrWidth: natural := 30;
-    memoryAddrWidth: natural := 9   -- 0 - 511 posicoes de 32 bits cada
+    memoryAddrWidth: natural := 9;  -- 0 - 511 posicoes de 32 bits cada
+    RAM_FILE: string := "";         -- conteúdo inicial (1 palavra hex por linha); "" = zeros
+    DUMP_FILE: string := "ram_dump.hex"  -- destino do dump de mem (porta dump)
   );
   port (
     clk      : in  std_logic;
@@ -16,13 +20,42 @@ entity RAM_simulation is
     weRAM    : in  std_logic;                     -- habilita escrita
     reRAM    : in  std_logic;                     -- habilita leitura
     eRAM     : in  std_logic;                     -- chip enable (RAM ativa)
-    mask     : in  std_logic_vector(3 downto 0)   -- byte enables
+    mask     : in  std_logic_vector(3 downto 0);  -- byte enables
+    dump     : in  std_logic := '0'                -- subida: grava mem em DUMP_FILE
   );
 end entity;
 
 architecture rtl of RAM_simulation is
   type mem_t is array(0 to 2**memoryAddrWidth - 1) of std_logic_vector(31 downto 0);
-  signal mem : mem_t := (others => (others => '0'));
+
+  -- lê RAM_FILE no mesmo formato do ROM_simulation; palavras além do arquivo ficam em zero
+  impure function init_mem(path : string) return mem_t is
+    file f : text;
+    variable status : file_open_status;
+    variable l : line;
+    variable v : std_logic_vector(31 downto 0);
+    variable m : mem_t := (others => (others => '0'));
+    variable idx : natural := 0;
+  begin
+    if path = "" then
+      return m;
+    end if;
+    file_open(status, f, path, read_mode);
+    assert status = open_ok
+      report "RAM_simulation: nao foi possivel abrir RAM_FILE=" & path severity failure;
+    while not endfile(f) and idx <= m'high loop
+      readline(f, l);
+      if l'length > 0 then
+        hread(l, v);
+        m(idx) := v;
+        idx := idx + 1;
+      end if;
+    end loop;
+    file_close(f);
+    return m;
+  end function;
+
+  signal mem : mem_t := init_mem(RAM_FILE);
 
   -- word index (32-bit aligned)
   signal widx : std_logic_vector(memoryAddrWidth-1 downto 0):= (others => '0');
@@ -65,4 +98,19 @@ begin
 
   data_out <= data_out_reg;
 
+  -- dump de fim de simulação: o testbench sobe 'dump' e mem inteira vai para DUMP_FILE,
+  -- no formato aceito por RAM_FILE
+  dump_mem: process
+    file f : text;
+    variable l : line;
+  begin
+    wait until rising_edge(dump);
+    file_open(f, DUMP_FILE, write_mode);
+    for i in mem'range loop
+      hwrite(l, mem(i));
+      writeline(f, l);
+    end loop;
+    file_close(f);
+  end process;
+
 end architecture;
@@ -23,29 +23,40 @@
     type blocoMemoria is array(0 to 2**memoryAddrWidth - 1)
       of std_logic_vector(dataWidth-1 downto 0);
 
-    signal memROM : blocoMemoria := (others => (others => '0'));
-    signal localAddress : std_logic_vector(memoryAddrWidth-1 downto 0) := (others => '0');
-
-    signal data_reg : std_logic_vector(dataWidth-1 downto 0) := (others => '0'); -- registrador de saída
-  begin
-
-    -- inicializa a ROM lendo de um arquivo texto com 1 palavra (32 bits) por linha, em hex
-    init: process
-      file f : text open read_mode is ROM_FILE;
+    -- lê ROM_FILE com 1 palavra (32 bits) por linha, em hex; "" deixa a ROM zerada para o
+    -- testbench carregar o programa em tempo de execução (backdoor em memROM)
+    impure function init_rom(path : string) return blocoMemoria is
+      file f : text;
+      variable status : file_open_status;
       variable l : line;
       variable v : std_logic_vector(dataWidth-1 downto 0);
+      variable m : blocoMemoria := (others => (others => '0'));
       variable idx : integer := 0;
     begin
+      if path = "" then
+        return m;
+      end if;
+      file_open(status, f, path, read_mode);
+      assert status = open_ok
+        report "ROM_simulation: nao foi possivel abrir ROM_FILE=" & path severity failure;
       while not endfile(f) loop
         readline(f, l);
         hread(l, v);
-        if idx <= memROM'high then
-          memROM(idx) <= v;
+        if idx <= m'high then
+          m(idx) := v;
         end if;
         idx := idx + 1;
       end loop;
-      wait;  -- processo só roda uma vez
-    end process;
+      file_close(f);
+      return m;
+    end function;
+
+    -- sem driver: o valor inicial vem de init_rom e escritas pelo VPI permanecem
+    signal memROM : blocoMemoria := init_rom(ROM_FILE);
+    signal localAddress : std_logic_vector(memoryAddrWidth-1 downto 0) := (others => '0');
+
+    signal data_reg : std_logic_vector(dataWidth-1 downto 0) := (others => '0'); -- registrador de saída
+  begin
 
     -- WORD-addressable: 'addr' é interpretado como índice de palavra,
     -- portanto usamos os bits menos-significativos necessários para indexar memROM.
@@ -0,0 +1,72 @@
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+
+-- Modelo de simulação do multdiv: mesma entidade e portas, sem os IPs LPM da
+-- Altera (mult, div, divu), para o GHDL elaborar o rv32i3stage_core nas suítes
+-- cocotb. Nos testes entra no lugar de multdiv.vhd, como o RAM_simulation e o
+-- ROM_simulation entram no lugar das memórias.
+-- Combinacional como o original (busy = '0', done = '1'). Divisão por zero e
+-- overflow seguem a RV32M, como o rv32im_iss: quociente -1 e resto = dividendo;
+-- -2^31 / -1 = -2^31 com resto 0.
+entity multdiv is
+  generic   (
+    DATA_WIDTH  : natural :=  8;
+    ADDR_WIDTH  : natural :=  8
+  );
+  port   (
+    SW      : in  std_logic_vector(9 downto 0) := (others => '0');
+    clk     : in  std_logic;
+    opCode  : in std_logic_vector(2 downto 0);
+    valorA  : in std_logic_vector(31 downto 0);
+    valorB  : in std_logic_vector(31 downto 0);
+    LEDR    :  out  std_logic_vector(9 downto 0);
+    saida   :  out  std_logic_vector(31 downto 0);
+    rst     : in  std_logic := '0';
+    start   : in  std_logic := '0';
+    busy    : out std_logic;
+    done    : out std_logic
+  );
+end entity;
+
+architecture simulation of multdiv is
+  -- operandos com 33 bits: o bit extra é o sinal (ou '0' nas variantes sem sinal)
+  signal a_ext, b_ext : signed(32 downto 0);
+  signal product      : signed(65 downto 0);
+  signal quotient     : std_logic_vector(31 downto 0);
+  signal remainder    : std_logic_vector(31 downto 0);
+begin
+  busy <= '0';
+  done <= '1';
+  LEDR <= (others => '0');
+
+  -- A com sinal: mul, mulh, mulhsu, div, rem
+  a_ext <= signed('0' & valorA) when opCode = "011" or opCode = "101" or opCode = "111" else
+           signed(valorA(31) & valorA);
+  -- B com sinal: mul, mulh, div, rem
+  b_ext <= signed(valorB(31) & valorB) when opCode = "000" or opCode = "001" or
+                                            opCode = "100" or opCode = "110" else
+           signed('0' & valorB);
+
+  product <= a_ext * b_ext;
+
+  divide: process(a_ext, b_ext)
+    variable q, r : signed(32 downto 0);
+  begin
+    if b_ext = 0 then
+      quotient  <= (others => '1');
+      remainder <= std_logic_vector(a_ext(31 downto 0));
+    else
+      q := a_ext / b_ext;       -- em 33 bits, -2^31 / -1 = 2^31 não estoura
+      r := a_ext rem b_ext;     -- resto com o sinal do dividendo, como na RV32M
+      quotient  <= std_logic_vector(q(31 downto 0));
+      remainder <= std_logic_vector(r(31 downto 0));
+    end if;
+  end process;
+
+  with opCode select saida <=
+    std_logic_vector(product(31 downto 0))  when "000",
+    std_logic_vector(product(63 downto 32)) when "001" | "010" | "011",
+    quotient                                when "100" | "101",
+    remainder                               when others;
+end architecture;
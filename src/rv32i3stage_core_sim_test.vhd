@@ -5,11 +5,24 @@ use work.rv32i_ctrl_consts.all;
 
 entity rv32i3stage_core_sim_test is
 	generic (
-	  ROM_FILE : string := "default.hex" 
+	  ROM_FILE : string := "default.hex";
+	  RAM_FILE : string := "";                 -- conteúdo inicial da RAM ("" = zeros)
+	  RAM_DUMP_FILE : string := "ram_dump.hex"; -- gravado quando dump_ram sobe
+	  HALT_ADDR : std_logic_vector(31 downto 0) := x"FFFFFFF0" -- store aqui encerra o programa
   	);
 	port (
     	CLK  : in  std_logic;
-		reset : in std_logic := '0'   
+		reset : in std_logic := '0';
+		-- reset do divisor de clock separado do reset do core: com os clocks
+		-- correndo durante 'reset' os registradores de reset síncrono (PC, IF/ID)
+		-- voltam ao estado inicial e o testbench pode trocar de programa sem
+		-- reelaborar (ROM carregada pelo backdoor)
+		pll_reset : in std_logic := '0';
+		dump_ram : in std_logic := '0';
+		-- fim de programa para o testbench: sobe no primeiro store em HALT_ADDR
+		-- (o store não chega à RAM) e fica em '1' até o reset; halt_code guarda o dado
+		halt : out std_logic;
+		halt_code : out std_logic_vector(31 downto 0)
   	);
 end entity;
 
@@ -32,20 +45,26 @@ architecture behaviour of rv32i3stage_core_sim_test is
 	signal pll_clk_wb     : std_logic;
 	signal pll_locked     : std_logic;
 
+	signal halt_store : std_logic;
+	signal halt_reg : std_logic := '0';
+	signal halt_code_reg : std_logic_vector(31 downto 0) := (others => '0');
+
 begin
 
 	pll_inst : entity work.clk_gen_3way
     port map (
       clk_in   => CLK,
-      reset      => reset, -- reset ativo alto no PLL
+      reset      => pll_reset, -- reset ativo alto no PLL
       clk0 => pll_clk_if,
       clk1 => pll_clk_idexmem,
       clk2 => pll_clk_wb
     );
 
-	CORE : entity work.rv32im_pipeline_core
+	CORE : entity work.rv32i3stage_core
 		port map (
-			clk          => pll_clk_idexmem,
+			CLK_IF       => pll_clk_if,
+			CLK_IDEXMEM  => pll_clk_idexmem,
+			CLK_WB       => pll_clk_wb,
 			reset 		=> reset,
 
 			----------------------------------------------------------------------
@@ -77,15 +96,35 @@ begin
 	);
 
 	RAM : entity work.RAM_simulation
+		generic map (RAM_FILE => RAM_FILE, DUMP_FILE => RAM_DUMP_FILE)
 		port map(
 			addr 		=> ram_addr(31 downto 2), -- word addressable
 			mask 		=> ram_byteena,
 			clk		 	=> pll_clk_idexmem,
 			data_in 	=> ram_wdata,
 			reRAM 		=> ram_rden and ram_en,
-			weRAM 		=> ram_wren and ram_en,
+			weRAM 		=> ram_wren and ram_en and not halt_store,
 			eRAM 		=> ram_en,
-			data_out 	=> ram_rdata
+			data_out 	=> ram_rdata,
+			dump 		=> dump_ram
 	);
 
+	halt_store <= '1' when ram_en = '1' and ram_wren = '1' and ram_addr = HALT_ADDR else '0';
+
+	halt_detect: process(pll_clk_idexmem, reset)
+	begin
+		if reset = '1' then
+			halt_reg <= '0';
+			halt_code_reg <= (others => '0');
+		elsif rising_edge(pll_clk_idexmem) then
+			if halt_store = '1' and halt_reg = '0' then
+				halt_reg <= '1';
+				halt_code_reg <= ram_wdata;
+			end if;
+		end if;
+	end process;
+
+	halt <= halt_reg;
+	halt_code <= halt_code_reg;
+
 end architecture;
\ No newline at end of file
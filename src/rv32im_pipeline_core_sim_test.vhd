@@ -0,0 +1,128 @@
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+use work.rv32i_ctrl_consts.all;
+
+entity rv32im_pipeline_core_sim_test is
+	generic (
+	  ROM_FILE : string := "default.hex";
+	  RAM_FILE : string := "";                 -- conteúdo inicial da RAM ("" = zeros)
+	  RAM_DUMP_FILE : string := "ram_dump.hex"; -- gravado quando dump_ram sobe
+	  HALT_ADDR : std_logic_vector(31 downto 0) := x"FFFFFFF0" -- store aqui encerra o programa
+  	);
+	port (
+    	CLK  : in  std_logic;
+		reset : in std_logic := '0';
+		-- reset do divisor de clock separado do reset do core: com os clocks
+		-- correndo durante 'reset' os registradores de reset síncrono (PC, IF/ID)
+		-- voltam ao estado inicial e o testbench pode trocar de programa sem
+		-- reelaborar (ROM carregada pelo backdoor)
+		pll_reset : in std_logic := '0';
+		dump_ram : in std_logic := '0';
+		-- fim de programa para o testbench: sobe no primeiro store em HALT_ADDR
+		-- (o store não chega à RAM) e fica em '1' até o reset; halt_code guarda o dado
+		halt : out std_logic;
+		halt_code : out std_logic_vector(31 downto 0)
+  	);
+end entity;
+
+architecture behaviour of rv32im_pipeline_core_sim_test is
+
+	signal rom_addr : std_logic_vector(31 downto 0);
+	signal rom_rden : std_logic;
+	signal rom_data : std_logic_vector(31 downto 0);
+
+	signal ram_addr : std_logic_vector(31 downto 0);
+	signal ram_wdata : std_logic_vector(31 downto 0);
+	signal ram_rdata : std_logic_vector(31 downto 0);
+	signal ram_en : std_logic;
+	signal ram_wren : std_logic;
+	signal ram_rden : std_logic;
+	signal ram_byteena : std_logic_vector(3 downto 0);
+
+	signal pll_clk_if     : std_logic;
+	signal pll_clk_idexmem: std_logic;
+	signal pll_clk_wb     : std_logic;
+	signal pll_locked     : std_logic;
+
+	signal halt_store : std_logic;
+	signal halt_reg : std_logic := '0';
+	signal halt_code_reg : std_logic_vector(31 downto 0) := (others => '0');
+
+begin
+
+	pll_inst : entity work.clk_gen_3way
+    port map (
+      clk_in   => CLK,
+      reset      => pll_reset, -- reset ativo alto no PLL
+      clk0 => pll_clk_if,
+      clk1 => pll_clk_idexmem,
+      clk2 => pll_clk_wb
+    );
+
+	CORE : entity work.rv32im_pipeline_core
+		port map (
+			clk          => pll_clk_idexmem,
+			reset 		=> reset,
+
+			----------------------------------------------------------------------
+			-- Interface com a ROM (somente leitura)
+			----------------------------------------------------------------------
+			rom_addr => rom_addr,	-- endereço de instrução
+			rom_rden => rom_rden,	-- enable de leitura
+			rom_data => rom_data,	-- dados lidos da ROM
+
+			----------------------------------------------------------------------
+			-- Interface com a RAM (leitura e escrita)
+			----------------------------------------------------------------------
+			ram_addr    => ram_addr, 	-- endereço de palavra
+			ram_wdata   => ram_wdata, 	-- dados a escrever (saida do store manager)
+			ram_rdata   => ram_rdata, 	-- dados lidos
+			ram_en      => ram_en, 		-- enable ram	
+			ram_wren    => ram_wren,    -- write enable
+			ram_rden    => ram_rden,    -- read enable
+			ram_byteena => ram_byteena 	-- máscara de bytes
+	);
+
+	ROM : entity work.ROM_simulation
+		generic map (ROM_FILE => ROM_FILE)  
+		port map (
+			addr 	=> rom_addr(31 downto 2),--word addressable
+			clk 	=> pll_clk_if,
+			re 		=> rom_rden,
+			data	=> rom_data
+	);
+
+	RAM : entity work.RAM_simulation
+		generic map (RAM_FILE => RAM_FILE, DUMP_FILE => RAM_DUMP_FILE)
+		port map(
+			addr 		=> ram_addr(31 downto 2), -- word addressable
+			mask 		=> ram_byteena,
+			clk		 	=> pll_clk_idexmem,
+			data_in 	=> ram_wdata,
+			reRAM 		=> ram_rden and ram_en,
+			weRAM 		=> ram_wren and ram_en and not halt_store,
+			eRAM 		=> ram_en,
+			data_out 	=> ram_rdata,
+			dump 		=> dump_ram
+	);
+
+	halt_store <= '1' when ram_en = '1' and ram_wren = '1' and ram_addr = HALT_ADDR else '0';
+
+	halt_detect: process(pll_clk_idexmem, reset)
+	begin
+		if reset = '1' then
+			halt_reg <= '0';
+			halt_code_reg <= (others => '0');
+		elsif rising_edge(pll_clk_idexmem) then
+			if halt_store = '1' and halt_reg = '0' then
+				halt_reg <= '1';
+				halt_code_reg <= ram_wdata;
+			end if;
+		end if;
+	end process;
+
+	halt <= halt_reg;
+	halt_code <= halt_code_reg;
+
+end architecture;
\ No newline at end of file
@@ -3,109 +3,188 @@
 compare_mif_with_json.py
 
 Uso:
-  python3 compare_mif_with_json.py <mif_file> <golden_json>
+  python3 compare_mif_with_json.py <mif_file> <golden_json|golden.gold>
 
 Agora também salva:
   <mif_file>.dump.json
 para comparação visual da memória interpretada do MIF.
+
+O MIF é lido linha a linha: faixas [a..b] viram spans (início, fim, valor) e a
+memória fica num array('I') de DEPTH palavras, sem dict por palavra/byte.
+A comparação com o gabarito é feita em bloco sobre bytes (XOR + máscara).
+O gabarito pode ser o JSON legado ou o formato binário de golden_image.py.
 """
 import sys
 import re
-import json
+from array import array
 from pathlib import Path
 
+from golden_image import GoldenImage, load_any
+
+HEADER_RE = re.compile(r"^\s*(WIDTH|DEPTH|ADDRESS_RADIX|DATA_RADIX)\s*=\s*([A-Za-z0-9]+)\s*;", re.IGNORECASE)
+CONTENT_RE = re.compile(r"^\s*CONTENT\s+BEGIN\b", re.IGNORECASE)
+END_RE = re.compile(r"^\s*END\s*;", re.IGNORECASE)
+LINE_RE = re.compile(r"^\s*(\[[^\]]+\]|[0-9A-Fa-fx]+)\s*:\s*([0-9A-Fa-f_]+)\s*;")
+
+RADIX = {"BIN": 2, "HEX": 16, "DEC": 10, "UNS": 10, "OCT": 8}
+CHUNK = 4096  # bytes comparados por bloco na busca das diferenças
+
+
 def error(msg):
     print("ERROR:", msg, file=sys.stderr)
     sys.exit(1)
 
-def parse_mif(path):
+
+def _radix(name, what):
+    base = RADIX.get(name.upper())
+    if base is None:
+        error(f"{what} '{name}' não suportado.")
+    return base
+
+
+def iter_mif_spans(path, header):
     """
-    Retorna dict word_addr -> integer_value
+    Gera (primeira_palavra, última_palavra, valor) na ordem do arquivo, sem
+    carregar o arquivo inteiro. 'header' é preenchido com WIDTH/DEPTH/radix.
     """
-    text = Path(path).read_text()
-
-    # find DATA_RADIX
-    m = re.search(r"DATA_RADIX\s*=\s*([A-Za-z]+)\s*;", text, re.IGNORECASE)
-    if not m:
-        error("DATA_RADIX não encontrado no MIF.")
-    data_radix = m.group(1).upper()
-
-    # confirm WIDTH
-    m2 = re.search(r"WIDTH\s*=\s*(\d+)\s*;", text, re.IGNORECASE)
-    if not m2:
-        error("WIDTH não encontrado no MIF.")
-    width = int(m2.group(1))
-    if width != 32:
-        print(f"Aviso: WIDTH={width}, esperado 32.")
-
-    # extract CONTENT block
-    m3 = re.search(r"CONTENT\s+BEGIN(.*)END\s*;", text, re.IGNORECASE | re.DOTALL)
-    if not m3:
+    in_content = False
+    addr_base = data_base = None
+    with open(path) as f:
+        for raw_line in f:
+            line = raw_line.split("--", 1)[0].strip()
+            if not line:
+                continue
+            if not in_content:
+                m = HEADER_RE.match(line)
+                if m:
+                    header[m.group(1).upper()] = m.group(2)
+                elif CONTENT_RE.match(line):
+                    if "DATA_RADIX" not in header:
+                        error("DATA_RADIX não encontrado no MIF.")
+                    if "WIDTH" not in header:
+                        error("WIDTH não encontrado no MIF.")
+                    if int(header["WIDTH"]) != 32:
+                        print(f"Aviso: WIDTH={header['WIDTH']}, esperado 32.")
+                    data_base = _radix(header["DATA_RADIX"], "DATA_RADIX")
+                    addr_base = _radix(header.get("ADDRESS_RADIX", "HEX"), "ADDRESS_RADIX")
+                    in_content = True
+                continue
+
+            if END_RE.match(line):
+                return
+            m = LINE_RE.match(line)
+            if not m:
+                continue
+            addr_token, data_token = m.group(1), m.group(2).replace("_", "")
+            value = int(data_token, data_base) & 0xFFFFFFFF
+            if addr_token.startswith("["):
+                a_str, b_str = addr_token[1:-1].split("..", 1)
+                yield int(a_str, addr_base), int(b_str, addr_base), value
+            else:
+                a = int(addr_token, addr_base)
+                yield a, a, value
+
+    if not in_content:
         error("Bloco CONTENT ... END; não encontrado no MIF.")
-    body = m3.group(1)
 
-    word_map = {}
 
-    for raw_line in body.splitlines():
-        line = raw_line.strip()
-        if not line or line.startswith("--"):
-            continue
+class MifImage:
+    """Memória de palavras de 32 bits + máscara de palavras definidas no MIF."""
 
-        mline = re.match(r"^\s*(\[[^\]]+\]|[0-9A-Fa-fx]+)\s*:\s*([0-9A-Fa-f_]+)\s*;.*$", line)
-        if not mline:
-            continue
+    def __init__(self, words: array, defined: bytearray, spans: list):
+        self.words = words
+        self.defined = defined      # 1 por palavra presente no MIF
+        self.spans = spans          # [(início, fim, valor)] já com runs adjacentes unidos
 
-        addr_token = mline.group(1).strip()
-        data_token = mline.group(2).strip().replace("_","")
+    def to_bytes(self) -> bytes:
+        if sys.byteorder != "little":
+            w = array("I", self.words)
+            w.byteswap()
+            return w.tobytes()
+        return self.words.tobytes()
 
-        # parse data
-        if data_radix == "BIN":
-            value = int(data_token, 2)
-        elif data_radix == "HEX":
-            value = int(data_token, 16)
-        elif data_radix in ("DEC", "UNS"):
-            value = int(data_token, 10)
-        else:
-            error(f"DATA_RADIX '{data_radix}' não suportado.")
-
-        # parse address or range
-        if addr_token.startswith("["):
-            inner = addr_token[1:-1]
-            a_str, b_str = inner.split("..", 1)
-            a = int(a_str, 16)
-            b = int(b_str, 16)
-            for w in range(a, b+1):
-                word_map[w] = value
+    def defined_bytes(self) -> bytes:
+        """Máscara por byte (0xFF = definido)."""
+        return b"".join((b"\0\0\0\0", b"\xff\xff\xff\xff")[d] for d in self.defined)
+
+
+def parse_mif(path) -> MifImage:
+    header = {}
+    spans = []
+    for a, b, value in iter_mif_spans(path, header):
+        if b < a:
+            error(f"Faixa inválida [{a:X}..{b:X}] no MIF.")
+        if spans and spans[-1][1] + 1 == a and spans[-1][2] == value:
+            spans[-1] = (spans[-1][0], b, value)
         else:
-            a = int(addr_token, 16)
-            word_map[a] = value
-
-    return word_map
-
-def build_byte_map_from_words(word_map):
-    byte_map = {}
-    for waddr, wval in word_map.items():
-        base = waddr * 4
-        for i in range(4):
-            byte_map[base + i] = (wval >> (8*i)) & 0xFF
-    return byte_map
-
-def load_golden_json(path):
-    j = json.loads(Path(path).read_text())
-    out = {}
-    for k,v in j.items():
-        addr = int(k,16) if isinstance(k,str) and k.lower().startswith("0x") else int(k)
-        out[addr] = int(v)
-    return out
-
-def save_dump_json(byte_map, path_out):
-    out = { f"0x{addr:08X}": val for addr,val in sorted(byte_map.items()) }
-    Path(path_out).write_text(json.dumps(out, indent=2))
+            spans.append((a, b, value))
+
+    top = max((b for _a, b, _v in spans), default=-1) + 1
+    depth = max(int(header.get("DEPTH", 0)), top)
+    words = array("I", bytes(4 * depth))
+    defined = bytearray(depth)
+    for a, b, value in spans:
+        n = b - a + 1
+        words[a:b + 1] = array("I", [value]) * n
+        defined[a:b + 1] = b"\x01" * n
+    return MifImage(words, defined, spans)
+
+
+def save_dump_json(image: MifImage, path_out):
+    """Grava o byte_map do MIF (mesmo formato de antes) em streaming."""
+    data = image.to_bytes()
+    with open(path_out, "w") as f:
+        f.write("{")
+        first = True
+        for waddr, present in enumerate(image.defined):
+            if not present:
+                continue
+            for addr in range(waddr * 4, waddr * 4 + 4):
+                f.write(("\n" if first else ",\n") + f'  "0x{addr:08X}": {data[addr]}')
+                first = False
+        f.write("\n}" if not first else "}")
     print(f"Dump salvo em {path_out}")
 
+
+def diff_images(actual: bytes, defined: bytes, golden: GoldenImage):
+    """
+    Retorna (diffs, missing) comparando cada faixa do gabarito com a imagem do MIF.
+    As faixas são fatias de memoryview; blocos iguais são descartados com uma única
+    operação sobre inteiros grandes e só os blocos divergentes são varridos byte a byte.
+    """
+    actual = memoryview(actual)
+    defined = memoryview(defined)
+    diffs, missing = [], []
+    for r in golden.ranges:
+        n = len(r)
+        for start in range(0, n, CHUNK):
+            end = min(start + CHUNK, n)
+            base = r.addr + start
+            exp = r.data[start:end]
+            act = actual[base:base + (end - start)]
+            dfn = defined[base:base + (end - start)]
+            if len(act) < end - start:          # faixa passa do fim do MIF
+                act = bytes(act).ljust(end - start, b"\0")
+                dfn = bytes(dfn).ljust(end - start, b"\0")
+            care = int.from_bytes(r.mask[start:end], "little") if r.mask is not None \
+                else (1 << (8 * (end - start))) - 1
+            undefined = care & ~int.from_bytes(dfn, "little")
+            delta = (int.from_bytes(act, "little") ^ int.from_bytes(exp, "little")) & care & ~undefined
+            if not (delta or undefined):
+                continue
+            for i in range(end - start):
+                if r.mask is not None and not r.mask[start + i]:
+                    continue
+                if not dfn[i]:
+                    missing.append(base + i)
+                elif act[i] != exp[i]:
+                    diffs.append((base + i, exp[i], act[i]))
+    return diffs, missing
+
+
 def main():
     if len(sys.argv) != 3:
-        print("Uso: compare_mif_with_json.py <mif_file> <golden_json>")
+        print("Uso: compare_mif_with_json.py <mif_file> <golden_json|golden.gold>")
         sys.exit(1)
 
     mif = sys.argv[1]
@@ -116,25 +195,15 @@ def main():
     if not Path(golden).is_file():
         error("Arquivo JSON gabarito não encontrado: " + golden)
 
-    word_map = parse_mif(mif)
-    byte_map = build_byte_map_from_words(word_map)
-    gold_map = load_golden_json(golden)
+    image = parse_mif(mif)
+    gold = load_any(golden)
 
     # ---- salvar dump json ----
     dump_path = mif + ".dump.json"
-    save_dump_json(byte_map, dump_path)
+    save_dump_json(image, dump_path)
 
     # ---- comparação ----
-    diffs = []
-    missing = []
-
-    for addr, expected in sorted(gold_map.items()):
-        if addr not in byte_map:
-            missing.append(addr)
-            continue
-        actual = byte_map[addr]
-        if actual != expected:
-            diffs.append((addr, expected, actual))
+    diffs, missing = diff_images(image.to_bytes(), image.defined_bytes(), gold)
 
     if missing:
         print("\nERRO: Endereços do gabarito fora do alcance do MIF:")
@@ -144,7 +213,7 @@ def main():
 
     if diffs:
         print("\nForam encontradas diferenças (mostrando até 50):")
-        for a,exp,act in diffs[:50]:
+        for a, exp, act in diffs[:50]:
             print(f"  0x{a:08X} : expected={exp} (0x{exp:02X}) actual={act} (0x{act:02X})")
         print(f"\nTotal diffs: {len(diffs)}")
         sys.exit(2)
@@ -156,5 +225,6 @@ def main():
     print("Falha devido a endereços faltantes.")
     sys.exit(2)
 
+
 if __name__ == "__main__":
     main()
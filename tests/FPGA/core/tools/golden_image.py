@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+golden_image.py
+
+Formato binário compacto para gabaritos de memória (substitui o JSON byte a byte
+como asm_tests/full.json).
+
+Layout (little-endian):
+  cabeçalho   : magic "RVGI" | versão u16 | flags u16 | n_faixas u32
+  tabela      : n_faixas x (endereço u32, tamanho u32)
+  dados       : bytes de todas as faixas, concatenados
+  máscara     : (só se flags & FLAG_MASK) mesmo tamanho dos dados;
+                0xFF = byte conferido, 0x00 = don't care
+
+O carregamento lê o arquivo uma vez e devolve fatias de memoryview (sem cópia).
+
+Uso:
+  python3 golden_image.py from-json asm_tests/full.json asm_tests/full.gold
+  python3 golden_image.py to-json   asm_tests/full.gold /tmp/full.json
+  python3 golden_image.py info      asm_tests/full.gold
+"""
+import sys
+import json
+import struct
+from pathlib import Path
+
+MAGIC = b"RVGI"
+VERSION = 1
+FLAG_MASK = 0x1
+HEADER = struct.Struct("<4sHHI")
+RANGE = struct.Struct("<II")
+
+# buracos até este tamanho entre duas faixas viram don't care dentro de uma faixa só
+MERGE_GAP = 8
+
+
+class GoldenRange:
+    __slots__ = ("addr", "data", "mask")
+
+    def __init__(self, addr, data, mask=None):
+        self.addr = addr
+        self.data = data        # memoryview/bytes
+        self.mask = mask        # memoryview/bytes ou None (tudo conferido)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        return f"GoldenRange(addr=0x{self.addr:08X}, len={len(self.data)}, mask={self.mask is not None})"
+
+
+class GoldenImage:
+    def __init__(self, ranges):
+        self.ranges = ranges
+
+    def items(self):
+        """(endereço, valor) dos bytes conferidos, em ordem."""
+        for r in self.ranges:
+            for i, v in enumerate(r.data):
+                if r.mask is None or r.mask[i]:
+                    yield r.addr + i, v
+
+    def checked_bytes(self):
+        return sum(len(r) if r.mask is None else sum(1 for m in r.mask if m) for r in self.ranges)
+
+
+# ---------------------------------------------------------------------------
+# Leitura / escrita do formato binário
+# ---------------------------------------------------------------------------
+
+def is_golden_file(path) -> bool:
+    with open(path, "rb") as f:
+        return f.read(4) == MAGIC
+
+
+def load_golden(path) -> GoldenImage:
+    buf = memoryview(Path(path).read_bytes())
+    magic, version, flags, n = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: não é um gabarito binário (magic {bytes(magic)!r})")
+    if version != VERSION:
+        raise ValueError(f"{path}: versão {version} não suportada")
+
+    table = [RANGE.unpack_from(buf, HEADER.size + i * RANGE.size) for i in range(n)]
+    data_off = HEADER.size + n * RANGE.size
+    total = sum(size for _a, size in table)
+    mask_off = data_off + total if flags & FLAG_MASK else None
+    if len(buf) < data_off + total * (2 if mask_off else 1):
+        raise ValueError(f"{path}: arquivo truncado")
+
+    ranges = []
+    pos = 0
+    for addr, size in table:
+        data = buf[data_off + pos:data_off + pos + size]
+        mask = buf[mask_off + pos:mask_off + pos + size] if mask_off is not None else None
+        ranges.append(GoldenRange(addr, data, mask))
+        pos += size
+    return GoldenImage(ranges)
+
+
+def save_golden(image: GoldenImage, path):
+    with_mask = any(r.mask is not None for r in image.ranges)
+    out = bytearray(HEADER.pack(MAGIC, VERSION, FLAG_MASK if with_mask else 0, len(image.ranges)))
+    for r in image.ranges:
+        out += RANGE.pack(r.addr, len(r))
+    for r in image.ranges:
+        out += r.data
+    if with_mask:
+        for r in image.ranges:
+            out += r.mask if r.mask is not None else b"\xff" * len(r)
+    Path(path).write_bytes(out)
+
+
+# ---------------------------------------------------------------------------
+# Conversão a partir de {endereço: byte}
+# ---------------------------------------------------------------------------
+
+def from_byte_map(byte_map) -> GoldenImage:
+    """
+    {endereço: valor|None} -> GoldenImage. None (null no JSON) = don't care.
+    Faixas separadas por até MERGE_GAP bytes são unidas com o buraco como don't care.
+    """
+    ranges = []
+    cur_addr = None
+    data = mask = None
+    for addr, val in sorted(byte_map.items()):
+        end = cur_addr + len(data) if cur_addr is not None else None
+        if end is None or addr - end > MERGE_GAP:
+            if cur_addr is not None:
+                ranges.append((cur_addr, data, mask))
+            cur_addr, data, mask = addr, bytearray(), bytearray()
+        elif addr > end:
+            data += bytes(addr - end)
+            mask += bytes(addr - end)
+        data.append(0 if val is None else int(val) & 0xFF)
+        mask.append(0x00 if val is None else 0xFF)
+    if cur_addr is not None:
+        ranges.append((cur_addr, data, mask))
+
+    return GoldenImage([GoldenRange(a, bytes(d), None if all(m) else bytes(m)) for a, d, m in ranges])
+
+
+def load_json_map(path) -> dict:
+    out = {}
+    for k, v in json.loads(Path(path).read_text()).items():
+        addr = int(k, 16) if isinstance(k, str) and k.lower().startswith("0x") else int(k)
+        out[addr] = v
+    return out
+
+
+def load_any(path) -> GoldenImage:
+    """Gabarito binário (.gold) ou JSON legado."""
+    return load_golden(path) if is_golden_file(path) else from_byte_map(load_json_map(path))
+
+
+def to_json(image: GoldenImage, path):
+    out = {f"0x{addr:08x}": val for addr, val in image.items()}
+    Path(path).write_text(json.dumps(out, indent=2) + "\n")
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ("from-json", "to-json", "info"):
+        print(__doc__.split("Uso:", 1)[1].rstrip())
+        sys.exit(1)
+
+    cmd, src = sys.argv[1], sys.argv[2]
+    if cmd == "info":
+        img = load_any(src)
+        print(f"{len(img.ranges)} faixas, {img.checked_bytes()} bytes conferidos")
+        for r in img.ranges:
+            print(f"  {r!r}")
+        return
+
+    if len(sys.argv) != 4:
+        print(f"Uso: golden_image.py {cmd} <entrada> <saída>")
+        sys.exit(1)
+    dst = sys.argv[3]
+    if cmd == "from-json":
+        img = from_byte_map(load_json_map(src))
+        save_golden(img, dst)
+    else:
+        img = load_golden(src)
+        to_json(img, dst)
+    print(f"{src} -> {dst}: {len(img.ranges)} faixas, {img.checked_bytes()} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,40 @@
 import os
+import re
 import sys
 import json
+import time
+import fcntl
+import hashlib
 import argparse
+import contextlib
 from pathlib import Path
-from cocotb.runner import get_runner, VHDL
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from cocotb.runner import get_runner, get_results, VHDL
 
-def run_cocotb_test(toplevel: str, sources: list, test_module: str, parameters: dict = None):
-    tests_root = Path(__file__).resolve().parents[1]
-    repo_root  = Path(__file__).resolve().parents[2] 
-    sys.path.append(str(repo_root))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from tests.python.utils.waves import WAVE_FORMATS, wave_plusargs, parse_window, trim_vcd
+from tests.python.utils.rvasm import assemble_file, AsmError
+from tests.python.utils.results_db import record_run, db_path, parse_results_xml
+from tests.python.utils import sim_profile
 
-    sim = os.getenv("SIM", "ghdl")
-    vhdl_sources = [repo_root / src for src in sources]
+# Incrementar quando o formato do cache/estrutura de build mudar
+BUILD_CACHE_VERSION = 1
+# Simuladores que recebem os generics só na execução (ghdl -r -gNOME=valor);
+# para eles os generics não entram na chave do build.
+RUNTIME_GENERIC_SIMS = {"ghdl"}
+# Chaves de tests.json usadas só pelo runner (não vão para run_cocotb_test)
+RUNNER_KEYS = ("runtime_rom", "suites")
 
-    runner = get_runner(sim)
+
+def get_test_dir(toplevel: str, test_module: str, test_dir: str = None) -> Path:
+    """
+    Diretório sim_build/<grupo>/<nome> com as saídas de um teste (results.xml, waves, logs).
+    'test_dir' (opcional em tests.json) é relativo a sim_build/ e separa suítes que
+    compartilham o mesmo módulo de teste (ex.: programas do rvgen).
+    """
+    tests_root = Path(__file__).resolve().parents[1]
+    if test_dir:
+        return tests_root / "python/sim_build" / test_dir
 
     if ".entities." in test_module:
         group = "entities"
@@ -24,53 +45,349 @@ def run_cocotb_test(toplevel: str, sources: list, test_module: str, parameters:
 
     if group == "instructions":
         test_name = test_module.split(".")[-1]
-        build_dir = tests_root / "python/sim_build" / group / test_name
-    else:
-        build_dir = tests_root / "python/sim_build" / group / toplevel
+        return tests_root / "python/sim_build" / group / test_name
+    return tests_root / "python/sim_build" / group / toplevel
+
+
+def build_key(sim: str, toplevel: str, vhdl_sources: list, build_args: list, parameters: dict) -> str:
+    """
+    Hash do build: conteúdo e ordem dos fontes, flags do compilador, toplevel
+    e (se o simulador fixar os generics na elaboração) os parâmetros.
+    """
+    h = hashlib.sha256()
+    h.update(f"v{BUILD_CACHE_VERSION}|{sim}|{toplevel}".encode())
+    for arg in build_args:
+        h.update(f"|{type(arg).__name__}:{arg}".encode())
+    for src in vhdl_sources:
+        h.update(f"|{src}:".encode())
+        h.update(hashlib.sha256(Path(src).read_bytes()).digest())
+    if sim not in RUNTIME_GENERIC_SIMS:
+        for k, v in sorted(parameters.items()):
+            h.update(f"|{k}={v}".encode())
+    return h.hexdigest()
+
+
+def get_cache_dir(toplevel: str, key: str) -> Path:
+    """Diretório de build compartilhado por todas as suítes com a mesma chave."""
+    tests_root = Path(__file__).resolve().parents[1]
+    return tests_root / "python/sim_build/_cache" / f"{toplevel}-{key[:16]}"
+
+
+def cached_build(runner, sim: str, toplevel: str, vhdl_sources: list, build_args: list,
+                 parameters: dict, rebuild: bool = False) -> Path:
+    """
+    Compila (ghdl -i/-m) apenas se a chave mudou. Suítes com os mesmos fontes
+    (ex.: one ... six) reutilizam a mesma biblioteca work já analisada.
+    Retorna o diretório de build.
+    """
+    key = build_key(sim, toplevel, vhdl_sources, build_args, parameters)
+    build_dir = get_cache_dir(toplevel, key)
     build_dir.mkdir(parents=True, exist_ok=True)
+    stamp = build_dir / "build.stamp"
+
+    # lock por diretório: com --jobs, duas suítes iguais não compilam ao mesmo tempo
+    with open(build_dir / ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if not rebuild and stamp.exists() and stamp.read_text().strip() == key:
+            print(f"Build em cache: {build_dir}")
+            return build_dir
+
+        stamp.unlink(missing_ok=True)
+        runner.build(
+            vhdl_sources=vhdl_sources,
+            hdl_toplevel=toplevel,
+            always=True,
+            build_dir=build_dir,
+            build_args=build_args,
+            parameters=parameters
+        )
+        stamp.write_text(key + "\n")
+    return build_dir
+
+
+def resolve_parameter(name: str, value, repo_root: Path) -> str:
+    """
+    Valor de um generic para o simulador: booleanos viram true/false, caminhos
+    existentes (no cwd ou relativos à raiz do repositório) viram absolutos e fontes
+    assembly (ex.: ROM_FILE = codes/one.S) são montadas pelo rvasm (.hex do cache).
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    vpath = Path(value)
+    if vpath.exists():
+        resolved = str(vpath.resolve())
+    elif (repo_root / value).exists():
+        resolved = str((repo_root / value).resolve())
+    else:
+        # fallback: mantenha o original (para flags não-caminho)
+        return str(value)
+    if resolved.endswith((".S", ".s")) and Path(resolved).is_file():
+        try:
+            return str(assemble_file(resolved))
+        except AsmError as e:
+            raise RuntimeError(f"{name}: falha ao montar {value}: {e}") from None
+    return resolved
+
+
+def declares_generic(sources: list, toplevel: str, generic: str) -> bool:
+    """True se o arquivo do toplevel (nome do arquivo = nome da entidade) declara 'generic'."""
+    for src in sources:
+        if Path(src).stem.lower() == toplevel.lower():
+            try:
+                text = Path(src).read_text(errors="replace")
+            except OSError:
+                return False
+            return re.search(rf"\b{generic}\s*:", text, re.IGNORECASE) is not None
+    return False
+
+
+def run_cocotb_test(toplevel: str, sources: list, test_module, parameters: dict = None,
+                    rebuild: bool = False, waves: str = "none", wave_scopes: list = None,
+                    wave_window: str = None, test_dir: str = None, timings: dict = None,
+                    profile: str = None, programs: dict = None):
+    """
+    Compila (com cache) e executa uma suíte. Se 'timings' for um dict, recebe
+    build_s, run_s e build_cached (True quando o build veio do cache).
+    profile ('counts' | 'cprofile') liga o utils/sim_profile.py dentro do simulador
+    e grava o resultado em <test_dir>/profile/.
+    test_module pode ser uma lista: todos rodam no mesmo processo do simulador.
+    programs ({módulo: programa}) vai para o testbench em ROM_PROGRAMS; cada módulo
+    carrega o seu pela ROM em tempo de execução (CoreDriver.start(module=...)).
+    """
+    if not isinstance(test_module, str):
+        test_module = ",".join(test_module)
+    tests_root = Path(__file__).resolve().parents[1]
+    repo_root  = Path(__file__).resolve().parents[2]
+    sys.path.append(str(repo_root))
+
+    sim = os.getenv("SIM", "ghdl")
+    vhdl_sources = [repo_root / src for src in sources]
+
+    runner = get_runner(sim)
+
+    test_dir = get_test_dir(toplevel, test_module, test_dir)
+    test_dir.mkdir(parents=True, exist_ok=True)
 
     if parameters:
-        abs_params = {}
-        for k, v in parameters.items():
-            if isinstance(v, bool):
-                abs_params[k] = "true" if v else "false"
-            else:
-                # tenta resolver como caminho absoluto relativo ao ambiente atual
-                vpath = Path(v)
-                if vpath.exists():
-                    abs_params[k] = str(vpath.resolve())
-                else:
-                    # se não existe no cwd atual, tente relative ao repo_root
-                    candidate = repo_root / v
-                    if candidate.exists():
-                        abs_params[k] = str(candidate.resolve())
-                    else:
-                        # fallback: mantenha o original (para flags não-caminho)
-                        abs_params[k] = str(v)
-        parameters = abs_params
-
-    runner.build(
-        vhdl_sources=vhdl_sources,
-        hdl_toplevel=toplevel,
-        always=True,
-        build_dir=build_dir,
+        parameters = {k: resolve_parameter(k, v, repo_root) for k, v in parameters.items()}
+    # o ghdl -r roda no build_dir, compartilhado pelas suítes de mesma chave: o dump
+    # da RAM de cada suíte vai para o test_dir dela
+    if declares_generic(vhdl_sources, toplevel, "RAM_DUMP_FILE"):
+        parameters = {"RAM_DUMP_FILE": str(test_dir / "ram_dump.hex"), **(parameters or {})}
+    if programs:
+        programs = {m: resolve_parameter(m, v, repo_root) for m, v in programs.items()}
+
+    t0 = time.time()
+    build_dir = cached_build(
+        runner, sim, toplevel, vhdl_sources,
         build_args=[VHDL("--std=08")],
-        parameters=parameters or {}
+        parameters=parameters or {},
+        rebuild=rebuild,
     )
+    t1 = time.time()
+
+    plusargs, wave_file = wave_plusargs(waves, test_dir, toplevel, wave_scopes)
 
-    wave_file = build_dir / "waves.ghw"
-    plusargs = [f"--wave={wave_file}"]
+    # generics também ficam visíveis ao testbench Python (ex.: ROM_FILE para o cosim)
+    extra_env = {k: str(v) for k, v in (parameters or {}).items()}
+    if programs:
+        extra_env["ROM_PROGRAMS"] = json.dumps(programs)
+    modules = test_module
+    profile_dir = None
+    if profile:
+        profile_dir = test_dir / "profile"
+        profile_dir.mkdir(exist_ok=True)
+        for old in profile_dir.iterdir():
+            old.unlink()
+        modules = f"{test_module},{sim_profile.MODULE}"
+        extra_env.update(SIM_PROFILE=profile, SIM_PROFILE_DIR=str(profile_dir))
 
-    runner.test(
+    results_xml = runner.test(
         hdl_toplevel=toplevel,
         hdl_toplevel_lang="vhdl",
-        test_module=test_module,
+        test_module=modules,
         build_dir=build_dir,
+        results_xml=str(test_dir / "results.xml"),
+        parameters=parameters or {},
         plusargs=plusargs,
+        extra_env=extra_env,
         test_args=["--std=08"],
     )
+    if timings is not None:
+        timings.update(build_s=t1 - t0, run_s=time.time() - t1,
+                       build_cached=(build_dir / "build.stamp").stat().st_mtime < t0)
+
+    if profile_dir is not None and (profile_dir / "profile.json").exists():
+        sim_profile.print_report(sim_profile.load(profile_dir))
+        print(f"Perfil: {profile_dir}")
+
+    if wave_file is not None:
+        if wave_window and waves == "vcd":
+            trim_vcd(wave_file, *parse_window(wave_window))
+        print(f"Waves: {wave_file} (gerado)")
+    return results_xml
+
+
+@contextlib.contextmanager
+def redirect_output(log_path: Path):
+    """
+    Redireciona stdout/stderr (nível de file descriptor) para log_path.
+    Pega também a saída dos subprocessos do GHDL, que herdam os fds 1 e 2.
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = (os.dup(1), os.dup(2))
+    with open(log_path, "w") as log:
+        os.dup2(log.fileno(), 1)
+        os.dup2(log.fileno(), 2)
+        try:
+            yield
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            os.close(saved[0])
+            os.close(saved[1])
+
+
+def run_suite(name: str, config: dict, log_to_file: bool = False, **run_opts) -> dict:
+    """
+    Executa uma suíte de tests.json e devolve um resumo
+    {name, toplevel, status, tests, failed, elapsed, build_s, run_s, build_cached, results_xml, log}.
+    Com log_to_file=True toda a saída vai para <test_dir>/runner.log.
+    run_opts são repassados para run_cocotb_test.
+    Num grupo de share_simulations, 'parts' traz o resumo de cada suíte do grupo.
+    """
+    suites = config.get("suites")
+    config = {k: v for k, v in config.items() if k not in RUNNER_KEYS}
+    test_dir = get_test_dir(config["toplevel"], config["test_module"], config.get("test_dir"))
+    test_dir.mkdir(parents=True, exist_ok=True)
+    log_path = test_dir / "runner.log" if log_to_file else None
+
+    summary = {"name": name, "toplevel": config["toplevel"], "status": "ERROR", "tests": 0, "failed": 0,
+               "elapsed": 0.0, "log": str(log_path) if log_path else None}
+    timings = {}
+    start = time.perf_counter()
+    redirect = redirect_output(log_path) if log_to_file else contextlib.nullcontext()
+    with redirect:
+        try:
+            results_xml = run_cocotb_test(**config, **run_opts, timings=timings)
+            summary["results_xml"] = str(results_xml)
+            tests, failed = get_results(Path(results_xml))
+            summary.update(tests=tests, failed=failed,
+                           status="FAIL" if failed else "PASS")
+        except BaseException as e:  # cocotb sinaliza erros de build/simulação com SystemExit
+            if isinstance(e, KeyboardInterrupt):
+                raise
+            summary["error"] = str(e)
+            print(f"[ERRO] O teste '{name}' falhou: {e}")
+    summary["elapsed"] = time.perf_counter() - start
+    summary.update(timings)
+    if suites:
+        summary["parts"] = split_summary(summary, suites)
+    return summary
+
+
+def share_simulations(configs: dict) -> dict:
+    """
+    --shared-sim: junta as suítes marcadas com "runtime_rom" que têm o mesmo toplevel,
+    fontes e generics (fora ROM_FILE) numa só execução do simulador. O testbench de
+    cada módulo carrega o próprio programa na ROM (ROM_PROGRAMS), então o build e a
+    elaboração acontecem uma vez para todos os programas. Cada grupo entra no lugar
+    da sua primeira suíte; suítes que não podem ser juntadas ficam como estão.
+    """
+    entries, groups = [], {}
+    for name, config in configs.items():
+        params = dict(config.get("parameters") or {})
+        rom = params.pop("ROM_FILE", None)
+        if not config.get("runtime_rom") or rom is None or config.get("test_dir"):
+            entries.append((name, config))
+            continue
+        key = json.dumps([config["toplevel"], config["sources"], params], sort_keys=True)
+        group = groups.get(key)
+        if group is None or config["test_module"] in group["suites"]:
+            # mesmo módulo duas vezes não cabe num processo: começa outro grupo
+            group = groups[key] = {"names": [], "configs": [], "suites": {}}
+            entries.append((None, group))
+        group["names"].append(name)
+        group["configs"].append(config)
+        group["suites"][config["test_module"]] = name
+
+    out = {}
+    for name, entry in entries:
+        if name is not None:
+            out[name] = entry
+        elif len(entry["configs"]) == 1:
+            out[entry["names"][0]] = entry["configs"][0]
+        else:
+            first = entry["configs"][0]
+            out["+".join(entry["names"])] = {
+                "toplevel": first["toplevel"],
+                "sources": first["sources"],
+                "test_module": [c["test_module"] for c in entry["configs"]],
+                "parameters": dict(first["parameters"]),
+                "programs": {c["test_module"]: c["parameters"]["ROM_FILE"] for c in entry["configs"]},
+                "test_dir": "shared/" + "-".join(entry["names"]),
+                "suites": entry["suites"],
+            }
+    return out
+
+
+def split_summary(summary: dict, suites: dict) -> list:
+    """
+    Resumo de cada suíte de uma simulação compartilhada, a partir do results.xml.
+    O build e o tempo total são do grupo: cada parte fica só com o tempo dos seus
+    testcases (run_s = elapsed) e sem build_s, para o histórico comparar a suíte
+    com as execuções dela fora do grupo.
+    """
+    parts = []
+    for module, name in suites.items():
+        part = {k: v for k, v in summary.items() if k not in ("name", "parts")}
+        part.update(name=name, classname=module, shared=summary["name"],
+                    build_s=None, build_cached=None, run_s=None)
+        if summary.get("results_xml"):
+            cases = parse_results_xml(summary["results_xml"], classname=module)
+            failed = sum(1 for c in cases if c["status"] == "FAIL")
+            wall = sum(c["wall_s"] or 0.0 for c in cases)
+            part.update(tests=len(cases), failed=failed,
+                        status="ERROR" if not cases else "FAIL" if failed else "PASS",
+                        elapsed=wall, run_s=wall if cases else None)
+        parts.append(part)
+    return parts
+
+
+def expand_shared(summaries: list) -> list:
+    """Troca o resumo de cada grupo compartilhado pelos resumos das suítes dele."""
+    out = []
+    for s in summaries:
+        out.extend(s.get("parts") or [s])
+    return out
+
+
+def run_parallel(configs: dict, jobs: int, **run_opts) -> list:
+    """Executa as suítes em um pool de processos; cada uma com seu runner.log."""
+    summaries = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(run_suite, name, config, True, **run_opts): name
+                   for name, config in configs.items()}
+        for fut in as_completed(futures):
+            s = fut.result()
+            summaries.append(s)
+            print(f"[{s['status']:5}] {s['name']:<20} {s['elapsed']:7.1f}s  log: {s['log']}")
+    order = list(configs)
+    return sorted(summaries, key=lambda s: order.index(s["name"]))
+
+
+def print_summary(summaries: list, wall: float):
+    print(f"\n{'='*20} RESUMO {'='*20}")
+    for s in summaries:
+        detail = f"{s['tests'] - s['failed']}/{s['tests']} testes" if s["status"] != "ERROR" else s.get("error", "")
+        print(f"  {s['status']:5}  {s['name']:<20} {s['elapsed']:7.1f}s  {detail}")
+    passed = sum(1 for s in summaries if s["status"] == "PASS")
+    print(f"\n{passed}/{len(summaries)} suítes passaram em {wall:.1f}s "
+          f"(soma dos tempos: {sum(s['elapsed'] for s in summaries):.1f}s)")
 
-    print(f"Waves: {wave_file} (gerado)")
 
 if __name__ == "__main__":
     tests_root = Path(__file__).resolve().parents[1]
@@ -93,22 +410,125 @@ if __name__ == "__main__":
         default="all",
         help=f"Nome do teste a ser executado. Opções: {list(TEST_CONFIGS.keys()) + ['all']}"
     )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="Número de suítes executadas em paralelo no modo 'all' (0 = número de CPUs). "
+             "Com N > 1 a saída de cada suíte vai para sim_build/<grupo>/<nome>/runner.log"
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Ignora o cache de build (sim_build/_cache) e recompila os fontes VHDL"
+    )
+    parser.add_argument(
+        "--waves",
+        choices=WAVE_FORMATS,
+        default="none",
+        help="Formato do arquivo de ondas gravado em sim_build/<grupo>/<nome>/"
+    )
+    parser.add_argument(
+        "--wave-scope",
+        action="append",
+        default=[],
+        metavar="PADRAO",
+        help="Grava só os sinais que casam com o padrão (ex.: 'dut.core.*'). Pode repetir."
+    )
+    parser.add_argument(
+        "--wave-window",
+        metavar="INICIO:FIM",
+        help="Janela de tempo mantida no arquivo de ondas (ex.: 1us:5us). Somente com --waves vcd"
+    )
+    parser.add_argument(
+        "--tests",
+        action="append",
+        default=[],
+        metavar="ARQ",
+        help="Arquivo extra de suítes no formato de tests.json (ex.: gerado por utils/rvgen.py). Pode repetir."
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="cprofile",
+        choices=sim_profile.MODES,
+        default=None,
+        help="Perfil do testbench: tempo Python x simulador, triggers e acessos a sinais por teste; "
+             "'cprofile' (padrão) também grava .pstat e pilhas colapsadas para flamegraph "
+             "em sim_build/<grupo>/<nome>/profile/"
+    )
+    parser.add_argument(
+        "--shared-sim",
+        action="store_true",
+        help="No modo 'all', roda as suítes com \"runtime_rom\" (one ... six) num só processo do "
+             "simulador, trocando o programa da ROM pelo backdoor entre os módulos"
+    )
+    parser.add_argument(
+        "--results-db",
+        metavar="ARQ",
+        default=None,
+        help=f"Banco SQLite onde cada execução é registrada (padrão: $RESULTS_DB ou {db_path()})"
+    )
+    parser.add_argument(
+        "--no-db",
+        action="store_true",
+        help="Não registra esta execução no banco de resultados"
+    )
     args = parser.parse_args()
+    for extra in args.tests:
+        try:
+            TEST_CONFIGS.update(json.loads(Path(extra).read_text()))
+        except (OSError, json.JSONDecodeError) as e:
+            parser.error(f"--tests {extra}: {e}")
+    if args.wave_window:
+        if args.waves != "vcd":
+            parser.error("--wave-window requer --waves vcd (o GHDL não recorta arquivos GHW)")
+        try:
+            parse_window(args.wave_window)
+        except ValueError as e:
+            parser.error(str(e))
+    run_opts = {
+        "rebuild": args.rebuild,
+        "waves": args.waves,
+        "wave_scopes": args.wave_scope,
+        "wave_window": args.wave_window,
+        "profile": args.profile,
+    }
 
     if args.test_name == "all":
         print("Executando TODOS os testes definidos em tests.json...")
-        for name, config in TEST_CONFIGS.items():
-            print(f"\n{'='*20} INICIANDO TESTE: {name.upper()} {'='*20}")
-            try:
-                run_cocotb_test(**config)
-                print(f"{'-'*20} TESTE {name.upper()} FINALIZADO COM SUCESSO {'-'*20}")
-            except Exception as e:
-                print(f"[ERRO] O teste '{name}' falhou: {e}")
+        jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+        configs = share_simulations(TEST_CONFIGS) if args.shared_sim else TEST_CONFIGS
+        wall_start = time.perf_counter()
+        if jobs > 1:
+            print(f"Modo paralelo: {jobs} processos")
+            summaries = run_parallel(configs, jobs, **run_opts)
+        else:
+            summaries = []
+            for name, config in configs.items():
+                print(f"\n{'='*20} INICIANDO TESTE: {name.upper()} {'='*20}")
+                s = run_suite(name, config, **run_opts)
+                if s["status"] != "ERROR":
+                    print(f"{'-'*20} TESTE {name.upper()} FINALIZADO ({s['status']}) {'-'*20}")
+                summaries.append(s)
         print("\nTodos os testes foram executados.")
+        summaries = expand_shared(summaries)
+        wall = time.perf_counter() - wall_start
+        print_summary(summaries, wall)
+        if not args.no_db:
+            record_run(summaries, " ".join(sys.argv[1:]) or "all", jobs, wall, args.results_db)
+            print(f"Resultados registrados em {db_path(args.results_db)}")
+        # make test / CI: qualquer suíte com falha ou erro deixa o job vermelho
+        if any(s["status"] != "PASS" for s in summaries):
+            sys.exit(1)
     elif args.test_name in TEST_CONFIGS:
         print(f"Executando teste específico: {args.test_name}")
-        run_cocotb_test(**TEST_CONFIGS[args.test_name])
-        print(f"\nTeste {args.test_name} finalizado.")
+        s = run_suite(args.test_name, TEST_CONFIGS[args.test_name], **run_opts)
+        print(f"\nTeste {args.test_name} finalizado ({s['status']}).")
+        if not args.no_db:
+            record_run([s], " ".join(sys.argv[1:]), 1, s["elapsed"], args.results_db)
+        if s["status"] != "PASS":
+            sys.exit(1)
     else:
         print(f"Erro: Teste '{args.test_name}' não encontrado em tests.json.")
         print(f"Opções disponíveis: {list(TEST_CONFIGS.keys()) + ['all']}")
@@ -1,5 +1,13 @@
+import os
+import time
+
 import cocotb
-from cocotb.triggers import Timer
+from cocotb.triggers import RisingEdge, Timer
+
+try:
+    import numpy as np
+except ImportError:  # varreduras em lote (corner_sweep, batched_sweep) ficam desabilitadas
+    np = None
 
 
 OPCODES = {
@@ -190,3 +198,140 @@ async def jalr(dut):
     await apply_and_check(dut, "JALR", a, b, sum_res, 0)
 
     dut._log.info("JALR tests OK")
+
+
+# === Modo em lote: varredura vetorizada com NumPy ===
+
+BRANCH_OPS = {"BEQ", "BNE", "BLT", "BGE", "BLTU", "BGEU"}
+
+CORNERS = [0x00000000, 0x00000001, 0x00000002, 0x0000001F, 0x00000020, 0x7FFFFFFE, 0x7FFFFFFF,
+           0x80000000, 0x80000001, 0xFFFFFFFE, 0xFFFFFFFF, 0x55555555, 0xAAAAAAAA, 0x0000FFFF,
+           0xFFFF0000, 0x00000800, 0xFFFFF800]
+
+
+def alu_model(op_name, a, b):
+    """
+    Resultado esperado (dataOut, branch) para arrays uint32 'a' e 'b'.
+    Tudo vetorizado: sem laço Python por vetor.
+    """
+    sa, sb = a.view(np.int32), b.view(np.int32)
+    sh = b & np.uint32(31)
+    zero = np.zeros_like(a)
+
+    if op_name in BRANCH_OPS:
+        taken = {
+            "BEQ": a == b, "BNE": a != b,
+            "BLT": sa < sb, "BGE": sa >= sb,
+            "BLTU": a < b, "BGEU": a >= b,
+        }[op_name]
+        return zero, taken.astype(np.uint8)
+
+    if op_name == "PASS_B":
+        data = b.copy()
+    elif op_name == "ADD":
+        data = a + b
+    elif op_name == "SUB":
+        data = a - b
+    elif op_name == "XOR":
+        data = a ^ b
+    elif op_name == "OR":
+        data = a | b
+    elif op_name == "AND":
+        data = a & b
+    elif op_name == "SLL":
+        data = a << sh
+    elif op_name == "SRL":
+        data = a >> sh
+    elif op_name == "SRA":
+        data = (sa >> sh.astype(np.int32)).view(np.uint32)
+    elif op_name == "SLT":
+        data = (sa < sb).astype(np.uint32)
+    elif op_name == "SLTU":
+        data = (a < b).astype(np.uint32)
+    elif op_name == "JALR":
+        data = (a + b) & np.uint32(0xFFFFFFFE)
+    else:
+        raise ValueError(f"opcode desconhecido: {op_name}")
+    return data.astype(np.uint32), np.zeros(a.shape, dtype=np.uint8)
+
+
+def operand_batch(rng, n_random):
+    """Produto cartesiano dos casos de canto + pares aleatórios (shift de 0..31 incluído)."""
+    corners = np.array(CORNERS, dtype=np.uint32)
+    ca, cb = np.meshgrid(corners, corners)
+    shifts = np.arange(32, dtype=np.uint32)
+    sa, sb = np.meshgrid(corners, shifts)
+    ra = rng.integers(0, 1 << 32, size=n_random, dtype=np.uint64).astype(np.uint32)
+    rb = rng.integers(0, 1 << 32, size=n_random, dtype=np.uint64).astype(np.uint32)
+    # 1/4 dos aleatórios com operandos iguais e 1/4 com vizinhos (exercita BEQ/BGE/SLT na fronteira)
+    half = n_random // 4
+    rb[:half] = ra[:half]
+    rb[half:2 * half] = ra[half:2 * half] + rng.integers(-2, 3, size=half).astype(np.uint32)
+    a = np.concatenate([ca.ravel(), sa.ravel(), ra])
+    b = np.concatenate([cb.ravel(), sb.ravel(), rb])
+    return a, b
+
+
+VECTOR_FILE = "alu_vectors.txt"   # mesmos nomes dos generics do ALU_sim_test; o
+RESULT_FILE = "alu_results.txt"   # ghdl -r roda no build_dir, que é o cwd aqui
+
+
+async def vhdl_sweep(dut, n_random):
+    """
+    Varre os 18 opcodes pelo driver textio do ALU_sim_test: o Python grava todos os
+    vetores num arquivo, o VHDL aplica um por ns e grava as saídas, e a comparação
+    com o alu_model é feita em lote no fim. A VPI só é usada para 'start'/'done'.
+    """
+    rng = np.random.default_rng(cocotb.RANDOM_SEED)
+    a, b = operand_batch(rng, n_random)
+    n = len(a)
+
+    codes = [int(code, 2) for code in OPCODES.values()]
+    with open(VECTOR_FILE, "w") as f:
+        for code in codes:
+            f.writelines(f"{code:02x} {x:08x} {y:08x}\n" for x, y in zip(a.tolist(), b.tolist()))
+
+    t0 = time.perf_counter()
+    dut.start.value = 1
+    await RisingEdge(dut.done)
+    dut.start.value = 0
+    await Timer(1, units="ns")
+    elapsed = time.perf_counter() - t0
+
+    with open(RESULT_FILE) as f:
+        rows = [line.split() for line in f]
+    total = len(codes) * n
+    assert len(rows) == total, f"{RESULT_FILE}: {len(rows)} linhas, esperado {total}"
+    try:
+        got_data = np.array([int(r[0], 16) for r in rows], dtype=np.uint32).reshape(len(codes), n)
+        got_branch = np.array([int(r[1]) for r in rows], dtype=np.uint8).reshape(len(codes), n)
+    except ValueError as e:  # 'U'/'X' na saída da ALU
+        raise AssertionError(f"{RESULT_FILE}: saída não numérica ({e})") from None
+
+    for k, op_name in enumerate(OPCODES):
+        exp_data, exp_branch = alu_model(op_name, a, b)
+        bad = np.flatnonzero((got_data[k] != exp_data) | (got_branch[k] != exp_branch))
+        if bad.size:
+            lines = [f"{op_name}: {bad.size}/{n} vetores divergentes; primeiros:"]
+            for i in bad[:5]:
+                lines.append(
+                    f"  dA={int(a[i]):#010x} dB={int(b[i]):#010x} "
+                    f"esperado dataOut={int(exp_data[i]):#010x} branch={int(exp_branch[i])}, "
+                    f"obtido dataOut={int(got_data[k, i]):#010x} branch={int(got_branch[k, i])}")
+            raise AssertionError("\n".join(lines))
+
+    dut._log.info(
+        f"varredura OK: {total} vetores ({len(OPCODES)} opcodes x {n}) em {elapsed:.2f} s "
+        f"de simulação -> {total / elapsed:,.0f} vetores/s")
+
+
+@cocotb.test(skip=np is None)
+async def corner_sweep(dut):
+    """Casos de canto x casos de canto e x deslocamentos 0..31, em todos os opcodes."""
+    await vhdl_sweep(dut, 0)
+
+
+@cocotb.test(skip=np is None or "ALU_VECTORS" not in os.environ)
+async def batched_sweep(dut):
+    """Cantos + ALU_VECTORS pares aleatórios por opcode; só roda com ALU_VECTORS definido."""
+    await vhdl_sweep(dut, int(os.environ["ALU_VECTORS"]))
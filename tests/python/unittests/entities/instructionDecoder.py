@@ -3,6 +3,8 @@ from pathlib import Path
 import cocotb
 from cocotb.triggers import Timer
 
+from tests.python.utils import decode_table
+
 
 # ===== Helpers =====
 def _parse_field(val: str, width: int) -> int:
@@ -118,3 +120,62 @@ async def test_instruction_decoder(dut):
             f"opExImm={got_fields['opExImm[2:0]']:03b} "
             f"opALU={got_fields['opALU[4:0]']:05b})"
         )
+
+
+@cocotb.test()
+async def test_instruction_decoder_exhaustive(dut):
+    """
+    Varre todas as 2^17 combinações de opcode/funct3/funct7 usando a tabela compilada:
+    - codificação listada no CSV   -> bits relevantes iguais à tabela (X = don't care)
+    - opcode ausente do CSV        -> decoder ocioso (todas as saídas em 0)
+    - opcode conhecido, funct fora -> comportamento livre; só é contabilizado no log
+    """
+    table = decode_table.load()
+    known_opcodes = {i >> 10 for i in range(decode_table.ENTRIES) if table.row[i] >= 0}
+
+    ports = [getattr(dut, port) for _col, port, _w in decode_table.FIELDS]
+    offsets = decode_table.OFFSETS
+    settle = Timer(1, units="ns")
+
+    errors = []
+    checked = idle = unlisted = unlisted_we = 0
+    for opcode in range(128):
+        dut.opcode.value = opcode
+        for funct3 in range(8):
+            dut.funct3.value = funct3
+            for funct7 in range(128):
+                dut.funct7.value = funct7
+                await settle
+
+                got = 0
+                for sig, off in zip(ports, offsets):
+                    got |= int(sig.value) << off
+
+                entry = table.lookup(opcode, funct3, funct7)
+                if entry is not None:
+                    value, care, name = entry
+                    checked += 1
+                    if (got ^ value) & care:
+                        errors.append((name, opcode, funct3, funct7, value, care, got))
+                elif opcode not in known_opcodes:
+                    idle += 1
+                    if got:
+                        errors.append(("<ilegal>", opcode, funct3, funct7, 0, ~0, got))
+                else:
+                    unlisted += 1
+                    fields = decode_table.unpack(got)
+                    unlisted_we += bool(fields["weReg"] or fields["weRAM"])
+
+    if errors:
+        lines = [f"{len(errors)} codificações divergentes; primeiras:"]
+        for name, opcode, funct3, funct7, value, care, got in errors[:8]:
+            exp, obt = decode_table.unpack(value), decode_table.unpack(got)
+            diff = {k: (exp[k], obt[k]) for k in exp
+                    if exp[k] != obt[k] and decode_table.unpack(care)[k]}
+            lines.append(f"  {name} opcode={opcode:07b} funct3={funct3:03b} funct7={funct7:07b} "
+                         f"(esperado, obtido)={diff}")
+        raise AssertionError("\n".join(lines))
+
+    dut._log.info(
+        f"Varredura exaustiva OK: {checked} listadas, {idle} ociosas; "
+        f"{unlisted} não listadas em opcodes conhecidos ({unlisted_we} com weReg/weRAM ativo)")
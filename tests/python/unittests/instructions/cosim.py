@@ -0,0 +1,48 @@
+import os
+from pathlib import Path
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import ClockCycles
+
+from tests.python.utils.cosim import LockstepChecker
+from tests.python.utils.hazards import HazardMonitor, print_report
+
+
+@cocotb.test()
+async def test_cosim_lockstep(dut):
+    """Roda o programa de ROM_FILE e compara cada escrita no RegFile/RAM com o ISS."""
+
+    max_cycles = int(os.environ.get("COSIM_MAX_CYCLES", "20000"))
+
+    cocotb.start_soon(Clock(dut.CLK, 10, units="ns").start())
+    dut.reset.value = 1
+    await ClockCycles(dut.CLK, 6)
+    dut.reset.value = 0
+
+    checker = LockstepChecker(dut).start()
+    try:
+        hazards = HazardMonitor(dut).start()
+    except AttributeError as e:
+        # o core de 3 estágios não tem os sinais de stall/flush do pipeline
+        dut._log.info(f"sem relatório de hazards: {e}")
+        hazards = None
+
+    # roda até o modelo parar e o core ter efetuado todas as escritas previstas
+    for _ in range(0, max_cycles, 64):
+        await ClockCycles(dut.CLK, 64)
+        if checker.error:
+            break
+        if checker.iss.halted and not checker.expected_reg and not checker.expected_mem:
+            await ClockCycles(dut.CLK, 64)  # escritas atrasadas no pipeline
+            break
+
+    if hazards is not None:
+        hazards.stop()
+        program = os.environ.get("ROM_FILE")
+        # trace dos sinais de stall/flush ao lado do results.xml (python -m tests.python.utils.hazards)
+        out_dir = Path(os.environ.get("COCOTB_RESULTS_FILE", "results.xml")).parent
+        hazards.save(os.environ.get("HAZARD_TRACE", out_dir / "hazards.json"), program=program)
+        print_report(hazards.summary(program))
+
+    await checker.finish()
@@ -1,5 +1,5 @@
 import cocotb
-from cocotb.triggers import Timer
+from tests.python.utils.driver import CoreDriver
 
 def sext(val, bits):
     mask = (1 << bits) - 1
@@ -15,19 +15,13 @@ async def test_branches(dut):
     # offset usado nos branches = 8 bytes (2 instruções à frente)
     offset = sext(8, 13)
 
-    dut.CLK.value = 0
-    await Timer(10, units="ns")
+    drv = CoreDriver(dut, sample="rising")
+    await drv.start(delay_ns=10, module=__name__)
 
     # Helper: executa uma instrução e retorna PC
     async def step():
         pc = int(dut.core.pc_if_out.value)
-        dut.CLK.value = 1; await Timer(5, units="ns")
-        dut.CLK.value = 0; await Timer(10, units="ns")
-        dut.CLK.value = 1; await Timer(10, units="ns")
-        dut.CLK.value = 0; await Timer(10, units="ns")
-        dut.CLK.value = 1; await Timer(10, units="ns")
-        dut.CLK.value = 0; await Timer(10, units="ns")
-        dut.CLK.value = 1; await Timer(5, units="ns")
+        await drv.step()
         return pc
 
     await step() # x1 = 5
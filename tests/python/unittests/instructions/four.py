@@ -1,5 +1,5 @@
 import cocotb
-from cocotb.triggers import Timer
+from tests.python.utils.driver import CoreDriver
 
 def sext(val, bits):
     """Extensão de sinal."""
@@ -12,20 +12,14 @@ def sext(val, bits):
 @cocotb.test()
 async def test_jal(dut):
 
-    dut.CLK.value = 0
-    await Timer(10, units="ns")
+    drv = CoreDriver(dut)
+    await drv.start(delay_ns=10, module=__name__)
 
-    async def step():
-        for i in range (3):
-            dut.CLK.value = 1
-            await Timer(10, units="ns")
-            dut.CLK.value = 0
-            await Timer(10, units="ns")
     """Testa apenas JAL verificando PC_out e registrador de retorno."""
 
     # ====== Executa JAL ======
     pc_before = int(dut.core.pc_if_out.value)  # PC onde JAL está
-    await step()
+    await drv.step()
     pc_after = int(dut.core.pc_if_out.value)   # PC após salto
 
     # Cálculo esperado
@@ -39,11 +33,11 @@ async def test_jal(dut):
 
     # ====== Executa ADD que expõe registrador de retorno (x6 = x5) ======
     # executa ADD saída da ALU com x6 = x5
-    await step()
+    await drv.step()
     reg_val = int(dut.core.alu_out_idexmem.value)    
 
     # EXECUTA JALR
-    await step()
+    await drv.step()
     pc = int(dut.core.pc_if_out.value)
 
     # esperado: voltar para endereço salvo em x5 (reg_val), alinhado
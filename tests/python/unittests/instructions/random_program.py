@@ -0,0 +1,63 @@
+import os
+import json
+from pathlib import Path
+
+import cocotb
+from cocotb.result import SimTimeoutError
+
+from tests.python.utils.driver import CoreDriver, DRAIN_CYCLES
+from tests.python.utils.backdoor import ram
+from tests.python.utils.rvgen import RESULT_ADDR, PASS_MAGIC, FAIL_MAGIC
+
+POLL_CYCLES = 256           # ciclos entre leituras da palavra de resultado
+
+
+@cocotb.test()
+async def test_random_program(dut):
+    """
+    Programa gerado pelo rvgen (ROM_FILE): espera PASS_MAGIC ou FAIL_MAGIC em
+    RESULT_ADDR lendo a RAM pelo backdoor e confere os bytes do gabarito NOME.json.
+    """
+    max_cycles = int(os.environ.get("RANDOM_MAX_CYCLES", "100000"))
+    rom_file = Path(os.environ.get("ROM_FILE", ""))
+
+    drv = CoreDriver(dut, sample="rising")
+    await drv.start(delay_ns=10)
+
+    mem = ram(dut)
+    result = mem.elems[RESULT_ADDR // 4]
+
+    def read_result():
+        v = result.value
+        return int(v) if v.is_resolvable else None
+
+    while read_result() not in (PASS_MAGIC, FAIL_MAGIC):
+        if drv.cycles >= max_cycles:
+            raise SimTimeoutError(f"{rom_file.name}: nada em 0x{RESULT_ADDR:X} após {max_cycles} ciclos")
+        await drv.step(POLL_CYCLES)
+    await drv.step(DRAIN_CYCLES)
+
+    words = mem.read()
+    # dump ao lado do results.xml da suíte, para comparar com o NOME.json à mão
+    out_dir = Path(os.environ.get("COCOTB_RESULTS_FILE", "results.xml")).parent
+    mem.dump(out_dir / "ram_final.hex")
+
+    code = read_result()
+    assert code == PASS_MAGIC, (
+        f"{rom_file.name}: auto-verificação falhou no core "
+        f"(0x{RESULT_ADDR:X} = 0x{code:08X}, PASS = 0x{PASS_MAGIC:08X})")
+
+    golden_path = rom_file.with_suffix(".json")
+    if golden_path.exists():
+        errors = []
+        for addr_s, want in json.loads(golden_path.read_text()).items():
+            addr = int(addr_s, 16)
+            word = words[addr // 4]
+            got = None if word is None else (word >> (8 * (addr % 4))) & 0xFF
+            if got != want:
+                errors.append(f"0x{addr:08x}: esperado 0x{want:02x}, obtido "
+                              f"{'X' if got is None else f'0x{got:02x}'}")
+        assert not errors, (f"{len(errors)} byte(s) da RAM diferentes de {golden_path.name}:\n  "
+                            + "\n  ".join(errors[:20]))
+
+    dut._log.info(f"{rom_file.name}: PASS em {drv.cycles} ciclos")
@@ -0,0 +1,178 @@
+"""
+backdoor.py — leitura e escrita em bloco das memórias do core pelo VPI, sem simular
+instruções.
+
+Os testes de instrução conferiam o estado final executando 'add t3, reg, x0' para
+expor cada registrador na saída da ALU e lendo sinais a cada step. Aqui o array
+inteiro (mem do RAM_simulation, registers do RegFile) é lido ou escrito numa única
+passada pelos elementos, no mesmo instante de simulação, com os handles de cada
+elemento criados uma vez só.
+
+  ArrayBackdoor   array VHDL qualquer (índices do VHDL: registers vai de 1 a 31)
+  rom(dut)        memROM do ROM_simulation (dut.ROM ou o próprio toplevel)
+  ram(dut)        mem do RAM_simulation (dut.RAM ou o próprio toplevel)
+  regfile(dut)    registers do RegFile (CORE.u_regfile, CORE.RegFile ou o toplevel)
+  check_state()   compara registradores e RAM com o esperado de uma vez e falha
+                  com todas as diferenças numa só mensagem
+  program_words() palavras da ROM de um .hex/.bin/.elf ou .S (montado pelo rvasm)
+  shared_program  programa do módulo de teste numa simulação compartilhada
+                  (runner.py --shared-sim, variável ROM_PROGRAMS)
+
+Escritas usam setimmediatevalue: valem na hora e ficam até o hardware escrever de
+novo no elemento. O RegFile zera tudo durante o reset, então pré-carregue depois dele.
+
+Uso:
+  rf, mem = regfile(dut), ram(dut)
+  mem.load("dados.hex")                       # mesmo formato do RAM_FILE
+  ...
+  check_state(dut, regs={3: 0xAABBCCDD}, mem={3: 0xAABBCCDD})
+  mem.dump("ram_final.hex")
+"""
+import os
+import json
+from pathlib import Path
+
+if __package__ in (None, ""):
+    from tests.python.utils.cosim import find_child
+    from tests.python.utils.images import read_hex, load_program
+    from tests.python.utils.rvasm import assemble_file
+else:
+    from .cosim import find_child
+    from .images import read_hex, load_program
+    from .rvasm import assemble_file
+
+MASK32 = 0xFFFFFFFF
+
+
+class ArrayBackdoor:
+    """
+    handle : array de vetores (ex.: dut.RAM.mem)
+    first  : menor índice do array no VHDL (padrão: o do próprio handle)
+    """
+
+    def __init__(self, handle, first: int = None):
+        self.handle = handle
+        rng = getattr(handle, "_range", None)
+        self.first = first if first is not None else (min(rng) if rng else 0)
+        self._elems = None
+
+    @property
+    def elems(self) -> list:
+        """Handles dos elementos em ordem crescente de índice (criados na primeira vez)."""
+        if self._elems is None:
+            rng = self.handle._range
+            lo, hi = min(rng), max(rng)
+            self._elems = [self.handle[i] for i in range(lo, hi + 1)]
+        return self._elems
+
+    def __len__(self):
+        return len(self.elems)
+
+    def read(self) -> list:
+        """Valores inteiros, do menor índice ao maior (None se houver X/U/Z)."""
+        out = []
+        for h in self.elems:
+            v = h.value
+            out.append(int(v) if v.is_resolvable else None)
+        return out
+
+    def write(self, values, start: int = None):
+        """Escreve values a partir do índice VHDL 'start' (padrão: o primeiro)."""
+        base = (self.first if start is None else start) - self.first
+        elems = self.elems
+        if base < 0 or base + len(values) > len(elems):
+            raise IndexError(f"{self.handle._name}: {len(values)} palavras a partir de {start} "
+                             f"não cabem em {len(elems)} posições")
+        for h, v in zip(elems[base:], values):
+            h.setimmediatevalue(v & MASK32)
+
+    def fill(self, value: int = 0):
+        self.write([value] * len(self.elems))
+
+    def load(self, path, start: int = None):
+        """Carrega um .hex (uma palavra por linha, o formato do RAM_FILE/ROM_FILE)."""
+        self.write(read_hex(path), start)
+
+    def dump(self, path):
+        """Grava o array no formato do .hex; X/U/Z saem como XXXXXXXX."""
+        lines = ("XXXXXXXX" if v is None else f"{v:08X}" for v in self.read())
+        Path(path).write_text("\n".join(lines) + "\n")
+
+
+def _instance(dut, name):
+    try:
+        return find_child(dut, name)
+    except AttributeError:
+        return dut
+
+
+def rom(dut) -> ArrayBackdoor:
+    """memROM do ROM_simulation: dut.ROM no rv32i3stage_core_sim_test ou o próprio toplevel."""
+    return ArrayBackdoor(find_child(_instance(dut, "ROM"), "memROM"), first=0)
+
+
+def ram(dut) -> ArrayBackdoor:
+    """mem do RAM_simulation: dut.RAM no rv32i3stage_core_sim_test ou o próprio toplevel."""
+    return ArrayBackdoor(find_child(_instance(dut, "RAM"), "mem"), first=0)
+
+
+def regfile(dut) -> ArrayBackdoor:
+    """registers (x1..x31) do RegFile, no core do sim_test (os dois cores) ou no toplevel."""
+    inst = dut
+    try:
+        core = find_child(dut, "CORE")
+        inst = find_child(core, "u_regfile", "RegFile")
+    except AttributeError:
+        pass
+    return ArrayBackdoor(find_child(inst, "registers"), first=1)
+
+
+def program_words(path) -> list:
+    """Palavras da ROM a partir do endereço 0; fontes .S passam pelo rvasm (com cache)."""
+    path = Path(path)
+    if path.suffix.lower() in (".s", ".asm"):
+        path = assemble_file(path)
+    return load_program(path)[0]
+
+
+def shared_program(module: str):
+    """
+    Programa de 'module' quando o runner junta várias suítes numa só simulação
+    (ROM_PROGRAMS = {módulo de teste: programa}); None fora desse modo.
+    """
+    programs = os.environ.get("ROM_PROGRAMS")
+    if not programs:
+        return None
+    return json.loads(programs).get(module)
+
+
+def read_regs(dut) -> list:
+    """x0..x31 (x0 sempre 0), lidos numa passada."""
+    return [0] + regfile(dut).read()
+
+
+def diff_state(actual: dict, expected: dict, name: str, fmt=lambda k: f"[{k}]") -> list:
+    """Diferenças entre {índice: valor} esperado e obtido; None no obtido é X/U/Z."""
+    out = []
+    for k, want in sorted(expected.items()):
+        got = actual.get(k)
+        if got is None or got != want & MASK32:
+            shown = "X" if got is None else f"0x{got:08x}"
+            out.append(f"{name}{fmt(k)}: esperado 0x{want & MASK32:08x}, obtido {shown}")
+    return out
+
+
+def check_state(dut, regs: dict = None, mem: dict = None):
+    """
+    Compara o estado final com o esperado numa leitura em bloco de cada array.
+    regs: {número do registrador: valor}; mem: {índice de palavra: valor}.
+    """
+    errors = []
+    if regs:
+        values = read_regs(dut)
+        errors += diff_state(dict(enumerate(values)), regs, "x", fmt=str)
+    if mem:
+        values = ram(dut).read()
+        errors += diff_state(dict(enumerate(values)), mem, "mem")
+    if errors:
+        raise AssertionError(f"{len(errors)} diferença(s) no estado final:\n  " + "\n  ".join(errors))
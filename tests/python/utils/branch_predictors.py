@@ -0,0 +1,315 @@
+"""
+branch_predictors.py — simulador de preditores de desvio dirigido por trace.
+
+O programa roda uma vez no ISS; o fluxo de desvios (PC, tipo, tomado, alvo) é
+guardado e reaplicado em cada configuração de preditor:
+  none       core atual: sempre "não tomado", todo desvio tomado paga o flush
+             (sem BTB é exatamente o flush_cycles do pipeline_model)
+  btfn       estático: backward taken / forward not taken
+  bht1:N     tabela de N entradas de 1 bit (último resultado)
+  bht2:N     tabela de N contadores saturados de 2 bits
+  gshare:H:N contadores de 2 bits indexados por PC xor histórico global de H bits
+cada um combinado com um BTB direto de E entradas (--btb, 0 = sem BTB).
+
+Penalidades (em ciclos, mesmo modelo do pipeline_model):
+  predição errada                                 -> --mispredict (2: desvio resolvido em EX)
+  tomado previsto certo, alvo no BTB              -> 0
+  tomado previsto certo, sem alvo (BTB miss/sem)  -> --no-target (1: redireciona no ID;
+                                                     JALR só tem alvo em EX -> --mispredict)
+
+CPI projetado = (ciclos do pipeline_model sem os flushes + penalidades) / instruções.
+
+Uso:
+  python3 -m tests.python.utils.branch_predictors tests/FPGA/core/asm_tests/full.elf \\
+      --predictors none,btfn,bht2:64,gshare:6:256 --btb 0,16,64 --output /tmp/bp.json
+"""
+import sys
+import json
+import argparse
+from pathlib import Path
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+    from tests.python.utils.rv32im_iss import from_image
+    from tests.python.utils.pipeline_model import PipelineStats, BRANCH_PENALTY
+    from tests.python.utils.encoding import OP_BRANCH, OP_JAL, OP_JALR
+else:
+    from .rv32im_iss import from_image
+    from .pipeline_model import PipelineStats, BRANCH_PENALTY
+    from .encoding import OP_BRANCH, OP_JAL, OP_JALR
+
+BRANCH, JAL, JALR = "branch", "jal", "jalr"
+
+
+def _pow2(n: int, what: str) -> int:
+    if n <= 0 or n & (n - 1):
+        raise ValueError(f"{what} deve ser potência de 2 (recebido {n})")
+    return n
+
+
+# ===========================================================================
+# Preditores de direção
+# ===========================================================================
+
+class Predictor:
+    """Interface: predict(pc, target) -> bool (tomado); update(pc, taken)."""
+    name = "?"
+    # redireciona no ID um tomado previsto sem alvo no BTB (False = só em EX, como o core atual)
+    decode_redirect = True
+
+    def predict(self, pc: int, target: int) -> bool:
+        raise NotImplementedError
+
+    def update(self, pc: int, taken: bool):
+        pass
+
+
+class NotTaken(Predictor):
+    name = "none"
+    decode_redirect = False
+
+    def predict(self, pc, target):
+        return False
+
+
+class BTFN(Predictor):
+    name = "btfn"
+
+    def predict(self, pc, target):
+        return target < pc
+
+
+class BHT1(Predictor):
+    def __init__(self, entries: int = 64):
+        self.mask = _pow2(entries, "bht1") - 1
+        self.table = bytearray(entries)
+        self.name = f"bht1:{entries}"
+
+    def predict(self, pc, target):
+        return bool(self.table[(pc >> 2) & self.mask])
+
+    def update(self, pc, taken):
+        self.table[(pc >> 2) & self.mask] = taken
+
+
+class BHT2(Predictor):
+    """Contadores saturados de 2 bits, iniciados em 1 (fracamente não tomado)."""
+
+    def __init__(self, entries: int = 64):
+        self.mask = _pow2(entries, "bht2") - 1
+        self.table = bytearray([1]) * entries
+        self.name = f"bht2:{entries}"
+
+    def _index(self, pc):
+        return (pc >> 2) & self.mask
+
+    def predict(self, pc, target):
+        return self.table[self._index(pc)] >= 2
+
+    def update(self, pc, taken):
+        i = self._index(pc)
+        c = self.table[i]
+        self.table[i] = min(c + 1, 3) if taken else max(c - 1, 0)
+
+
+class Gshare(BHT2):
+    def __init__(self, history: int = 8, entries: int = 256):
+        super().__init__(entries)
+        self.hmask = (1 << history) - 1
+        self.ghr = 0
+        self.name = f"gshare:{history}:{entries}"
+
+    def _index(self, pc):
+        return ((pc >> 2) ^ self.ghr) & self.mask
+
+    def update(self, pc, taken):
+        super().update(pc, taken)
+        self.ghr = ((self.ghr << 1) | taken) & self.hmask
+
+
+class BTB:
+    """BTB direto: entries x (tag = PC, alvo)."""
+
+    def __init__(self, entries: int):
+        self.entries = entries
+        self.mask = _pow2(entries, "btb") - 1 if entries else 0
+        self.tags = [None] * entries
+        self.targets = [0] * entries
+
+    def lookup(self, pc: int):
+        if not self.entries:
+            return None
+        i = (pc >> 2) & self.mask
+        return self.targets[i] if self.tags[i] == pc else None
+
+    def update(self, pc: int, target: int):
+        if self.entries:
+            i = (pc >> 2) & self.mask
+            self.tags[i] = pc
+            self.targets[i] = target
+
+
+def make_predictor(spec: str) -> Predictor:
+    """'none' | 'btfn' | 'bht1:N' | 'bht2:N' | 'gshare:H:N'"""
+    kind, *args = spec.strip().lower().split(":")
+    try:
+        nums = [int(a, 0) for a in args]
+        if kind == "none" and not nums:
+            return NotTaken()
+        if kind == "btfn" and not nums:
+            return BTFN()
+        if kind == "bht1" and len(nums) <= 1:
+            return BHT1(*nums)
+        if kind == "bht2" and len(nums) <= 1:
+            return BHT2(*nums)
+        if kind == "gshare" and len(nums) <= 2:
+            return Gshare(*nums)
+    except ValueError as e:
+        raise ValueError(f"preditor '{spec}': {e}") from None
+    raise ValueError(f"preditor desconhecido: '{spec}' (use none, btfn, bht1:N, bht2:N, gshare:H:N)")
+
+
+# ===========================================================================
+# Trace e simulação
+# ===========================================================================
+
+class BranchTrace:
+    """Fluxo de desvios de um programa + estatísticas do pipeline para o CPI."""
+
+    def __init__(self, program, events, stats: PipelineStats, halted):
+        self.program = str(program)
+        self.events = events            # [(pc, tipo, tomado, alvo)]
+        self.stats = stats
+        self.halted = halted
+
+
+def collect(image, ram_words: int = 4096, max_steps: int = 10_000_000) -> BranchTrace:
+    cpu = from_image(image, ram_words=ram_words)
+    stats = PipelineStats()
+    events = []
+    for r in cpu.iter_trace(max_steps):
+        stats.feed(r)
+        op = r.insn & 0x7F
+        if op == OP_BRANCH:
+            insn = r.insn
+            # alvo do branch mesmo quando não tomado (o BTFN olha a direção)
+            imm = ((insn >> 31) & 1) << 12 | ((insn >> 7) & 1) << 11 | \
+                  ((insn >> 25) & 0x3F) << 5 | ((insn >> 8) & 0xF) << 1
+            if imm & 0x1000:
+                imm -= 0x2000
+            target = (r.pc + imm) & 0xFFFFFFFF
+            events.append((r.pc, BRANCH, r.next_pc == target and target != r.pc + 4, target))
+        elif op == OP_JAL:
+            events.append((r.pc, JAL, True, r.next_pc))
+        elif op == OP_JALR:
+            events.append((r.pc, JALR, True, r.next_pc))
+    return BranchTrace(image, events, stats, cpu.halted or "max-steps")
+
+
+def simulate(trace: BranchTrace, predictor: Predictor, btb_entries: int = 0,
+             mispredict: int = BRANCH_PENALTY, no_target: int = 1) -> dict:
+    btb = BTB(btb_entries)
+    if not predictor.decode_redirect:
+        no_target = mispredict
+    branches = taken = wrong = 0
+    btb_lookups = btb_hits = 0
+    penalty = 0
+
+    for pc, kind, is_taken, target in trace.events:
+        cached = btb.lookup(pc)
+        btb_lookups += 1
+        if cached is not None:
+            btb_hits += 1
+
+        if kind == BRANCH:
+            branches += 1
+            taken += is_taken
+            guess = predictor.predict(pc, target)
+            predictor.update(pc, is_taken)
+            if guess != is_taken:
+                wrong += 1
+                penalty += mispredict
+            elif is_taken:
+                penalty += 0 if cached == target else no_target
+        elif kind == JAL:
+            penalty += 0 if cached == target else no_target
+        else:
+            # JALR: alvo vem de registrador; sem BTB certo só se resolve em EX
+            penalty += 0 if cached == target else mispredict
+
+        if is_taken:
+            btb.update(pc, target)
+
+    s = trace.stats
+    base_cycles = s.cycles - s.flush_cycles
+    cycles = base_cycles + penalty
+    return {
+        "predictor": predictor.name,
+        "btb_entries": btb_entries,
+        "branches": branches,
+        "taken": taken,
+        "mispredicted": wrong,
+        "mispredict_rate": round(wrong / branches, 4) if branches else None,
+        "btb_hit_rate": round(btb_hits / btb_lookups, 4) if btb_entries and btb_lookups else None,
+        "penalty_cycles": penalty,
+        "cycles": cycles,
+        "cpi": round(cycles / s.instructions, 3) if s.instructions else None,
+    }
+
+
+def sweep(trace: BranchTrace, predictor_specs, btb_sizes, **penalties) -> list:
+    return [simulate(trace, make_predictor(spec), btb, **penalties)
+            for spec in predictor_specs for btb in btb_sizes]
+
+
+def print_table(trace: BranchTrace, rows):
+    s = trace.stats
+    print(f"\n{Path(trace.program).name}: {s.instructions} instruções, "
+          f"{sum(1 for e in trace.events if e[1] == BRANCH)} branches, "
+          f"{sum(1 for e in trace.events if e[1] != BRANCH)} jumps ({trace.halted})")
+    print(f"  {'preditor':<16}{'BTB':>5}{'erro %':>9}{'BTB hit %':>11}{'penal.':>8}{'ciclos':>9}{'CPI':>8}")
+    for r in rows:
+        rate = f"{100 * r['mispredict_rate']:.1f}" if r["mispredict_rate"] is not None else "-"
+        hit = f"{100 * r['btb_hit_rate']:.1f}" if r["btb_hit_rate"] is not None else "-"
+        print(f"  {r['predictor']:<16}{r['btb_entries']:>5}{rate:>9}{hit:>11}"
+              f"{r['penalty_cycles']:>8}{r['cycles']:>9}{r['cpi']:>8}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Simulador de preditores de desvio sobre traces do ISS")
+    p.add_argument("images", nargs="+", help="Programas (.elf, .hex ou .bin)")
+    p.add_argument("--predictors", default="none,btfn,bht1:64,bht2:64,gshare:8:256",
+                   help="Lista separada por vírgula (none, btfn, bht1:N, bht2:N, gshare:H:N)")
+    p.add_argument("--btb", default="0,16,64", help="Tamanhos de BTB (entradas, potência de 2; 0 = sem)")
+    p.add_argument("--mispredict", type=int, default=BRANCH_PENALTY, help="Ciclos por predição errada")
+    p.add_argument("--no-target", type=int, default=1, help="Ciclos de um tomado previsto sem alvo no BTB")
+    p.add_argument("--ram-words", type=int, default=4096)
+    p.add_argument("--max-steps", type=int, default=10_000_000)
+    p.add_argument("--output", metavar="ARQ", help="Grava os resultados em JSON")
+    args = p.parse_args()
+
+    specs = [s for s in args.predictors.split(",") if s.strip()]
+    try:
+        btbs = [int(b, 0) for b in args.btb.split(",") if b.strip()]
+        for spec in specs:
+            make_predictor(spec)
+        for b in btbs:
+            BTB(b)
+    except ValueError as e:
+        p.error(str(e))
+
+    out = []
+    for image in args.images:
+        trace = collect(image, args.ram_words, args.max_steps)
+        rows = sweep(trace, specs, btbs, mispredict=args.mispredict, no_target=args.no_target)
+        print_table(trace, rows)
+        out.append({"program": trace.program, "instructions": trace.stats.instructions,
+                    "halted": trace.halted, "results": rows})
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(out, indent=2) + "\n")
+        print(f"\nResultados JSON salvos em: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+cache_sim.py — simulador de caches de instrução e de dados dirigido por trace.
+
+Os fluxos de endereços vêm do ISS (imagem .elf/.hex/.bin) ou de um trace JSON
+lines no formato do Retire.to_dict (rv32im_iss --trace, ou um dump da
+simulação com os mesmos campos pc/mem). Cada configuração é aplicada ao fluxo
+de busca (I-cache) e ao de load/store (D-cache) e o relatório traz taxa de
+acerto, write-backs e tempo médio de acesso (AMAT) por programa.
+
+Configuração de cache: TAMANHO:VIAS:LINHA[:POLÍTICA]
+  TAMANHO  bytes (aceita sufixo k), VIAS associatividade, LINHA bytes por linha
+  POLÍTICA lru (padrão) | fifo | random
+  ex.: 1k:1:16 (direto), 4k:2:16:lru, 8k:4:32:fifo
+
+Memória externa (SDRAM): uma falta custa --mem-latency ciclos para a primeira
+palavra + --mem-burst por palavra seguinte da linha.
+  AMAT = hit_time + taxa_de_falta x penalidade_de_falta
+Sem cache ("none") cada acesso paga --mem-latency.
+
+Uso:
+  python3 -m tests.python.utils.cache_sim tests/FPGA/core/asm_tests/full.elf \\
+      --icache none,512:1:16,2k:2:16 --dcache none,1k:2:16 --mem-latency 10 --output /tmp/cache.json
+"""
+import sys
+import json
+import random
+import argparse
+from pathlib import Path
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+    from tests.python.utils.rv32im_iss import from_image
+else:
+    from .rv32im_iss import from_image
+
+POLICIES = ("lru", "fifo", "random")
+
+
+def _size(text: str) -> int:
+    text = text.strip().lower()
+    if text.endswith("k"):
+        return int(text[:-1], 0) * 1024
+    return int(text, 0)
+
+
+def _pow2(n: int, what: str) -> int:
+    if n <= 0 or n & (n - 1):
+        raise ValueError(f"{what} deve ser potência de 2 (recebido {n})")
+    return n
+
+
+class CacheConfig:
+    def __init__(self, size: int, ways: int, line: int, policy: str = "lru", write_back: bool = True):
+        self.size = _pow2(size, "tamanho")
+        self.ways = _pow2(ways, "vias")
+        self.line = _pow2(line, "linha")
+        if line < 4:
+            raise ValueError("linha deve ter pelo menos 4 bytes")
+        if size < ways * line:
+            raise ValueError(f"cache de {size} B não comporta {ways} vias de {line} B")
+        if policy not in POLICIES:
+            raise ValueError(f"política desconhecida: '{policy}' (use {', '.join(POLICIES)})")
+        self.policy = policy
+        self.write_back = write_back
+        self.sets = size // (ways * line)
+
+    @classmethod
+    def parse(cls, spec: str, write_back: bool = True):
+        """'4k:2:16:lru' -> CacheConfig; 'none' -> None (sem cache)."""
+        if spec.strip().lower() == "none":
+            return None
+        parts = spec.strip().lower().split(":")
+        if len(parts) not in (3, 4):
+            raise ValueError(f"cache '{spec}': use TAMANHO:VIAS:LINHA[:POLÍTICA]")
+        try:
+            return cls(_size(parts[0]), int(parts[1], 0), int(parts[2], 0),
+                       parts[3] if len(parts) == 4 else "lru", write_back)
+        except ValueError as e:
+            raise ValueError(f"cache '{spec}': {e}") from None
+
+    @property
+    def name(self) -> str:
+        size = f"{self.size // 1024}k" if self.size % 1024 == 0 else str(self.size)
+        return f"{size}:{self.ways}:{self.line}:{self.policy}"
+
+
+class Cache:
+    """
+    Cache associativa por conjunto. Cada conjunto é uma lista de tags em ordem de
+    substituição (a primeira é a vítima): LRU move a tag para o fim a cada acerto,
+    FIFO só na inserção.
+    """
+
+    def __init__(self, cfg: CacheConfig, seed: int = 1):
+        self.cfg = cfg
+        self.sets = [[] for _ in range(cfg.sets)]
+        self.dirty = [set() for _ in range(cfg.sets)]
+        self.offset_bits = cfg.line.bit_length() - 1
+        self.set_mask = cfg.sets - 1
+        self.rng = random.Random(seed)
+        self.reads = self.writes = 0
+        self.read_misses = self.write_misses = 0
+        self.writebacks = 0
+        self.write_throughs = 0
+
+    def access(self, addr: int, write: bool = False) -> bool:
+        """True = acerto."""
+        cfg = self.cfg
+        block = addr >> self.offset_bits
+        idx = block & self.set_mask
+        ways = self.sets[idx]
+        if write:
+            self.writes += 1
+        else:
+            self.reads += 1
+
+        if block in ways:
+            if cfg.policy == "lru":
+                ways.remove(block)
+                ways.append(block)
+            if write:
+                if cfg.write_back:
+                    self.dirty[idx].add(block)
+                else:
+                    self.write_throughs += 1
+            return True
+
+        if write:
+            self.write_misses += 1
+            if not cfg.write_back:
+                # write-through sem alocação: escreve direto na memória
+                self.write_throughs += 1
+                return False
+        else:
+            self.read_misses += 1
+
+        if len(ways) >= cfg.ways:
+            victim = ways.pop(self.rng.randrange(len(ways)) if cfg.policy == "random" else 0)
+            if victim in self.dirty[idx]:
+                self.dirty[idx].discard(victim)
+                self.writebacks += 1
+        ways.append(block)
+        if write:
+            self.dirty[idx].add(block)
+        return False
+
+    @property
+    def accesses(self) -> int:
+        return self.reads + self.writes
+
+    @property
+    def misses(self) -> int:
+        return self.read_misses + self.write_misses
+
+
+class Timing:
+    def __init__(self, hit_time: int = 1, mem_latency: int = 10, mem_burst: int = 1):
+        self.hit_time = hit_time
+        self.mem_latency = mem_latency
+        self.mem_burst = mem_burst
+
+    def miss_penalty(self, line: int) -> int:
+        return self.mem_latency + (line // 4 - 1) * self.mem_burst
+
+
+def report(cache: Cache, n_uncached: int, timing: Timing) -> dict:
+    """Estatísticas de uma cache (ou do acesso direto, se cache for None)."""
+    if cache is None:
+        return {"config": "none", "accesses": n_uncached, "hit_rate": None,
+                "amat": float(timing.mem_latency), "memory_cycles": n_uncached * timing.mem_latency}
+    n = cache.accesses
+    penalty = timing.miss_penalty(cache.cfg.line)
+    # write-back: uma linha suja volta para a memória com o mesmo custo de uma falta;
+    # write-through: falta de escrita não traz a linha, cada escrita paga uma palavra
+    fills = cache.misses if cache.cfg.write_back else cache.read_misses
+    mem_cycles = n * timing.hit_time + (fills + cache.writebacks) * penalty + \
+        cache.write_throughs * timing.mem_latency
+    return {
+        "config": cache.cfg.name,
+        "write_policy": "write-back" if cache.cfg.write_back else "write-through",
+        "accesses": n,
+        "reads": cache.reads,
+        "writes": cache.writes,
+        "misses": cache.misses,
+        "read_misses": cache.read_misses,
+        "write_misses": cache.write_misses,
+        "writebacks": cache.writebacks,
+        "hit_rate": round(1 - cache.misses / n, 4) if n else None,
+        "miss_penalty": penalty,
+        "amat": round(mem_cycles / n, 3) if n else None,
+        "memory_cycles": mem_cycles,
+    }
+
+
+# ===========================================================================
+# Fluxos de endereços
+# ===========================================================================
+
+class AddressStreams:
+    def __init__(self, program, fetch, data, halted=None):
+        self.program = str(program)
+        self.fetch = fetch          # [PC] na ordem de execução
+        self.data = data            # [(endereço, escrita?)]
+        self.halted = halted
+
+
+def streams_from_iss(image, ram_words: int = 4096, max_steps: int = 10_000_000) -> AddressStreams:
+    cpu = from_image(image, ram_words=ram_words)
+    fetch, data = [], []
+    for r in cpu.iter_trace(max_steps):
+        fetch.append(r.pc)
+        if r.mem_op:
+            data.append((r.mem_addr, r.mem_op == "S"))
+    return AddressStreams(image, fetch, data, cpu.halted or "max-steps")
+
+
+def streams_from_jsonl(path) -> AddressStreams:
+    """Trace JSON lines (uma instrução por linha: pc e, opcionalmente, mem.op/mem.addr)."""
+    fetch, data = [], []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            fetch.append(rec["pc"])
+            mem = rec.get("mem")
+            if mem:
+                data.append((mem["addr"], mem["op"] == "S"))
+    return AddressStreams(path, fetch, data, "trace")
+
+
+def load_streams(path, ram_words=4096, max_steps=10_000_000) -> AddressStreams:
+    if Path(path).suffix.lower() in (".jsonl", ".json", ".trace"):
+        return streams_from_jsonl(path)
+    return streams_from_iss(path, ram_words, max_steps)
+
+
+def run_config(streams: AddressStreams, icfg, dcfg, timing: Timing) -> dict:
+    icache = Cache(icfg) if icfg else None
+    dcache = Cache(dcfg) if dcfg else None
+    if icache:
+        access = icache.access
+        for pc in streams.fetch:
+            access(pc)
+    if dcache:
+        access = dcache.access
+        for addr, write in streams.data:
+            access(addr, write)
+    i = report(icache, len(streams.fetch), timing)
+    d = report(dcache, len(streams.data), timing)
+    total = len(streams.fetch) + len(streams.data)
+    return {
+        "icache": i,
+        "dcache": d,
+        "amat": round((i["memory_cycles"] + d["memory_cycles"]) / total, 3) if total else None,
+    }
+
+
+def print_table(streams: AddressStreams, rows):
+    print(f"\n{Path(streams.program).name}: {len(streams.fetch)} buscas, "
+          f"{len(streams.data)} acessos de dados ({streams.halted})")
+    print(f"  {'I-cache':<18}{'hit %':>8}{'AMAT':>8}   {'D-cache':<18}{'hit %':>8}{'AMAT':>8}{'wb':>6}   {'AMAT total':>10}")
+
+    def pct(v):
+        return f"{100 * v:.2f}" if v is not None else "-"
+
+    def amat(v):
+        return f"{v:.2f}" if v is not None else "-"
+
+    for r in rows:
+        i, d = r["icache"], r["dcache"]
+        print(f"  {i['config']:<18}{pct(i['hit_rate']):>8}{amat(i['amat']):>8}   "
+              f"{d['config']:<18}{pct(d['hit_rate']):>8}{amat(d['amat']):>8}{d.get('writebacks', 0):>6}   "
+              f"{amat(r['amat']):>10}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Simulador de caches I/D sobre traces do ISS ou da simulação")
+    p.add_argument("inputs", nargs="+", help="Programas (.elf/.hex/.bin) ou traces JSON lines (.jsonl)")
+    p.add_argument("--icache", default="none,512:1:16,1k:2:16,4k:4:32",
+                   help="Configurações da I-cache (TAMANHO:VIAS:LINHA[:POLÍTICA], 'none')")
+    p.add_argument("--dcache", default="none,512:1:16,1k:2:16,4k:4:32",
+                   help="Configurações da D-cache (mesmo formato)")
+    p.add_argument("--pair", action="store_true",
+                   help="Usa as listas --icache/--dcache em pares (senão, produto cartesiano)")
+    p.add_argument("--write-through", action="store_true", help="D-cache write-through sem alocação na escrita")
+    p.add_argument("--hit-time", type=int, default=1, help="Ciclos de um acerto")
+    p.add_argument("--mem-latency", type=int, default=10, help="Ciclos até a primeira palavra da memória externa")
+    p.add_argument("--mem-burst", type=int, default=1, help="Ciclos por palavra seguinte da linha")
+    p.add_argument("--ram-words", type=int, default=4096)
+    p.add_argument("--max-steps", type=int, default=10_000_000)
+    p.add_argument("--output", metavar="ARQ", help="Grava os resultados em JSON")
+    args = p.parse_args()
+
+    try:
+        icfgs = [CacheConfig.parse(s) for s in args.icache.split(",") if s.strip()]
+        dcfgs = [CacheConfig.parse(s, write_back=not args.write_through) for s in args.dcache.split(",") if s.strip()]
+    except ValueError as e:
+        p.error(str(e))
+    if args.pair:
+        if len(icfgs) != len(dcfgs):
+            p.error("--pair exige o mesmo número de configurações em --icache e --dcache")
+        combos = list(zip(icfgs, dcfgs))
+    else:
+        combos = [(i, d) for i in icfgs for d in dcfgs]
+    timing = Timing(args.hit_time, args.mem_latency, args.mem_burst)
+
+    out = []
+    for path in args.inputs:
+        streams = load_streams(path, args.ram_words, args.max_steps)
+        rows = [run_config(streams, i, d, timing) for i, d in combos]
+        print_table(streams, rows)
+        out.append({"program": streams.program, "fetches": len(streams.fetch),
+                    "data_accesses": len(streams.data), "halted": streams.halted,
+                    "timing": vars(timing), "results": rows})
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(out, indent=2) + "\n")
+        print(f"\nResultados JSON salvos em: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+cosim.py — checagem em lock-step do core VHDL contra o ISS (rv32im_iss).
+
+Em vez de olhar sinais internos em contagens fixas de passos, o monitor observa
+as duas portas de escrita arquitetural do wrapper de simulação
+(rv32i3stage_core_sim_test ou rv32im_pipeline_core_sim_test):
+
+  - porta de escrita do RegFile  (instância RegFile / u_regfile: we, rd, data_in)
+  - porta de escrita da RAM      (instância RAM: weRAM, addr, mask, data_in)
+
+Cada escrita observada é comparada com a próxima escrita do mesmo tipo prevista
+pelo ISS. A ordem entre os dois tipos não é comparada (num pipeline o store pode
+chegar à RAM antes do write-back de uma instrução anterior). A primeira
+divergência para o teste com um diff curto e as últimas instruções do modelo.
+
+Funciona com os dois cores (3 estágios ou rv32im_pipeline_core), pois só depende
+das instâncias RegFile e RAM, não dos sinais internos do core.
+
+Uso num teste cocotb:
+
+    from tests.python.utils.cosim import LockstepChecker
+
+    checker = LockstepChecker(dut, "codes/build/six.hex")
+    checker.start()
+    ...  # gera clock
+    await checker.finish()
+"""
+import os
+from collections import deque
+
+import cocotb
+from cocotb.triggers import RisingEdge
+
+from .rv32im_iss import from_image, RV32IM
+from .driver import HALT_ADDR
+
+
+class CosimMismatch(AssertionError):
+    pass
+
+
+def find_child(handle, *names):
+    """Primeiro filho existente entre 'names' (o GHDL expõe nomes em minúsculas)."""
+    for name in names:
+        for candidate in (name, name.lower()):
+            try:
+                return getattr(handle, candidate)
+            except AttributeError:
+                continue
+    raise AttributeError(f"{handle._name}: nenhum de {names} encontrado")
+
+
+def image_from_env(default=None):
+    """Caminho do programa do teste (o runner exporta os generics como variáveis de ambiente)."""
+    path = os.environ.get("ROM_FILE", default)
+    if not path:
+        raise RuntimeError("ROM_FILE não definido: passe o programa ao LockstepChecker")
+    return path
+
+
+def _resolved(sig):
+    """Valor inteiro ou None se houver X/U/Z."""
+    v = sig.value
+    return int(v) if v.is_resolvable else None
+
+
+class LockstepChecker:
+    """
+    dut         : handle do wrapper rv32i3stage_core_sim_test
+    program     : imagem (.hex/.bin/.elf) ou um RV32IM já pronto
+    max_skip    : instruções do ISS sem escrita aceitas antes de desistir de achar
+                  a próxima escrita esperada (evita laço infinito em 'j .')
+    history     : quantas instruções do ISS mostrar no diff
+    """
+
+    def __init__(self, dut, program=None, ram_words: int = 512, max_skip: int = 10_000, history: int = 8):
+        self.dut = dut
+        if isinstance(program, RV32IM):
+            self.iss = program
+        else:
+            self.iss = from_image(program or image_from_env(), ram_words=ram_words)
+        self.max_skip = max_skip
+        self.recent = deque(maxlen=history)
+
+        self.expected_reg = deque()   # (Retire, rd, valor)
+        self.expected_mem = deque()   # (Retire, índice de palavra, dado, máscara)
+        self.last_reg = None
+        self.last_mem = None
+        self.reg_checked = 0
+        self.mem_checked = 0
+        self.error = None
+        self._tasks = []
+
+        regfile = find_child(dut.core, "RegFile", "u_regfile")
+        self.rf_clk = regfile.clk
+        self.rf_we = regfile.we
+        self.rf_rd = regfile.rd
+        self.rf_data = regfile.data_in
+
+        ram = find_child(dut, "RAM")
+        self.ram_clk = ram.clk
+        self.ram_we = ram.weRAM
+        self.ram_addr = ram.addr
+        self.ram_mask = ram.mask
+        self.ram_data = ram.data_in
+        self.ram_words = ram_words
+
+    # ----------------------------------------------------------------------
+    def start(self):
+        self._tasks = [cocotb.start_soon(self._watch_regfile()),
+                       cocotb.start_soon(self._watch_ram())]
+        return self
+
+    def stop(self):
+        for t in self._tasks:
+            t.kill()
+        self._tasks = []
+
+    async def finish(self, drain: bool = True):
+        """
+        Encerra os monitores e confere que o core não ficou devendo escritas.
+        Com drain=True o ISS roda até parar (ecall/ebreak/'j .') e todas as
+        escritas restantes precisam ter sido vistas no core.
+        """
+        self.stop()
+        if self.error:
+            raise self.error
+        if drain:
+            for _ in range(self.max_skip):
+                if not self._advance():
+                    break
+        pending = [f"x{rd}={val:#010x} (pc={r.pc:#010x})" for r, rd, val in self.expected_reg]
+        pending += [f"M[{idx * 4:#06x}]={data:#010x}/{mask:04b} (pc={r.pc:#010x})"
+                    for r, idx, data, mask in self.expected_mem]
+        if pending:
+            self._fail("o core não efetuou escritas previstas pelo modelo:\n    " + "\n    ".join(pending[:8]))
+        self.dut._log.info(
+            f"cosim OK: {self.reg_checked} escritas no RegFile, {self.mem_checked} na RAM, "
+            f"{self.iss.retired} instruções no modelo")
+
+    # ----------------------------------------------------------------------
+    def _advance(self) -> bool:
+        """Executa uma instrução do ISS e enfileira as escritas. False se o modelo parou."""
+        if self.iss.halted:
+            return False
+        r = self.iss.step()
+        self.recent.append(r)
+        if r.rd is not None:
+            self.expected_reg.append((r, r.rd, r.rd_value))
+        if r.mem_op == "S" and r.mem_addr == HALT_ADDR:
+            # fim de programa: o sim_test não repassa esse store para a RAM
+            self.iss.halted = "store"
+        elif r.mem_op == "S":
+            idx = (r.mem_addr >> 2) & (self.ram_words - 1)
+            self.expected_mem.append((r, idx, r.mem_data, r.mem_mask))
+        if r.next_pc == r.pc and not self.iss.halted:
+            self.iss.halted = "self-loop"
+        return True
+
+    def _next_expected(self, queue):
+        skipped = 0
+        while not queue:
+            if not self._advance() or skipped > self.max_skip:
+                return None
+            skipped += 1
+        return queue.popleft()
+
+    def _fail(self, msg):
+        lines = [f"cosim: divergência em t={cocotb.utils.get_sim_time('ns')} ns", "  " + msg,
+                 "  últimas instruções do modelo:"]
+        lines += [f"    {r!r}" for r in self.recent]
+        self.error = CosimMismatch("\n".join(lines))
+        raise self.error
+
+    # ----------------------------------------------------------------------
+    def _check_reg(self, rd, data):
+        exp = self._next_expected(self.expected_reg)
+        if exp is None:
+            if (rd, data) == self.last_reg:
+                return
+            self._fail(f"RegFile: escrita x{rd}={data:#010x} sem correspondente no modelo "
+                       f"(parado: {self.iss.halted})")
+        r, exp_rd, exp_val = exp
+        if (rd, data) != (exp_rd, exp_val):
+            if (rd, data) == self.last_reg:
+                # reescrita idêntica (ex.: WB repetido durante stall) não muda o estado
+                self.expected_reg.appendleft(exp)
+                return
+            self._fail(f"RegFile: core x{rd}={data:#010x}  modelo x{exp_rd}={exp_val:#010x}  "
+                       f"(pc={r.pc:#010x} insn={r.insn:#010x})")
+        self.last_reg = (rd, data)
+        self.reg_checked += 1
+
+    def _check_mem(self, idx, data, mask):
+        exp = self._next_expected(self.expected_mem)
+        got = (idx, data & _mask_bits(mask), mask)
+        if exp is None:
+            if got == self.last_mem:
+                return
+            self._fail(f"RAM: escrita M[{idx * 4:#06x}]={data:#010x}/{mask:04b} sem correspondente no modelo")
+        r, exp_idx, exp_data, exp_mask = exp
+        want = (exp_idx, exp_data & _mask_bits(exp_mask), exp_mask)
+        if got != want:
+            if got == self.last_mem:
+                self.expected_mem.appendleft(exp)
+                return
+            self._fail(f"RAM: core M[{idx * 4:#06x}]={data:#010x}/{mask:04b}  "
+                       f"modelo M[{exp_idx * 4:#06x}]={exp_data:#010x}/{exp_mask:04b}  "
+                       f"(pc={r.pc:#010x} insn={r.insn:#010x})")
+        self.last_mem = got
+        self.mem_checked += 1
+
+    async def _watch_regfile(self):
+        while True:
+            # lido logo na borda: as entradas ainda são as que o RegFile amostra
+            await RisingEdge(self.rf_clk)
+            we = _resolved(self.rf_we)
+            if not we:
+                continue
+            rd = _resolved(self.rf_rd)
+            data = _resolved(self.rf_data)
+            if rd is None or data is None:
+                self._fail(f"RegFile: we=1 com rd/data indefinidos (rd={self.rf_rd.value}, data={self.rf_data.value})")
+            if rd == 0:
+                continue
+            self._check_reg(rd, data)
+
+    async def _watch_ram(self):
+        while True:
+            await RisingEdge(self.ram_clk)
+            if not _resolved(self.ram_we):
+                continue
+            idx = _resolved(self.ram_addr)
+            mask = _resolved(self.ram_mask)
+            data = _resolved(self.ram_data)
+            if None in (idx, mask, data):
+                self._fail("RAM: weRAM=1 com addr/mask/data indefinidos")
+            self._check_mem(idx & (self.ram_words - 1), data, mask)
+
+
+def _mask_bits(mask: int) -> int:
+    return (0xFF if mask & 1 else 0) | (0xFF00 if mask & 2 else 0) | \
+           (0xFF0000 if mask & 4 else 0) | (0xFF000000 if mask & 8 else 0)
+
+
+__all__ = ["LockstepChecker", "CosimMismatch", "find_child", "image_from_env"]
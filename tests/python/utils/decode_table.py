@@ -0,0 +1,174 @@
+"""
+decode_table.py — tabela de decodificação compilada a partir de riscv_opcodes.csv.
+
+A tabela é um array indexado por (opcode, funct3, funct7) — 2^17 entradas — com:
+  value[i] : sinais de controle esperados, empacotados (ver FIELDS)
+  care[i]  : máscara dos bits que importam (campos 'X' na tabela ficam de fora)
+  row[i]   : índice da linha do CSV (-1 = codificação não listada)
+
+O resultado é gravado em sim_build/_cache/decode_table.bin e só é refeito quando
+o mtime (ou o tamanho) do CSV muda, de modo que o teste do decoder e os modelos
+de referência fazem consultas O(1) sem reler o CSV.
+
+Convenções do CSV:
+  '-' ou 'X...' em funct3/funct7  -> qualquer valor
+  'X...' num sinal de controle    -> don't care
+"""
+import os
+import csv
+import struct
+from array import array
+from pathlib import Path
+
+CSV_PATH = Path(__file__).resolve().parents[1] / "unittests" / "entities" / "data" / "riscv_opcodes.csv"
+CACHE_PATH = Path(__file__).resolve().parents[1] / "sim_build" / "_cache" / "decode_table.bin"
+
+# (coluna do CSV, porta do InstructionDecoder, largura)
+FIELDS = (
+    ("SelMuxPc4ALU",         "selMuxPc4ALU",    1),
+    ("opExImm[2:0]",         "opExImm",         3),
+    ("selMuxALUPc4RAM[1:0]", "selMuxALUPc4RAM", 2),
+    ("weReg",                "weReg",           1),
+    ("opExRAM[2:0]",         "opExRAM",         3),
+    ("selMuxRS2Imm",         "selMuxRS2Imm",    1),
+    ("selMUXPcRS1",          "selPCRS1",        1),
+    ("opALU[4:0]",           "opALU",           5),
+    ("reRAM",                "reRAM",           1),
+    ("eRAM",                 "eRAM",            1),
+    ("weRAM",                "weRAM",           1),
+)
+
+SYMBOLS = {
+    # opExImm[2:0]
+    "U": 0b000, "I": 0b001, "I_shamt": 0b010, "J": 0b011, "S": 0b100, "B": 0b101,
+    # opExRAM[2:0]
+    "LW": 0b000, "LH": 0b001, "LHU": 0b010, "LB": 0b011, "LBU": 0b100,
+    # opALU[4:0]
+    "PASS_B": 0b00000, "ADD": 0b00001, "XOR": 0b00010, "OR": 0b00011, "AND": 0b00100,
+    "SLL": 0b00101, "SRL": 0b00110, "SRA": 0b00111, "SUB": 0b01000, "SLT": 0b01001,
+    "SLTU": 0b01010, "BEQ": 0b01011, "BNE": 0b01100, "BLT": 0b01101, "BGE": 0b01110,
+    "BLTU": 0b01111, "BGEU": 0b10000, "JALR": 0b10001,
+}
+
+ENTRIES = 1 << 17
+_MAGIC = b"RVDT"
+_VERSION = 1
+
+
+def _offsets():
+    out, pos = [], 0
+    for _col, _port, width in reversed(FIELDS):
+        out.append(pos)
+        pos += width
+    return list(reversed(out))
+
+
+OFFSETS = _offsets()
+
+
+def index(opcode: int, funct3: int, funct7: int) -> int:
+    return ((opcode & 0x7F) << 10) | ((funct3 & 0x7) << 7) | (funct7 & 0x7F)
+
+
+def _is_dont_care(val: str) -> bool:
+    val = val.strip()
+    return val == "-" or (val != "" and all(ch == "X" for ch in val))
+
+
+def _choices(val: str, width: int):
+    return range(1 << width) if _is_dont_care(val) else (int(val.strip(), 2),)
+
+
+def pack(fields: dict) -> int:
+    """{porta: valor} -> inteiro empacotado (mesma ordem de FIELDS)."""
+    word = 0
+    for (_col, port, width), off in zip(FIELDS, OFFSETS):
+        word |= (fields.get(port, 0) & ((1 << width) - 1)) << off
+    return word
+
+
+def unpack(word: int) -> dict:
+    return {port: (word >> off) & ((1 << width) - 1) for (_col, port, width), off in zip(FIELDS, OFFSETS)}
+
+
+class DecodeTable:
+    def __init__(self, value: array, care: array, row: array, names: list):
+        self.value = value
+        self.care = care
+        self.row = row
+        self.names = names      # nome da instrução por linha do CSV
+
+    def lookup(self, opcode: int, funct3: int, funct7: int):
+        """(valor esperado, máscara de bits relevantes, nome) ou None se não listado."""
+        i = index(opcode, funct3, funct7)
+        r = self.row[i]
+        if r < 0:
+            return None
+        return self.value[i], self.care[i], self.names[r]
+
+    def legal(self, opcode: int, funct3: int, funct7: int) -> bool:
+        return self.row[index(opcode, funct3, funct7)] >= 0
+
+
+def compile_table(csv_path: Path = CSV_PATH) -> DecodeTable:
+    value = array("I", bytes(4 * ENTRIES))
+    care = array("I", bytes(4 * ENTRIES))
+    row = array("h", [-1]) * ENTRIES
+    names = []
+
+    with open(csv_path, newline="") as f:
+        for n, rec in enumerate(csv.DictReader(f)):
+            names.append(rec["INST"])
+            v = m = 0
+            for (col, _port, width), off in zip(FIELDS, OFFSETS):
+                raw = (rec.get(col) or "X").strip()
+                if _is_dont_care(raw):
+                    continue
+                bits = SYMBOLS[raw] if raw in SYMBOLS else int(raw, 2)
+                v |= (bits & ((1 << width) - 1)) << off
+                m |= ((1 << width) - 1) << off
+            opcode = int(rec["OpCode[6:0]"].strip(), 2)
+            for f3 in _choices(rec["funct3[2:0]"], 3):
+                for f7 in _choices(rec["funct7[6:0]"], 7):
+                    i = index(opcode, f3, f7)
+                    if row[i] < 0:          # primeira linha que casa tem prioridade
+                        value[i], care[i], row[i] = v, m, n
+    return DecodeTable(value, care, row, names)
+
+
+def _signature(csv_path: Path) -> bytes:
+    st = csv_path.stat()
+    layout = ",".join(f"{c}:{w}" for c, _p, w in FIELDS).encode()
+    return struct.pack("<4sIqq", _MAGIC, _VERSION, st.st_mtime_ns, st.st_size) + \
+        struct.pack("<I", len(layout)) + layout
+
+
+def load(csv_path: Path = CSV_PATH, cache_path: Path = CACHE_PATH) -> DecodeTable:
+    """Tabela do cache em disco; recompila se o CSV mudou (mtime/tamanho) ou o cache não existe."""
+    csv_path, cache_path = Path(csv_path), Path(cache_path)
+    sig = _signature(csv_path)
+    try:
+        blob = cache_path.read_bytes()
+    except OSError:
+        blob = b""
+
+    if blob.startswith(sig):
+        pos = len(sig)
+        (n_names,) = struct.unpack_from("<I", blob, pos)
+        pos += 4
+        names = blob[pos:pos + n_names].decode().split("\n")
+        pos += n_names
+        value = array("I"); value.frombytes(blob[pos:pos + 4 * ENTRIES]); pos += 4 * ENTRIES
+        care = array("I"); care.frombytes(blob[pos:pos + 4 * ENTRIES]); pos += 4 * ENTRIES
+        row = array("h"); row.frombytes(blob[pos:pos + 2 * ENTRIES])
+        if len(row) == ENTRIES:
+            return DecodeTable(value, care, row, names)
+
+    table = compile_table(csv_path)
+    names = "\n".join(table.names).encode()
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_bytes(sig + struct.pack("<I", len(names)) + names +
+                    table.value.tobytes() + table.care.tobytes() + table.row.tobytes())
+    tmp.replace(cache_path)
+    return table
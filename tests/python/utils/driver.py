@@ -0,0 +1,388 @@
+"""
+driver.py — clock e avanço do core para os testbenches cocotb.
+
+Substitui o step() que cada teste de instrução escrevia alternando dut.CLK com
+Timer (seis idas e voltas Python <-> simulador por ciclo do core). O CLK passa a
+ser gerado pelo cocotb.clock.Clock e o avanço é um único Timer até o ponto de
+amostragem alvo, alinhado às bordas, qualquer que seja o número de ciclos.
+
+No rv32i3stage_core_sim_test o clk_gen_3way divide o CLK por 3: um ciclo do core
+(um step()) são CLOCKS_PER_CYCLE períodos de CLK. O ponto de amostragem de cada
+step fica logo depois da última borda do ciclo:
+  sample="falling"  após a 3ª descida (one … four)
+  sample="rising"   após a 3ª subida (five, six)
+
+Uso:
+  drv = CoreDriver(dut, sample="rising")
+  await drv.start(delay_ns=10)              # CLK em '0' por 10 ns e depois o Clock
+  await drv.step()                          # 1 ciclo do core
+  await drv.step(7)                         # 7 ciclos, um só Timer
+  await drv.run_instructions(20)            # até 20 instruções concluírem (HazardMonitor)
+  await drv.run_until(pc=0x40)              # até a instrução em 0x40 chegar ao EX
+  halt = await drv.run_to_halt()            # até o programa terminar (ver abaixo)
+
+Fim de programa (run_to_halt): sw em HALT_ADDR (0xFFFFFFF0). O sim_test não repassa
+esse store para a RAM, sobe a porta 'halt' e guarda o dado em halt_code; o Python só
+acorda nessa borda ou a cada WATCHDOG_CYCLES ciclos. Os programas terminam assim:
+    li   x31, HALT_ADDR
+    sw   x0, 0(x31)
+1:  j 1b
+Fallback pelo PC observado (ex_pc com ex_valid, senão pc_if_out), para quando o store
+nunca chega ao sim_test (o rv32im_pipeline_core ainda não tem MEM): o 'j 1b' prende o
+PC e é conferido em PC_WINDOW ciclos a cada acordada; ecall/ebreak não prendem o PC e,
+se a ROM tiver um deles, o PC é seguido ciclo a ciclo.
+Watchdogs: max_cycles ciclos simulados e wall_s segundos de parede (conferidos a cada
+WATCHDOG_CYCLES ciclos) terminam com SimTimeoutError em vez de deixar o teste pendurado.
+
+Troca de programa em tempo de execução: load_program() grava a ROM pelo backdoor
+(utils/backdoor.py) com o core em reset, então um só rv32i3stage_core_sim_test
+elaborado roda vários programas em sequência. Com runner.py --shared-sim as suítes
+one … six viram uma simulação só, e start(module=__name__) carrega o programa
+de cada módulo (fora desse modo a ROM é a do generic ROM_FILE e nada muda).
+"""
+import time
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import First, RisingEdge, Timer
+from cocotb.result import SimTimeoutError
+from cocotb.utils import get_sim_time
+
+from .encoding import ECALL, EBREAK
+
+CLOCKS_PER_CYCLE = 3        # clk_gen_3way
+PERIOD_NS = 20
+SAMPLES = ("falling", "rising")
+
+# PC usado pelo run_until: (sinal do PC, sinal de validade ou None), o primeiro que existir
+PC_SIGNALS = (("ex_pc", "ex_valid"), ("pc_if_out", None), ("if_pc", None))
+
+HALT_ADDR = 0xFFFFFFF0      # generic HALT_ADDR do rv32i3stage_core_sim_test
+HALT_MAX_CYCLES = 100_000
+HALT_WALL_S = 120.0
+WATCHDOG_CYCLES = 4096      # ciclos entre conferências do relógio de parede
+DRAIN_CYCLES = 2            # ciclos após o fim para as instruções anteriores escreverem
+PC_WINDOW = 4               # ciclos com o PC conferido a cada acordada (cobre as bolhas do salto)
+
+
+def _find(handle, name):
+    if handle is None or name is None:
+        return None
+    for candidate in (name, name.lower()):
+        try:
+            return getattr(handle, candidate)
+        except AttributeError:
+            continue
+    return None
+
+
+def halt_instructions(words) -> dict:
+    """{endereço: motivo} das instruções que terminam o programa numa imagem da ROM."""
+    out = {}
+    for i, w in enumerate(words):
+        if w is None:
+            continue
+        if w == ECALL:
+            out[4 * i] = "ecall"
+        elif w == EBREAK:
+            out[4 * i] = "ebreak"
+        elif (w & 0xFFFFF07F) == 0x6F or w == 0x63:    # jal rd, 0 / beq x0, x0, 0
+            out[4 * i] = "self-loop"
+    return out
+
+
+class Halt:
+    """
+    reason : "store" | "ecall" | "ebreak" | "self-loop"
+    pc     : endereço da instrução (None para "store")
+    code   : dado do store em HALT_ADDR, ou a0 para ecall/ebreak
+    cycles : ciclos do core até o fim, contando o dreno (no self-loop sem 'halt',
+             limite superior: o fim é visto na acordada seguinte)
+    """
+    __slots__ = ("reason", "pc", "code", "cycles")
+
+    def __init__(self, reason, pc=None, code=None, cycles=0):
+        self.reason, self.pc, self.code, self.cycles = reason, pc, code, cycles
+
+    def __repr__(self):
+        pc = f" pc=0x{self.pc:08x}" if self.pc is not None else ""
+        code = f" code=0x{self.code:08x}" if self.code is not None else ""
+        return f"Halt({self.reason}{pc}{code}, {self.cycles} ciclos)"
+
+
+class CoreDriver:
+    """
+    dut              : toplevel com a porta de clock (padrão: CLK)
+    period_ns        : período do CLK
+    clocks_per_cycle : períodos de CLK por ciclo do core
+    sample           : "falling" | "rising" — borda após a qual cada step termina
+    """
+
+    def __init__(self, dut, clk: str = "CLK", period_ns: int = PERIOD_NS,
+                 clocks_per_cycle: int = CLOCKS_PER_CYCLE, sample: str = "falling"):
+        if sample not in SAMPLES:
+            raise ValueError(f"sample deve ser um de {SAMPLES} (recebido '{sample}')")
+        if period_ns * 1000 % 4:
+            raise ValueError(f"period_ns={period_ns}: precisa ser múltiplo de 4 ps")
+        self.dut = dut
+        self.clk = getattr(dut, clk)
+        self.core = _find(dut, "core") or dut
+        self.period_ps = int(period_ns * 1000)
+        self.clocks_per_cycle = clocks_per_cycle
+        self.sample = sample
+        self.cycles = 0
+        self._t0 = None
+        self._clock_task = None
+        self._monitor = None
+
+    # -- clock -------------------------------------------------------------------------
+    @property
+    def cycle_ps(self) -> int:
+        return self.period_ps * self.clocks_per_cycle
+
+    def _sample_time(self, k: int) -> int:
+        """Instante (ps) do ponto de amostragem ao fim do k-ésimo ciclo do core."""
+        settle = self.period_ps // 4
+        last_edge = self.cycle_ps - (self.period_ps // 2 if self.sample == "falling" else 0)
+        return self._t0 + (k - 1) * self.cycle_ps + last_edge + settle
+
+    async def start(self, delay_ns: int = 0, module: str = None):
+        """
+        Liga o Clock (primeira subida agora, ou após delay_ns com CLK em '0').
+        Não espera nenhuma borda: leituras logo depois veem o estado inicial,
+        como antes do primeiro step() manual.
+        module: módulo de teste (__name__); numa simulação compartilhada carrega o
+        programa dele com load_program().
+        """
+        if self._clock_task is None:
+            if delay_ns:
+                self.clk.value = 0
+                await Timer(delay_ns, units="ns")
+            self._t0 = get_sim_time("ps")
+            self._clock_task = cocotb.start_soon(
+                Clock(self.clk, self.period_ps, units="ps").start(start_high=True))
+        if module is not None:
+            from .backdoor import shared_program
+            program = shared_program(module)
+            if program is not None:
+                await self.load_program(program)
+        return self
+
+    def stop(self):
+        if self._clock_task is not None:
+            self._clock_task.kill()
+        if self._monitor:
+            self._monitor.stop()
+        self._clock_task = self._monitor = None
+
+    async def step(self, n: int = 1):
+        """Avança n ciclos do core com um único Timer."""
+        if n <= 0:
+            return
+        if self._t0 is None:
+            await self.start()
+        now = get_sim_time("ps")
+        # se o teste esperou outros triggers, realinha no próximo ponto de amostragem
+        while self._sample_time(self.cycles + 1) <= now:
+            self.cycles += 1
+        target = self._sample_time(self.cycles + n)
+        await Timer(target - now, units="ps")
+        self.cycles += n
+
+    async def reset(self, cycles: int = 2, signal: str = "reset"):
+        """Mantém 'signal' em '1' por 'cycles' ciclos do core."""
+        rst = getattr(self.dut, signal)
+        rst.value = 1
+        await self.step(cycles)
+        rst.value = 0
+
+    async def load_program(self, program, reset_cycles: int = 2, clear_ram: bool = True):
+        """
+        Troca o programa sem reelaborar: grava a ROM inteira (programa e zeros depois
+        dele) pelo backdoor, zera a RAM se clear_ram e passa reset_cycles ciclos em
+        reset. O divisor de clock não é resetado (porta pll_reset), então o próximo
+        step() começa num ciclo alinhado, com PC = 0.
+        program: caminho (.hex, .bin, .elf ou .S) ou lista de palavras.
+        """
+        from .backdoor import rom, ram, program_words
+        words = list(program) if isinstance(program, (list, tuple)) else program_words(program)
+        memory = rom(self.dut)
+        if len(words) > len(memory):
+            raise ValueError(f"programa com {len(words)} palavras não cabe na ROM ({len(memory)})")
+        memory.write(words + [0] * (len(memory) - len(words)))
+        if clear_ram:
+            ram(self.dut).fill(0)
+        await self.reset(reset_cycles)
+        if self._monitor:
+            self._monitor.stop()
+            self._monitor = None
+
+    # -- avanço por instruções ------------------------------------------------------------
+    def _retire_monitor(self):
+        if self._monitor is None:
+            from .hazards import HazardMonitor
+            try:
+                self._monitor = HazardMonitor(self.dut).start()
+            except AttributeError as e:
+                self.dut._log.warning(f"run_instructions sem contagem de retire ({e}); "
+                                      f"usando 1 instrução por ciclo")
+                self._monitor = False
+        return self._monitor
+
+    async def run_instructions(self, n: int, max_cycles: int = 100_000) -> int:
+        """
+        Avança até n instruções concluírem (retire do HazardMonitor, que já desconta
+        bolhas e stalls do multdiv) e devolve os ciclos gastos. Como o core conclui no
+        máximo uma instrução por ciclo, cada espera cobre todas as que faltam de uma vez.
+        """
+        mon = self._retire_monitor()
+        if not mon:
+            await self.step(n)
+            return n
+        start_cycles, target = self.cycles, mon.retired + n
+        while mon.retired < target:
+            if self.cycles - start_cycles >= max_cycles:
+                raise SimTimeoutError(f"{n} instruções não concluíram em {max_cycles} ciclos "
+                                      f"({mon.retired - target + n} concluídas)")
+            await self.step(min(target - mon.retired, max_cycles - (self.cycles - start_cycles)))
+        return self.cycles - start_cycles
+
+    def _pc_probe(self, signal: str = None):
+        """
+        Função que devolve o PC do estágio observado (padrão: ex_pc com ex_valid;
+        'signal' escolhe outro) ou None se for bolha ou X/U.
+        """
+        pairs = ((signal, None),) if signal else PC_SIGNALS
+        for name, valid_name in pairs:
+            pc_sig = _find(self.core, name) or _find(self.dut, name)
+            if pc_sig is not None:
+                valid = _find(self.core, valid_name)
+                break
+        else:
+            raise AttributeError(f"nenhum sinal de PC encontrado ({', '.join(n for n, _ in pairs)})")
+
+        def pc_now():
+            v = pc_sig.value
+            if not v.is_resolvable:
+                return None
+            if valid is not None and not (valid.value.is_resolvable and int(valid.value) == 1):
+                return None
+            return int(v)
+        return pc_now
+
+    async def run_until(self, pc: int = None, predicate=None, max_cycles: int = 100_000,
+                        signal: str = None) -> int:
+        """
+        Avança ciclo a ciclo até a instrução em 'pc' estar no estágio observado
+        (padrão: ex_pc com ex_valid; 'signal' escolhe outro PC) ou até predicate()
+        ser verdadeiro. Devolve os ciclos gastos.
+        """
+        if pc is None and predicate is None:
+            raise ValueError("run_until precisa de pc= ou predicate=")
+        if pc is not None:
+            pc_now = self._pc_probe(signal)
+
+            def reached():
+                return pc_now() == pc
+        else:
+            reached = predicate
+
+        for spent in range(max_cycles + 1):
+            if reached():
+                return spent
+            await self.step()
+        what = f"pc=0x{pc:08x}" if pc is not None else "condição"
+        raise SimTimeoutError(f"{what} não atingido em {max_cycles} ciclos")
+
+    # -- fim de programa ------------------------------------------------------------------
+    def _halt_pcs(self) -> dict:
+        from .backdoor import rom
+        try:
+            return halt_instructions(rom(self.dut).read())
+        except AttributeError:
+            return {}
+
+    async def run_to_halt(self, max_cycles: int = HALT_MAX_CYCLES, wall_s: float = HALT_WALL_S,
+                          drain: int = DRAIN_CYCLES, signal: str = None) -> Halt:
+        """
+        Avança até o programa terminar, passa 'drain' ciclos e devolve um Halt.
+        Principal: store em HALT_ADDR (porta 'halt'), um Timer por bloco de
+        WATCHDOG_CYCLES ciclos interrompido pela borda. Fallback pelo PC observado
+        (ex_pc com ex_valid, ou 'signal'), para cores cujo store nunca chega ao
+        sim_test (rv32im_pipeline_core sem MEM): salto para si mesmo conferido em
+        PC_WINDOW ciclos a cada acordada; ecall/ebreak seguidos ciclo a ciclo.
+        SimTimeoutError se não terminar em max_cycles ciclos ou wall_s segundos de
+        parede (None desliga).
+        """
+        halt_sig = _find(self.dut, "halt")
+        code_sig = _find(self.dut, "halt_code")
+        halt_pcs = self._halt_pcs()
+        try:
+            pc_now = self._pc_probe(signal) if halt_pcs else None
+        except AttributeError:
+            pc_now = None
+        if halt_sig is None and pc_now is None:
+            raise AttributeError("run_to_halt precisa da porta 'halt' do sim_test ou de um sinal de PC "
+                                 "e de um ecall/ebreak/salto para si mesmo na ROM")
+        # ecall/ebreak não prendem o PC: só seguindo ciclo a ciclo
+        follow = pc_now is not None and any(r != "self-loop" for r in halt_pcs.values())
+        deadline = time.monotonic() + wall_s if wall_s else None
+        start = self.cycles
+
+        def stored():
+            v = halt_sig.value if halt_sig is not None else None
+            if v is None or not v.is_resolvable or int(v) != 1:
+                return None
+            code = code_sig.value if code_sig is not None else None
+            return Halt("store", code=int(code) if code is not None and code.is_resolvable else None)
+
+        def at_halt_pc():
+            pc = pc_now()
+            return Halt(halt_pcs[pc], pc=pc) if pc in halt_pcs else None
+
+        halt = None
+        while halt is None:
+            spent = self.cycles - start
+            if spent >= max_cycles:
+                raise SimTimeoutError(f"programa não terminou em {max_cycles} ciclos")
+            if deadline is not None and time.monotonic() > deadline:
+                raise SimTimeoutError(f"programa não terminou em {wall_s:g} s de parede "
+                                      f"({spent} ciclos simulados)")
+            chunk = min(WATCHDOG_CYCLES, max_cycles - spent)
+            if follow:
+                for _ in range(chunk):
+                    halt = stored() or at_halt_pc()
+                    if halt is not None:
+                        break
+                    await self.step()
+                continue
+            halt = stored()
+            if halt is not None:
+                break
+            if self._t0 is None:
+                await self.start()
+            now = get_sim_time("ps")
+            timer = Timer(self._sample_time(self.cycles + chunk) - now, units="ps")
+            await (First(RisingEdge(halt_sig), timer) if halt_sig is not None else timer)
+            halt = stored()
+            if halt is not None:
+                await self.step()               # realinha no ponto de amostragem
+                break
+            self.cycles += chunk
+            if pc_now is not None:
+                # o salto para si mesmo prende o PC: conferir só nas acordadas não perde o
+                # fim; PC_WINDOW ciclos seguidos pegam o salto entre as bolhas do flush
+                for _ in range(PC_WINDOW):
+                    halt = at_halt_pc()
+                    if halt is not None:
+                        break
+                    await self.step()
+        await self.step(drain)
+        if halt.reason in ("ecall", "ebreak"):
+            from .backdoor import read_regs
+            try:
+                halt.code = read_regs(self.dut)[10]
+            except AttributeError:
+                pass
+        halt.cycles = self.cycles - start
+        return halt
@@ -0,0 +1,201 @@
+"""
+encoding.py — codificação de instruções RV32IM (mnemônico + operandos -> palavra de 32 bits).
+
+Base comum do gerador de programas aleatórios e do montador: a tabela
+INSTRUCTIONS dá o formato e os campos fixos de cada mnemônico e encode()
+monta a palavra conferindo a faixa dos imediatos. No sentido inverso,
+mnemonic() e insn_class() decodificam uma palavra a partir da mesma tabela; os
+OP_* são os opcodes usados pelo ISS e pelos modelos derivados dele.
+"""
+
+
+class EncodingError(ValueError):
+    pass
+
+
+OP_LUI, OP_AUIPC, OP_JAL, OP_JALR = 0x37, 0x17, 0x6F, 0x67
+OP_BRANCH, OP_LOAD, OP_STORE = 0x63, 0x03, 0x23
+OP_IMM, OP_REG, OP_FENCE, OP_SYSTEM = 0x13, 0x33, 0x0F, 0x73
+
+ECALL, EBREAK = 0x00000073, 0x00100073
+
+# mnemônico -> (formato, opcode, funct3, funct7)
+INSTRUCTIONS = {
+    "lui":    ("U", OP_LUI, None, None),
+    "auipc":  ("U", OP_AUIPC, None, None),
+    "jal":    ("J", OP_JAL, None, None),
+    "jalr":   ("I", OP_JALR, 0, None),
+    "beq":    ("B", OP_BRANCH, 0, None),
+    "bne":    ("B", OP_BRANCH, 1, None),
+    "blt":    ("B", OP_BRANCH, 4, None),
+    "bge":    ("B", OP_BRANCH, 5, None),
+    "bltu":   ("B", OP_BRANCH, 6, None),
+    "bgeu":   ("B", OP_BRANCH, 7, None),
+    "lb":     ("I", OP_LOAD, 0, None),
+    "lh":     ("I", OP_LOAD, 1, None),
+    "lw":     ("I", OP_LOAD, 2, None),
+    "lbu":    ("I", OP_LOAD, 4, None),
+    "lhu":    ("I", OP_LOAD, 5, None),
+    "sb":     ("S", OP_STORE, 0, None),
+    "sh":     ("S", OP_STORE, 1, None),
+    "sw":     ("S", OP_STORE, 2, None),
+    "addi":   ("I", OP_IMM, 0, None),
+    "slti":   ("I", OP_IMM, 2, None),
+    "sltiu":  ("I", OP_IMM, 3, None),
+    "xori":   ("I", OP_IMM, 4, None),
+    "ori":    ("I", OP_IMM, 6, None),
+    "andi":   ("I", OP_IMM, 7, None),
+    "slli":   ("SH", OP_IMM, 1, 0x00),
+    "srli":   ("SH", OP_IMM, 5, 0x00),
+    "srai":   ("SH", OP_IMM, 5, 0x20),
+    "add":    ("R", OP_REG, 0, 0x00),
+    "sub":    ("R", OP_REG, 0, 0x20),
+    "sll":    ("R", OP_REG, 1, 0x00),
+    "slt":    ("R", OP_REG, 2, 0x00),
+    "sltu":   ("R", OP_REG, 3, 0x00),
+    "xor":    ("R", OP_REG, 4, 0x00),
+    "srl":    ("R", OP_REG, 5, 0x00),
+    "sra":    ("R", OP_REG, 5, 0x20),
+    "or":     ("R", OP_REG, 6, 0x00),
+    "and":    ("R", OP_REG, 7, 0x00),
+    "mul":    ("R", OP_REG, 0, 0x01),
+    "mulh":   ("R", OP_REG, 1, 0x01),
+    "mulhsu": ("R", OP_REG, 2, 0x01),
+    "mulhu":  ("R", OP_REG, 3, 0x01),
+    "div":    ("R", OP_REG, 4, 0x01),
+    "divu":   ("R", OP_REG, 5, 0x01),
+    "rem":    ("R", OP_REG, 6, 0x01),
+    "remu":   ("R", OP_REG, 7, 0x01),
+    "fence":  ("FENCE", OP_FENCE, 0, None),
+    "ecall":  ("SYS", OP_SYSTEM, 0, None),
+    "ebreak": ("SYS", OP_SYSTEM, 0, None),
+}
+
+LOADS = ("lb", "lh", "lw", "lbu", "lhu")
+STORES = ("sb", "sh", "sw")
+BRANCHES = ("beq", "bne", "blt", "bge", "bltu", "bgeu")
+ALU_RR = ("add", "sub", "sll", "slt", "sltu", "xor", "srl", "sra", "or", "and")
+ALU_RI = ("addi", "slti", "sltiu", "xori", "ori", "andi")
+SHIFTS_I = ("slli", "srli", "srai")
+MULDIV = ("mul", "mulh", "mulhsu", "mulhu", "div", "divu", "rem", "remu")
+
+ABI_NAMES = ["zero", "ra", "sp", "gp", "tp", "t0", "t1", "t2", "s0", "s1",
+             "a0", "a1", "a2", "a3", "a4", "a5", "a6", "a7",
+             "s2", "s3", "s4", "s5", "s6", "s7", "s8", "s9", "s10", "s11",
+             "t3", "t4", "t5", "t6"]
+REGISTERS = {f"x{i}": i for i in range(32)}
+REGISTERS.update({name: i for i, name in enumerate(ABI_NAMES)})
+REGISTERS["fp"] = 8
+
+
+def parse_reg(text: str) -> int:
+    try:
+        return REGISTERS[text.strip().lower()]
+    except KeyError:
+        raise EncodingError(f"registrador inválido: '{text}'") from None
+
+
+def _check(value: int, bits: int, signed: bool, what: str) -> int:
+    lo, hi = (-(1 << (bits - 1)), (1 << (bits - 1)) - 1) if signed else (0, (1 << bits) - 1)
+    if not lo <= value <= hi:
+        raise EncodingError(f"{what} fora da faixa [{lo}, {hi}]: {value}")
+    return value & ((1 << bits) - 1)
+
+
+def _reg(r: int) -> int:
+    if not 0 <= r < 32:
+        raise EncodingError(f"registrador inválido: x{r}")
+    return r
+
+
+def encode(mnemonic: str, rd: int = 0, rs1: int = 0, rs2: int = 0, imm: int = 0) -> int:
+    """
+    Palavra de 32 bits da instrução. Desvios (B/J) recebem o deslocamento em bytes
+    relativo ao PC; U recebe os 20 bits superiores (como em 'lui rd, imm').
+    """
+    try:
+        fmt, op, f3, f7 = INSTRUCTIONS[mnemonic]
+    except KeyError:
+        raise EncodingError(f"instrução desconhecida: '{mnemonic}'") from None
+    rd, rs1, rs2 = _reg(rd), _reg(rs1), _reg(rs2)
+
+    if fmt == "R":
+        return (f7 << 25) | (rs2 << 20) | (rs1 << 15) | (f3 << 12) | (rd << 7) | op
+    if fmt == "I":
+        return (_check(imm, 12, True, "imediato") << 20) | (rs1 << 15) | (f3 << 12) | (rd << 7) | op
+    if fmt == "SH":
+        return (f7 << 25) | (_check(imm, 5, False, "shamt") << 20) | (rs1 << 15) | (f3 << 12) | (rd << 7) | op
+    if fmt == "S":
+        v = _check(imm, 12, True, "imediato")
+        return ((v >> 5) << 25) | (rs2 << 20) | (rs1 << 15) | (f3 << 12) | ((v & 0x1F) << 7) | op
+    if fmt == "B":
+        if imm & 1:
+            raise EncodingError(f"deslocamento de desvio ímpar: {imm}")
+        v = _check(imm, 13, True, "deslocamento de desvio")
+        return (((v >> 12) & 1) << 31) | (((v >> 5) & 0x3F) << 25) | (rs2 << 20) | (rs1 << 15) | \
+            (f3 << 12) | (((v >> 1) & 0xF) << 8) | (((v >> 11) & 1) << 7) | op
+    if fmt == "U":
+        return (_check(imm, 20, False, "imediato") << 12) | (rd << 7) | op
+    if fmt == "J":
+        if imm & 1:
+            raise EncodingError(f"deslocamento de salto ímpar: {imm}")
+        v = _check(imm, 21, True, "deslocamento de salto")
+        return (((v >> 20) & 1) << 31) | (((v >> 1) & 0x3FF) << 21) | (((v >> 11) & 1) << 20) | \
+            (((v >> 12) & 0xFF) << 12) | (rd << 7) | op
+    if fmt == "FENCE":
+        return 0x0FF0000F
+    # SYS
+    return EBREAK if mnemonic == "ebreak" else ECALL
+
+
+def _decode_keys():
+    """(opcode, funct3, funct7), (opcode, funct3) ou opcode -> mnemônico, conforme o formato."""
+    keys = {}
+    for name, (fmt, op, f3, f7) in INSTRUCTIONS.items():
+        if fmt in ("R", "SH"):
+            keys[(op, f3, f7)] = name
+        elif fmt in ("U", "J", "FENCE"):
+            keys[op] = name
+        elif fmt != "SYS":
+            keys[(op, f3)] = name
+    return keys
+
+
+_DECODE = _decode_keys()
+
+
+def mnemonic(insn: int) -> str:
+    """Mnemônico RV32IM da palavra (sem operandos); 'unknown' se não decodificar."""
+    op = insn & 0x7F
+    if op == OP_SYSTEM:
+        return {ECALL: "ecall", EBREAK: "ebreak"}.get(insn, "system")
+    f3 = (insn >> 12) & 7
+    return _DECODE.get((op, f3, insn >> 25)) or _DECODE.get((op, f3)) or _DECODE.get(op, "unknown")
+
+
+def insn_class(insn: int) -> str:
+    """Classe da instrução: load, store, branch, jump, muldiv, system ou alu."""
+    op = insn & 0x7F
+    if op == OP_LOAD:
+        return "load"
+    if op == OP_STORE:
+        return "store"
+    if op == OP_BRANCH:
+        return "branch"
+    if op in (OP_JAL, OP_JALR):
+        return "jump"
+    if op == OP_REG and insn >> 25 == 0x01:
+        return "muldiv"
+    if op in (OP_FENCE, OP_SYSTEM):
+        return "system"
+    return "alu"
+
+
+def split_li(value: int) -> tuple:
+    """(hi20, lo12) tais que (hi20 << 12) + sext(lo12) == value (mod 2^32): lui + addi."""
+    value &= 0xFFFFFFFF
+    lo = value & 0xFFF
+    if lo >= 0x800:
+        lo -= 0x1000
+    hi = ((value - lo) >> 12) & 0xFFFFF
+    return hi, lo
@@ -0,0 +1,258 @@
+"""
+fastforward.py — avanço rápido de laços ociosos no emulador do L2IP (l2ip_soc.py).
+
+Firmware como blinkGPIO.c passa quase todo o tempo em laços de espera
+(nops(50000000), delay(20000), espera pelo TIMER). Quando um desvio para trás
+repete o mesmo alvo, o L2IPSoC chama LoopSkipper.try_skip(), que executa três
+iterações instrumentadas a partir da cabeça do laço e aceita pular iterações se:
+  - as três seguiram o mesmo caminho (mesmos PCs) e nenhuma escreveu em periférico
+  - o estado (x1..x31 e as palavras da RAM escritas no laço) mudou pelo mesmo delta
+    nas duas transições: com um passo afim, o delta se repete em todas as seguintes
+  - valores que variam só passam por operações afins mod 2^32 (add/sub/addi, slli,
+    sll e mul com o outro operando constante, lw/sw com endereço constante); as
+    demais instruções só veem valores constantes
+  - cada leitura de GPIO/TIMER devolve o mesmo valor até o próximo evento do
+    dispositivo, ou é o contador do TIMER subindo em rampa (um tick a cada Q ciclos,
+    com Q dividindo o tamanho da iteração)
+O número K de iterações até algum desvio mudar de sentido, um operando de comparação
+dar a volta em 32 bits ou uma leitura sair da sua janela sai de conta direta;
+registradores, RAM e instruções executadas saltam para a cabeça da iteração K.
+GPIO e TIMER são sincronizados só no próximo acesso, então ciclos, contador e IRQ
+do TIMER continuam exatos.
+"""
+from math import gcd
+
+if __package__ in (None, ""):
+    from tests.python.utils.rv32im_iss import MASK32, sext
+    from tests.python.utils.encoding import OP_JALR, OP_BRANCH, OP_LOAD, OP_STORE, OP_IMM, OP_REG, OP_SYSTEM
+else:
+    from .rv32im_iss import MASK32, sext
+    from .encoding import OP_JALR, OP_BRANCH, OP_LOAD, OP_STORE, OP_IMM, OP_REG, OP_SYSTEM
+
+ITERATIONS = 3              # iterações instrumentadas (duas transições de estado)
+MAX_BODY = 512              # instruções por iteração
+RETRY = 100_000             # instruções até tentar de novo um laço recusado
+
+_M = 1 << 32
+
+
+def _same(t) -> bool:
+    return t[0] == t[1] == t[2]
+
+
+def _affine(t) -> bool:
+    return (t[1] - t[0]) & MASK32 == (t[2] - t[1]) & MASK32
+
+
+def _delta(t) -> int:
+    """Passo por iteração como inteiro com sinal (representante de menor módulo)."""
+    d = (t[2] - t[1]) & MASK32
+    return d - _M if d & 0x80000000 else d
+
+
+def branch_limit(f3: int, a: tuple, b: tuple):
+    """
+    a e b: operandos do desvio nas iterações 0, 1 e 2 (já verificados afins).
+    Devolve a primeira iteração k > 2 em que o desvio pode mudar de sentido
+    (ou um operando dar a volta no domínio da comparação), ou None se nunca.
+    """
+    da, db = _delta(a), _delta(b)
+    if da == db == 0:
+        return None
+    if f3 in (0, 1):                            # beq / bne: (a - b) + j*(da - db) == 0 mod 2^32
+        c, step = (a[2] - b[2]) & MASK32, (da - db) & MASK32
+        if c == 0 or step == 0:
+            return None if step == 0 else 3
+        g = gcd(step, _M)
+        if (-c) % g:
+            return None
+        mod = _M // g
+        return 2 + ((-c // g) * pow(step // g, -1, mod)) % mod
+    signed = f3 in (4, 5)
+    lo, hi = (-(1 << 31), (1 << 31) - 1) if signed else (0, MASK32)
+
+    def dom(v):
+        return v - _M if signed and v & 0x80000000 else v
+
+    def wrap(v, d):                             # primeiro j em que v + j*d sai de [lo, hi]
+        if d > 0:
+            return (hi - v) // d + 1
+        if d < 0:
+            return (v - lo) // -d + 1
+        return None
+
+    va, vb = dom(a[2]), dom(b[2])
+    limits = [w for w in (wrap(va, da), wrap(vb, db)) if w is not None]
+    diff, step = va - vb, da - db               # a < b  <=>  diff + j*step < 0
+    if diff < 0 and step > 0:
+        limits.append(-(diff // step))          # ceil(-diff / step)
+    elif diff >= 0 and step < 0:
+        limits.append(diff // -step + 1)
+    return 2 + min(limits) if limits else None
+
+
+class LoopSkipper:
+    """
+    loops   : {cabeça: {"kind": "counted" | "polling", "skips": n, "instructions": n}}
+    skipped : instruções puladas no total
+    """
+
+    def __init__(self, soc, max_body: int = MAX_BODY, retry: int = RETRY):
+        self.cpu = soc.cpu
+        self.bus = soc.bus
+        self.max_body = max_body
+        self.retry = retry
+        self.retry_at = {}
+        self.loops = {}
+        self.skipped = 0
+
+    def try_skip(self, head: int, end: int) -> bool:
+        """
+        Com o PC na cabeça 'head', executa as iterações instrumentadas e pula o que
+        for possível sem passar de 'end' instruções executadas. O PC sempre fica
+        num ponto válido (a cabeça, ou onde a instrumentação parou).
+        """
+        cpu = self.cpu
+        if cpu.retired < self.retry_at.get(head, 0):
+            return False
+        traced = self._trace(head, end)
+        plan = self._plan(*traced, end) if traced else None
+        if plan is None:
+            self.retry_at[head] = cpu.retired + self.retry
+            return False
+        jumps, n, reg_deltas, word_deltas, polling = plan
+        x = cpu.x
+        for r, d in reg_deltas:
+            x[r] = (x[r] + jumps * d) & MASK32
+        mem = self.bus._mem
+        for i, d in word_deltas:
+            mem[i] = (mem[i] + jumps * d) & MASK32
+        cpu.retired += jumps * n
+        self.skipped += jumps * n
+        loop = self.loops.setdefault(head, {"kind": "polling" if polling else "counted",
+                                            "skips": 0, "instructions": 0})
+        loop["skips"] += 1
+        loop["instructions"] += jumps * n
+        return True
+
+    # ----------------------------------------------------------------------
+    def _trace(self, head: int, end: int):
+        cpu, bus = self.cpu, self.bus
+        x, cache, mem = cpu.x, cpu._cache, bus._mem
+        ram_mask = len(mem) - 1
+        iterations, heads, windows = [], [], {}
+        words = None
+        pc = cpu.pc
+        for it in range(ITERATIONS):
+            rec = []
+            while True:
+                if len(rec) >= self.max_body or cpu.retired >= end:
+                    return None
+                f = cache.get(pc)
+                if f is None:
+                    f = cache[pc] = cpu._compile(pc)
+                insn = f.insn
+                op = insn & 0x7F
+                a, b = x[(insn >> 15) & 31], x[(insn >> 20) & 31]
+                if op == OP_SYSTEM:
+                    return None
+                if op == OP_STORE:
+                    ea = (a + sext(((insn >> 25) << 5) | ((insn >> 7) & 0x1F), 12)) & MASK32
+                    if ea >> 28 != 0x8:
+                        return None                 # escrita em periférico: não é ocioso
+                now = cpu.cycles
+                cpu._mem = None
+                next_pc = f()
+                cpu.retired += 1
+                access = cpu._mem
+                loaded = None
+                if op == OP_LOAD:
+                    loaded = x[(insn >> 7) & 31]
+                    if it == ITERATIONS - 1 and access[1] >> 28 != 0x8:
+                        windows[len(rec)] = bus.read_window(access[1], access[2], now)
+                rec.append((pc, insn, a, b, access, loaded))
+                cpu.pc = pc = next_pc
+                if pc == head:
+                    break
+            iterations.append(rec)
+            if words is None:
+                words = sorted({(r[4][1] >> 2) & ram_mask for r in rec
+                                if r[4] and r[4][0] == "S" and r[4][1] >> 28 == 0x8})
+            heads.append((list(x), [mem[i] for i in words]))
+        return iterations, heads, words, windows
+
+    def _plan(self, iterations, heads, words, windows, end):
+        first = iterations[0]
+        n = len(first)
+        if any(len(rec) != n or any(r[0] != s[0] for r, s in zip(rec, first)) for rec in iterations[1:]):
+            return None
+        cycles = n * self.cpu.cpi
+        limits = [ITERATIONS + (end - self.cpu.retired) // n]
+        for pos in range(n):
+            samples = [rec[pos] for rec in iterations]
+            insn = samples[0][1]
+            op, f3, f7 = insn & 0x7F, (insn >> 12) & 7, insn >> 25
+            a = tuple(s[2] for s in samples)
+            b = tuple(s[3] for s in samples)
+            if op == OP_BRANCH:
+                if not (_affine(a) and _affine(b)):
+                    return None
+                limit = branch_limit(f3, a, b)
+                if limit is not None:
+                    limits.append(limit)
+            elif op == OP_JALR:
+                if not _same(a):
+                    return None
+            elif op == OP_LOAD:
+                value = tuple(s[5] for s in samples)
+                if not _same(a) or not _affine(value) or (f3 != 2 and not _same(value)):
+                    return None
+                if samples[-1][4][1] >> 28 != 0x8:
+                    window = windows.get(pos)
+                    if window is None:
+                        return None
+                    stable, ramp = window
+                    if _same(value):
+                        h = stable
+                    elif ramp and cycles % ramp[0] == 0 and _delta(value) == cycles // ramp[0]:
+                        h = ramp[1]
+                    else:
+                        return None
+                    if h is not None:
+                        limits.append(ITERATIONS + (h - 1) // cycles)
+            elif op == OP_STORE:
+                if not _same(a) or (f3 != 2 and not _same(b)):
+                    return None
+            elif op == OP_IMM:
+                if f3 not in (0, 1) and not _same(a):          # addi, slli
+                    return None
+            elif op == OP_REG:
+                if f7 in (0, 0x20) and f3 == 0:                # add, sub
+                    pass
+                elif f7 == 0 and f3 == 1:                      # sll
+                    if not _same(b):
+                        return None
+                elif f7 == 1 and f3 == 0:                      # mul
+                    if not (_same(a) or _same(b)):
+                        return None
+                elif not (_same(a) and _same(b)):
+                    return None
+
+        (r1, w1), (r2, w2), (r3, w3) = heads
+        reg_deltas, word_deltas = [], []
+        for r in range(1, 32):
+            d = (r2[r] - r1[r]) & MASK32
+            if d != (r3[r] - r2[r]) & MASK32:
+                return None
+            if d:
+                reg_deltas.append((r, d))
+        for i, v1, v2, v3 in zip(words, w1, w2, w3):
+            d = (v2 - v1) & MASK32
+            if d != (v3 - v2) & MASK32:
+                return None
+            if d:
+                word_deltas.append((i, d))
+        jumps = min(limits) - ITERATIONS
+        if jumps <= 0:
+            return None
+        return jumps, n, reg_deltas, word_deltas, bool(windows)
@@ -0,0 +1,301 @@
+"""
+hazards.py — monitor de stalls/flush/forwarding do rv32im_pipeline_core e análise offline.
+
+Monitor (cocotb): a cada borda de subida do clock do core amostra os sinais de
+controle do contrato (docs/RV32IM_PIPELINE_PASSO0_CONTRATO.md):
+  if_pc_write_en, ifid_write_en, id_bubble_sel   (HDU / bubble_mux)
+  flush_if_id, flush_id_ex, muldiv_busy
+  ex_branch_taken, ex_jalr_taken                 (M2; opcionais)
+  fwd_sel_a, fwd_sel_b                           (Forwarding Unit; opcionais)
+e empacota cada ciclo numa palavra (ver BITS). O trace é gravado em JSON com
+run-length encoding, então um programa longo em laço ocupa poucas linhas.
+
+Análise (offline): stalls por causa, ciclos perdidos em flush, uso de cada
+caminho de forwarding e CPI efetivo por programa.
+
+Uso:
+  # no testbench
+  mon = HazardMonitor(dut).start()
+  ...
+  mon.save("hazards.json", program=os.environ.get("ROM_FILE"))
+
+  # depois da simulação
+  python3 -m tests.python.utils.hazards tests/python/sim_build/instructions/cosim/hazards.json
+  python3 -m tests.python.utils.hazards a.json b.json --output /tmp/hazards_report.json
+"""
+import sys
+import json
+import argparse
+from collections import Counter, deque
+from pathlib import Path
+
+VERSION = 1
+
+# posição de cada campo na palavra de um ciclo
+BITS = {
+    "pc_write": 0,
+    "ifid_write": 1,
+    "bubble": 2,
+    "flush_if_id": 3,
+    "flush_id_ex": 4,
+    "muldiv_busy": 5,
+    "branch_taken": 6,
+    "jalr_taken": 7,
+    "retire": 8,
+}
+FWD_A_SHIFT = 9
+FWD_B_SHIFT = 11
+
+# codificação usual (Patterson & Hennessy) de forward_A/forward_B
+FWD_PATHS = {0: "regfile", 1: "mem_wb", 2: "ex_mem", 3: "reserved"}
+
+# sinal do core -> campo; o primeiro nome existente é usado
+SIGNALS = {
+    "pc_write":     ("if_pc_write_en", "PC_write"),
+    "ifid_write":   ("ifid_write_en", "IFID_write"),
+    "bubble":       ("id_bubble_sel", "sel_bubble"),
+    "flush_if_id":  ("flush_if_id",),
+    "flush_id_ex":  ("flush_id_ex",),
+    "muldiv_busy":  ("muldiv_busy",),
+    "branch_taken": ("ex_branch_taken",),
+    "jalr_taken":   ("ex_jalr_taken",),
+    "fwd_a":        ("fwd_sel_a", "forward_A"),
+    "fwd_b":        ("fwd_sel_b", "forward_B"),
+}
+REQUIRED = ("pc_write", "ifid_write", "bubble")
+
+# sinal de validade usado para contar instruções concluídas: o estágio mais
+# adiantado que existir no core, e quantos registradores ele está depois do ID/EX
+RETIRE_SIGNALS = (("memwb_valid", 2), ("exmem_valid", 1), ("ex_valid", 0), ("idex_valid", 0))
+
+
+def _find(handle, names):
+    for name in names:
+        for candidate in (name, name.lower()):
+            try:
+                return getattr(handle, candidate)
+            except AttributeError:
+                continue
+    return None
+
+
+def _bit(sig) -> int:
+    v = sig.value
+    return int(v) if v.is_resolvable else 0
+
+
+# ===========================================================================
+# Monitor (cocotb)
+# ===========================================================================
+
+class HazardMonitor:
+    """
+    dut  : wrapper rv32i3stage_core_sim_test (usa dut.core) ou o próprio core
+    clk  : clock de amostragem (padrão: clk do core)
+
+    Bolhas do bubble_mux não zeram o *_valid: a instrução repetida no ID/EX é
+    descontada do retire (com o atraso até o estágio usado como retire).
+    """
+
+    def __init__(self, dut, clk=None):
+        self.core = _find(dut, ("core", "CORE")) or dut
+        self.clk = clk if clk is not None else self.core.clk
+        self.handles = {k: _find(self.core, names) for k, names in SIGNALS.items()}
+        missing = [SIGNALS[k][0] for k in REQUIRED if self.handles[k] is None]
+        if missing:
+            raise AttributeError(f"{self.core._name}: sinais não encontrados: {', '.join(missing)}")
+
+        self.retire_source = None
+        self.retire = None
+        self.retire_depth = 0
+        for name, depth in RETIRE_SIGNALS:
+            h = _find(self.core, (name,))
+            if h is not None:
+                self.retire_source, self.retire, self.retire_depth = name, h, depth
+                break
+
+        self.runs = []          # [[palavra, repetições], ...]
+        self.cycles = 0
+        self.retired = 0
+        self._task = None
+
+    @property
+    def present(self) -> dict:
+        out = {k: h is not None for k, h in self.handles.items()}
+        out["retire"] = self.retire is not None
+        return out
+
+    def start(self):
+        import cocotb
+        self._task = cocotb.start_soon(self._run())
+        return self
+
+    def stop(self):
+        if self._task is not None:
+            self._task.kill()
+            self._task = None
+
+    async def _run(self):
+        from cocotb.triggers import RisingEdge
+
+        h = self.handles
+        scalar = [(BITS[k], h[k]) for k in BITS if k != "retire" and h.get(k) is not None]
+        fwd = [(FWD_A_SHIFT, h["fwd_a"]), (FWD_B_SHIFT, h["fwd_b"])]
+        fwd = [(s, sig) for s, sig in fwd if sig is not None]
+        busy = h["muldiv_busy"]
+        # bolhas injetadas no ID/EX chegam ao estágio de retire depois de 'depth' bordas
+        pending = deque([0] * (self.retire_depth + 1)) if self.retire is not None else None
+        edge = RisingEdge(self.clk)
+        runs = self.runs
+
+        while True:
+            await edge
+            word = 0
+            for shift, sig in scalar:
+                if _bit(sig):
+                    word |= 1 << shift
+            for shift, sig in fwd:
+                v = sig.value
+                if v.is_resolvable:
+                    word |= (int(v) & 3) << shift
+
+            if pending is not None:
+                repeated = pending.popleft()
+                stalled = busy is not None and self.retire_depth == 0 and _bit(busy)
+                if _bit(self.retire) and not repeated and not stalled:
+                    word |= 1 << BITS["retire"]
+                    self.retired += 1
+                pending.append(1 if word >> BITS["bubble"] & 1 else 0)
+
+            self.cycles += 1
+            if runs and runs[-1][0] == word:
+                runs[-1][1] += 1
+            else:
+                runs.append([word, 1])
+
+    def to_dict(self, program=None) -> dict:
+        return {
+            "version": VERSION,
+            "program": str(program) if program else None,
+            "cycles": self.cycles,
+            "present": self.present,
+            "retire_source": self.retire_source,
+            "runs": self.runs,
+        }
+
+    def save(self, path, program=None):
+        Path(path).write_text(json.dumps(self.to_dict(program)) + "\n")
+        return path
+
+    def summary(self, program=None) -> dict:
+        return analyse(self.to_dict(program))
+
+
+# ===========================================================================
+# Análise offline
+# ===========================================================================
+
+def analyse(trace: dict) -> dict:
+    """Trace do monitor (dict) -> relatório de stalls, flush, forwarding e CPI."""
+    if trace.get("version") != VERSION:
+        raise ValueError(f"versão de trace não suportada: {trace.get('version')}")
+    present = trace.get("present", {})
+
+    cycles = 0
+    retired = 0
+    stall = Counter()
+    flush_events = Counter()
+    fwd_a = Counter()
+    fwd_b = Counter()
+
+    for word, n in trace["runs"]:
+        cycles += n
+        on = {k: (word >> b) & 1 for k, b in BITS.items()}
+        if on["retire"]:
+            retired += n
+
+        if not on["ifid_write"] or not on["pc_write"]:
+            stall["muldiv" if on["muldiv_busy"] else "load_use"] += n
+
+        if on["flush_if_id"] or on["flush_id_ex"]:
+            # o flush é um pulso de um ciclo por redirecionamento
+            cause = "jalr" if on["jalr_taken"] else "branch" if on["branch_taken"] else "flush"
+            flush_events[cause] += n
+
+        if present.get("fwd_a"):
+            fwd_a[FWD_PATHS[(word >> FWD_A_SHIFT) & 3]] += n
+        if present.get("fwd_b"):
+            fwd_b[FWD_PATHS[(word >> FWD_B_SHIFT) & 3]] += n
+
+    # cada flush descarta IF/ID e ID/EX: 2 ciclos sem instrução útil
+    flush_cycles = {k: 2 * v for k, v in flush_events.items()}
+    lost = sum(stall.values()) + sum(flush_cycles.values())
+
+    def usage(c):
+        if not c:
+            return None
+        used = sum(v for k, v in c.items() if k != "regfile")
+        return {"cycles": dict(c), "forwarded_cycles": used}
+
+    return {
+        "program": trace.get("program"),
+        "cycles": cycles,
+        "retired": retired if present.get("retire") else None,
+        "cpi": round(cycles / retired, 3) if present.get("retire") and retired else None,
+        "stall_cycles": {"load_use": stall["load_use"], "muldiv": stall["muldiv"]},
+        "flush_events": dict(flush_events),
+        "flush_cycles": flush_cycles,
+        "lost_cycles": lost,
+        "forwarding": {"a": usage(fwd_a), "b": usage(fwd_b)} if fwd_a or fwd_b else None,
+        "retire_source": trace.get("retire_source"),
+        "missing_signals": sorted(k for k, v in present.items() if not v),
+    }
+
+
+def load_trace(path) -> dict:
+    return json.loads(Path(path).read_text())
+
+
+def print_report(rep: dict):
+    name = Path(rep["program"]).name if rep["program"] else "?"
+    cpi = rep["cpi"] if rep["cpi"] is not None else "n/d"
+    print(f"{name}: {rep['cycles']} ciclos, {rep['retired'] if rep['retired'] is not None else 'n/d'} "
+          f"instruções, CPI={cpi}")
+    s = rep["stall_cycles"]
+    print(f"  stalls   : load-use={s['load_use']}  muldiv={s['muldiv']}")
+    if rep["flush_cycles"]:
+        print("  flush    : " + "  ".join(f"{k}={v} ciclos ({rep['flush_events'][k]}x)"
+                                          for k, v in rep["flush_cycles"].items()))
+    if rep["forwarding"]:
+        for port, u in rep["forwarding"].items():
+            if u:
+                print(f"  fwd_{port}    : " + "  ".join(f"{k}={v}" for k, v in sorted(u["cycles"].items())))
+    if rep["missing_signals"]:
+        print(f"  (sinais ausentes no core: {', '.join(rep['missing_signals'])})")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Relatório de stalls/flush/forwarding a partir dos traces do HazardMonitor")
+    p.add_argument("traces", nargs="+", help="Arquivos gravados por HazardMonitor.save()")
+    p.add_argument("--output", metavar="ARQ", help="Grava os relatórios em JSON")
+    args = p.parse_args()
+
+    reports = []
+    for path in args.traces:
+        try:
+            rep = analyse(load_trace(path))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Erro: {path}: {e}", file=sys.stderr)
+            sys.exit(2)
+        if not rep["program"]:
+            rep["program"] = str(path)
+        reports.append(rep)
+        print_report(rep)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(reports, indent=2) + "\n")
+        print(f"Relatório JSON salvo em: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Leitura de imagens de programa: .hex (uma palavra de 32 bits por linha, formato do
+ROM_simulation / hexdump '%08X'), .bin (binário little-endian) e .elf (RV32).
+"""
+import struct
+from pathlib import Path
+
+SHN_LORESERVE = 0xFF00     # índices de seção especiais (SHN_ABS, SHN_COMMON, ...)
+
+
+class ElfError(Exception):
+    pass
+
+
+class Section:
+    """Seção de um ELF. 'data' é vazio para seções NOBITS (.bss)."""
+    __slots__ = ("name", "addr", "size", "data", "flags", "type")
+
+    SHT_NOBITS = 8
+    SHF_WRITE = 0x1
+    SHF_ALLOC = 0x2
+    SHF_EXECINSTR = 0x4
+
+    def __init__(self, name, addr, size, data, flags, type_):
+        self.name = name
+        self.addr = addr
+        self.size = size
+        self.data = data
+        self.flags = flags
+        self.type = type_
+
+    @property
+    def alloc(self):
+        return bool(self.flags & self.SHF_ALLOC)
+
+    @property
+    def executable(self):
+        return bool(self.flags & self.SHF_EXECINSTR)
+
+    @property
+    def nobits(self):
+        return self.type == self.SHT_NOBITS
+
+    def __repr__(self):
+        return f"Section({self.name!r}, addr={self.addr:#010x}, size={self.size})"
+
+
+class ElfImage:
+    """ELF32 little-endian: entry, segmentos PT_LOAD, seções e símbolos."""
+
+    def __init__(self, entry, segments, sections, symbols):
+        self.entry = entry
+        self.segments = segments      # [(vaddr, bytes, memsz)]
+        self.sections = sections      # {nome: Section}
+        self.symbols = symbols        # {nome: endereço}
+
+    def section_bytes(self, names):
+        """
+        Concatena as seções pedidas (na ordem de endereço), preenchendo buracos
+        com zero, como 'objcopy -O binary --only-section=...'.
+        Retorna (endereço_base, bytes).
+        """
+        chosen = sorted((self.sections[n] for n in names
+                         if n in self.sections and self.sections[n].size),
+                        key=lambda s: s.addr)
+        if not chosen:
+            return 0, b""
+        base = chosen[0].addr
+        out = bytearray()
+        for s in chosen:
+            if s.nobits:
+                continue
+            off = s.addr - base
+            if len(out) < off:
+                out.extend(bytes(off - len(out)))
+            out[off:off + len(s.data)] = s.data
+        return base, bytes(out)
+
+    def code_symbols(self) -> dict:
+        """Só os símbolos que caem numa seção executável (labels de código)."""
+        text = [(s.addr, s.addr + s.size) for s in self.sections.values() if s.alloc and s.executable]
+        return {name: addr for name, addr in self.symbols.items()
+                if any(lo <= addr < hi for lo, hi in text)}
+
+    def symbol_at(self):
+        """Mapa endereço -> nome (útil para relatórios por label)."""
+        return {addr: name for name, addr in sorted(self.symbols.items(), key=lambda kv: kv[0])}
+
+
+def read_elf(path) -> ElfImage:
+    data = Path(path).read_bytes()
+    if data[:4] != b"\x7fELF":
+        raise ElfError(f"{path}: não é um ELF")
+    if data[4] != 1 or data[5] != 1:
+        raise ElfError(f"{path}: somente ELF32 little-endian é suportado")
+
+    (e_entry, e_phoff, e_shoff) = struct.unpack_from("<III", data, 24)
+    (e_phentsize, e_phnum, e_shentsize, e_shnum, e_shstrndx) = struct.unpack_from("<HHHHH", data, 42)
+
+    segments = []
+    for i in range(e_phnum):
+        p_type, p_offset, p_vaddr, _paddr, p_filesz, p_memsz, _flags, _align = \
+            struct.unpack_from("<8I", data, e_phoff + i * e_phentsize)
+        if p_type == 1:  # PT_LOAD
+            segments.append((p_vaddr, data[p_offset:p_offset + p_filesz], p_memsz))
+
+    headers = [struct.unpack_from("<10I", data, e_shoff + i * e_shentsize) for i in range(e_shnum)]
+    strtab_off = headers[e_shstrndx][4] if e_shnum else 0
+
+    def name_at(table_off, idx):
+        end = data.index(b"\0", table_off + idx)
+        return data[table_off + idx:end].decode(errors="replace")
+
+    sections = {}
+    symbols = {}
+    for h in headers:
+        sh_name, sh_type, sh_flags, sh_addr, sh_offset, sh_size, sh_link = h[:7]
+        name = name_at(strtab_off, sh_name)
+        body = b"" if sh_type == Section.SHT_NOBITS else data[sh_offset:sh_offset + sh_size]
+        if name:
+            sections[name] = Section(name, sh_addr, sh_size, body, sh_flags, sh_type)
+        if sh_type == 2:  # SHT_SYMTAB
+            str_off = headers[sh_link][4]
+            for off in range(sh_offset, sh_offset + sh_size, 16):
+                st_name, st_value, _size, st_info, _other, st_shndx = struct.unpack_from("<IIIBBH", data, off)
+                # NOTYPE / FUNC definidos numa seção (fora SHN_UNDEF e SHN_ABS/COMMON: .equ não é endereço)
+                if st_name and (st_info & 0xF) in (0, 2) and 0 < st_shndx < SHN_LORESERVE:
+                    symbols[name_at(str_off, st_name)] = st_value
+
+    return ElfImage(e_entry, segments, sections, symbols)
+
+
+def read_hex(path) -> list:
+    """Arquivo texto com uma palavra hex por linha (como lido pelo hread do ROM_simulation)."""
+    words = []
+    with open(path) as f:
+        for line in f:
+            s = line.strip()
+            if s and not s.startswith(("#", "//")):
+                words.append(int(s, 16))
+    return words
+
+
+def bytes_to_words(data: bytes) -> list:
+    """Bytes little-endian -> palavras de 32 bits (completa com zeros até múltiplo de 4)."""
+    if len(data) % 4:
+        data = bytes(data) + bytes(4 - len(data) % 4)
+    return list(struct.unpack(f"<{len(data) // 4}I", data))
+
+
+def words_to_bytes(words) -> bytes:
+    return struct.pack(f"<{len(words)}I", *words)
+
+
+def load_program(path):
+    """
+    Carrega uma imagem de programa.
+    Retorna (rom_words, data_segments, symbols):
+      rom_words     - palavras a partir do endereço 0 da ROM
+      data_segments - [(endereço, bytes)] destinados à RAM (só ELF)
+      symbols       - {nome: endereço} dos labels de código (só ELF)
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".hex":
+        return read_hex(path), [], {}
+    if suffix == ".bin":
+        return bytes_to_words(path.read_bytes()), [], {}
+    if suffix == ".elf":
+        elf = read_elf(path)
+        text = [s for s in elf.sections.values() if s.alloc and s.executable]
+        base, code = elf.section_bytes([s.name for s in text])
+        if base != 0:
+            code = bytes(base) + code
+        data_segments = [(s.addr, s.data) for s in elf.sections.values()
+                         if s.alloc and not s.executable and not s.nobits and s.size]
+        return bytes_to_words(code), data_segments, elf.code_symbols()
+    raise ValueError(f"Formato de imagem não suportado: {path.name} (use .hex, .bin ou .elf)")
@@ -0,0 +1,647 @@
+"""
+l2ip_soc.py — emulador do SoC L2IP (core + ROM/RAM + LEDs + GPIO + TIMER) em Python.
+
+Roda o firmware de L2IP/sw (firmware.elf, ou firmware_rom + firmware_data gerados
+pelo memimg.py --split) sem FPGA nem GHDL, para regressão em CI. O core é o
+rv32im_iss; este módulo põe na frente dele o barramento de dados do L2IP.vhd:
+
+  0x0000_0000  ROM   8192 palavras (rom_addr[14:2], só busca de instruções)
+  0x8000_0000  RAM   4096 palavras (ram_addr[13:2])
+  0x9000_0000  LEDs  LEDR(7:0) <= wdata[7:0]
+  0xA000_0000  GPIO  registrador = addr[5:2] (GPIO_OPERATION_DECODER)
+  0xB000_0000  TIMER registrador = addr[4:2] (TIMER_OPERATION_DECODER)
+
+O TIMER segue o TIMER.vhd (PERIPH_TIMER = "011"), embora ainda esteja comentado no
+L2IP.vhd. Leituras fora do mapa devolvem 0 e escritas são ignoradas (contadas em
+'unmapped'); no hardware a leitura devolve o último q da RAM.
+
+Tempo: ciclo = instruções × cpi (padrão 1, o pipeline sem stalls). GPIO e TIMER
+não andam a cada instrução: são sincronizados com o ciclo atual só quando o
+programa acessa um deles (ou no fim do run), de forma exata — o TIMER avança em
+bloco entre acessos e as entradas do GPIO passam pelos 2 estágios do sincronizador.
+Laços de espera (contagem ou polling do TIMER/GPIO) são pulados pelo fastforward.py
+sem mudar o resultado; --no-fast-forward executa tudo instrução a instrução.
+
+Uso (da raiz do repo):
+  python3 -m tests.python.utils.l2ip_soc L2IP/sw/build/firmware.elf --until-leds 8
+  python3 -m tests.python.utils.l2ip_soc L2IP/sw/build/firmware_rom.hex --pins 0:0x10 \\
+      --expect-leds 1,2,4,8
+"""
+import sys
+import json
+import time
+import argparse
+from collections import deque
+from pathlib import Path
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+    from tests.python.utils.images import load_program, read_hex, words_to_bytes
+    from tests.python.utils.rv32im_iss import RAM, RV32IM, MASK32
+    from tests.python.utils.fastforward import LoopSkipper
+else:
+    from .images import load_program, read_hex, words_to_bytes
+    from .rv32im_iss import RAM, RV32IM, MASK32
+    from .fastforward import LoopSkipper
+
+ROM_WORDS = 8192
+RAM_BASE, RAM_WORDS = 0x80000000, 4096
+LED_BASE = 0x90000000
+GPIO_BASE = 0xA0000000
+TIMER_BASE = 0xB0000000
+SYNC_STAGES = 2             # GENERIC_SYNCHRONIZER_1BIT (N => 2) do GPIO_CELL
+CLOCK_MHZ = 50.0
+HOT_LOOP = 64               # repetições de um desvio para trás antes de tentar o fastforward
+
+_RAM_MASK = RAM_WORDS - 1
+_BYTE_MASKS = [(0xFF if m & 1 else 0) | (0xFF00 if m & 2 else 0) |
+               (0xFF0000 if m & 4 else 0) | (0xFF000000 if m & 8 else 0) for m in range(16)]
+
+
+class _Stop(Exception):
+    """Interrompe run() dentro de um store (condição de parada atingida)."""
+
+
+# ===========================================================================
+# TIMER (TIMER.vhd)
+# ===========================================================================
+
+class Timer:
+    """
+    TIMER.vhd de 32 bits. _edge() é uma borda de clock; advance(n) dá n bordas sem
+    acessos de uma vez (pula direto até a próxima mudança do contador e, em
+    auto-reset, repete períodos inteiros), com o mesmo resultado de n _edge().
+    """
+
+    CONFIG, LOAD, RESET, TOP, DUTY, OVF_STATUS, PWM, PRESCALER = range(8)
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.config = 0               # bit 0 start, 1 mode (hold), 2 pwm_en, 3 irq_mask
+        self.top = MASK32
+        self.duty = 0
+        self.prescaler = 0
+        self.counter = 0
+        self.psc = 0                  # contador do CLOCK_PRESCALER
+        self.tick = 0
+        self.ovf_prev = 0
+        self.status = 0
+        self.overflows = 0            # pulsos de overflow desde o reset
+        self.t = 0                    # ciclo representado pelo estado atual
+
+    @property
+    def overflow(self) -> int:
+        return int(self.counter >= self.top)
+
+    @property
+    def irq(self) -> int:
+        return self.status if self.config & 8 else 0
+
+    @property
+    def pwm(self) -> int:
+        return int(self.counter < self.duty) if self.config & 4 else 0
+
+    def _edge(self, wr: int = None, value: int = 0, clr_status: bool = False):
+        mode = self.config >> 1 & 1
+        overflow = self.counter >= self.top
+        if wr == self.RESET or (overflow and not mode):
+            self.counter = 0
+        elif wr == self.LOAD:
+            self.counter = value
+        elif self.config & 1 and self.tick and not (overflow and mode):
+            self.counter = (self.counter + 1) & MASK32
+        pulse = overflow and not self.ovf_prev
+        if pulse:
+            self.overflows += 1
+        if clr_status:
+            self.status = 0
+        elif pulse:
+            self.status = 1
+        self.ovf_prev = int(overflow)
+        comp = self.psc >= self.prescaler
+        self.psc = 0 if comp else self.psc + 1
+        self.tick = int(comp)
+        if wr == self.CONFIG:
+            self.config = value & 0xF
+        elif wr == self.TOP:
+            self.top = value
+        elif wr == self.DUTY:
+            self.duty = value
+        elif wr == self.PRESCALER:
+            self.prescaler = value
+
+    def _tick_cycle(self, d: int) -> int:
+        """Índice, a partir do ciclo atual, do d-ésimo ciclo com tick (d >= 1)."""
+        Q = self.prescaler + 1
+        first = (self.prescaler - self.psc if self.psc <= self.prescaler else 0) + 1
+        if self.tick:
+            return 0 if d == 1 else first + (d - 2) * Q
+        return first + (d - 1) * Q
+
+    def _prescale(self, m: int) -> int:
+        """Avança só o prescaler m bordas; devolve quantos desses m ciclos tinham tick."""
+        P, s = self.prescaler, self.psc
+        j0 = P - s if s <= P else 0           # borda do próximo comp (psc >= P)
+        Q = P + 1
+        ticks = self.tick + ((m - 2 - j0) // Q + 1 if m - 2 >= j0 else 0)
+        if m - 1 >= j0:
+            last = j0 + ((m - 1 - j0) // Q) * Q
+            self.psc = m - 1 - last
+            self.tick = int(last == m - 1)
+        else:
+            self.psc = s + m
+            self.tick = 0
+        return ticks
+
+    def advance(self, n: int):
+        seen = None
+        while n > 0:
+            mode = self.config >> 1 & 1
+            overflow = int(self.counter >= self.top)
+            if overflow != self.ovf_prev or (overflow and not mode):
+                wrap = overflow and not mode
+                self._edge()
+                n -= 1
+                if wrap:
+                    # logo após o auto-reset: estado repetido = período exato
+                    state = (self.counter, self.psc, self.tick, self.ovf_prev, self.status)
+                    if seen is not None and seen[0] == state:
+                        period = seen[1] - n
+                        k = n // period
+                        n -= k * period
+                        self.overflows += k * (self.overflows - seen[2])
+                        seen = None
+                    else:
+                        seen = (state, n, self.overflows)
+                continue
+            if overflow or not self.config & 1:
+                # parado (ou em hold): só o prescaler anda
+                self._prescale(n)
+                return
+            m = min(n, self._tick_cycle(self.top - self.counter))
+            if m == 0:
+                self._edge()
+                n -= 1
+                continue
+            self.counter += self._prescale(m)
+            n -= m
+
+    def sync(self, now: int):
+        if now > self.t:
+            self.advance(now - self.t)
+            self.t = now
+
+    def peek(self, reg: int) -> int:
+        """Valor lido em 'reg' no estado atual, sem o efeito colateral da leitura."""
+        return (self.config, self.counter, self.counter, self.top, self.duty,
+                self.overflow, self.pwm, self.prescaler)[reg]
+
+    def stable_for(self, reg: int):
+        """Ciclos, a partir de t, em que peek(reg) não muda sem acessos (None = nunca muda)."""
+        if reg in (self.CONFIG, self.TOP, self.DUTY, self.PRESCALER) or \
+                (reg == self.PWM and not self.config & 4):
+            return None
+        mode = self.config >> 1 & 1
+        if self.counter >= self.top:
+            if mode:
+                return None                   # hold: contador parado no topo
+            return None if self.counter == 0 else 1
+        if not self.config & 1:
+            return None
+        if reg == self.OVF_STATUS:
+            return self._tick_cycle(self.top - self.counter) + 1
+        if reg == self.PWM:
+            target = self.duty if self.counter < self.duty <= self.top else self.top
+            return self._tick_cycle(target - self.counter) + 1
+        return self._tick_cycle(1) + 1
+
+    def ramp(self):
+        """
+        (Q, h) se o contador está subindo 1 a cada Q ciclos: leituras nos ciclos
+        t .. t+h-1 ficam na rampa (até o valor top). None se não está contando.
+        """
+        if not self.config & 1 or self.counter >= self.top:
+            return None
+        return self.prescaler + 1, self._tick_cycle(self.top - self.counter) + 2
+
+    def read(self, reg: int, now: int) -> int:
+        self.sync(now)
+        value = self.peek(reg)
+        if reg == self.OVF_STATUS:            # read-to-clear (wr_en(5))
+            self._edge(clr_status=True)
+            self.t = now + 1
+        return value
+
+    def write(self, reg: int, value: int, now: int):
+        self.sync(now)
+        if reg in (self.OVF_STATUS, self.PWM):
+            return
+        self._edge(reg, value)
+        self.t = now + 1
+
+
+# ===========================================================================
+# GPIO (GPIO.vhd / GPIO_CELL.vhd)
+# ===========================================================================
+
+class Gpio:
+    """
+    32 GPIO_CELLs. 'ext' é o que o mundo externo põe nos pinos de entrada
+    (dir = 0); 'pins' é a leitura sincronizada (PINS), SYNC_STAGES ciclos atrás
+    do pino. As bordas de pins ligam irq_status conforme RISE/FALL e IRQ_MASK.
+    """
+
+    DIR, OUT, SET, CLR, TGL, IRQ_MASK, RISE, FALL, IRQ_STAT, PINS = range(10)
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.dir = self.out = self.ext = 0
+        self.irq_mask = self.rise = self.fall = self.status = 0
+        self.pins = 0
+        self._events = deque()        # (ciclo em que pins passa a valer, valor do pino)
+
+    @property
+    def pad(self) -> int:
+        return (self.out & self.dir) | (self.ext & ~self.dir & MASK32)
+
+    @property
+    def output(self) -> int:
+        return self.out & self.dir
+
+    @property
+    def irq(self) -> int:
+        return int(self.status != 0)
+
+    def sync(self, now: int):
+        ev = self._events
+        while ev and ev[0][0] <= now:
+            new = ev.popleft()[1]
+            old = self.pins
+            edges = (self.rise & new & ~old) | (self.fall & old & ~new)
+            self.status |= edges & self.irq_mask
+            self.pins = new
+
+    def drive(self, value: int, cycle: int):
+        """Entrada externa: a partir de 'cycle' os pinos de entrada valem 'value'."""
+        before = self.pad
+        self.ext = value & MASK32
+        if self.pad != before:
+            self._events.append((cycle + SYNC_STAGES, self.pad))
+
+    def read(self, reg: int, now: int) -> int:
+        self.sync(now)
+        if reg == self.DIR:
+            return self.dir
+        if self.OUT <= reg <= self.TGL:
+            return self.out
+        if reg == self.PINS:
+            return self.pins
+        if reg == self.IRQ_STAT:
+            value, self.status = self.status, 0    # read-to-clear
+            return value
+        if reg == self.IRQ_MASK:
+            return self.irq_mask
+        if reg == self.RISE:
+            return self.rise
+        if reg == self.FALL:
+            return self.fall
+        return 0
+
+    def write(self, reg: int, value: int, now: int):
+        self.sync(now)
+        before = self.pad
+        if reg == self.DIR:
+            self.dir = value
+        elif reg == self.OUT:
+            self.out = value
+        elif reg == self.SET:
+            self.out |= value
+        elif reg == self.CLR:
+            self.out &= ~value & MASK32
+        elif reg == self.TGL:
+            self.out ^= value
+        elif reg == self.IRQ_MASK:
+            self.irq_mask = value
+        elif reg == self.RISE:
+            self.rise = value
+        elif reg == self.FALL:
+            self.fall = value
+        if self.pad != before:
+            self._events.append((now + 1 + SYNC_STAGES, self.pad))
+
+
+# ===========================================================================
+# Barramento de dados do L2IP
+# ===========================================================================
+
+class L2IPBus:
+    """
+    Barramento de dados com a interface de RAM do rv32im_iss (read_word/write_word).
+    A RAM é atendida direto; LEDs, GPIO e TIMER recebem o ciclo atual de 'clock()'.
+
+    log    : [(ciclo, "led" | "gpio", valor)] a cada mudança dos LEDs ou das saídas do GPIO
+    inputs : [(ciclo, valor)] entradas externas do GPIO, aplicadas quando o tempo chega
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.ram = RAM(RAM_WORDS, base=RAM_BASE)
+        self._mem = self.ram.mem
+        self.leds = 0
+        self.gpio = Gpio()
+        self.timer = Timer()
+        self.inputs = deque()
+        self.log = []
+        self.led_changes = 0
+        self.unmapped = 0
+        self.stop_after = None        # nº de mudanças dos LEDs que interrompe o run()
+
+    def schedule_inputs(self, events):
+        self.inputs = deque(sorted(list(self.inputs) + list(events)))
+
+    def sync(self, now: int = None):
+        now = self.clock() if now is None else now
+        inputs = self.inputs
+        while inputs and inputs[0][0] <= now:
+            cycle, value = inputs.popleft()
+            self.gpio.drive(value, cycle)
+        self.gpio.sync(now)
+        self.timer.sync(now)
+        return now
+
+    # -- interface do ISS --------------------------------------------------------------
+    def read_word(self, addr: int) -> int:
+        if addr >> 28 == 0x8:
+            return self._mem[(addr >> 2) & _RAM_MASK]
+        return self._read_io(addr)
+
+    def write_word(self, addr: int, data: int, mask: int):
+        if addr >> 28 == 0x8:
+            mem = self._mem
+            i = (addr >> 2) & _RAM_MASK
+            if mask == 0xF:
+                mem[i] = data
+            else:
+                bm = _BYTE_MASKS[mask]
+                mem[i] = (mem[i] & ~bm & MASK32) | (data & bm)
+            return
+        self._write_io(addr, data)
+
+    def read_window(self, addr: int, value: int, now: int):
+        """
+        Para o fastforward: logo após uma leitura de 'addr' (valor 'value') no ciclo
+        'now', devolve (h, rampa). Leituras nos ciclos now .. now+h-1 devolvem o mesmo
+        valor (h None = sempre); rampa = (Q, h) se o valor é o contador do TIMER
+        subindo 1 a cada Q ciclos até now+h-1. None se o endereço não é previsível.
+        """
+        periph = addr >> 28
+        if periph == 0x9:
+            return None, None
+        if periph == 0xA:
+            reg = (addr >> 2) & 0xF
+            gpio = self.gpio
+            if reg not in (Gpio.PINS, Gpio.IRQ_STAT):
+                return None, None
+            if reg == Gpio.IRQ_STAT and value != gpio.status:
+                return 1, None                # read-to-clear: a próxima leitura já difere
+            nxt = [gpio._events[0][0]] if gpio._events else []
+            if self.inputs:
+                nxt.append(self.inputs[0][0] + SYNC_STAGES)
+            return (min(nxt) - now if nxt else None), None
+        if periph == 0xB:
+            timer = self.timer
+            reg = (addr >> 2) & 0x7
+            lag = timer.t - now               # 1 depois do read-to-clear do OVF_STATUS
+            if timer.peek(reg) != value:
+                return max(lag, 1), None
+            h = timer.stable_for(reg)
+            ramp = timer.ramp() if reg in (Timer.LOAD, Timer.RESET) else None
+            return (None if h is None else lag + h), (ramp and (ramp[0], lag + ramp[1]))
+        return None
+
+    # -- periféricos ---------------------------------------------------------------
+    def _read_io(self, addr: int) -> int:
+        periph = addr >> 28
+        if periph == 0xA:
+            return self.gpio.read((addr >> 2) & 0xF, self.sync())
+        if periph == 0xB:
+            return self.timer.read((addr >> 2) & 0x7, self.sync())
+        self.unmapped += periph != 0x9
+        return 0
+
+    def _write_io(self, addr: int, data: int):
+        periph = addr >> 28
+        if periph == 0x9:
+            value = data & 0xFF
+            if value != self.leds:
+                self.leds = value
+                self.log.append((self.clock(), "led", value))
+                self.led_changes += 1
+                if self.stop_after is not None and self.led_changes >= self.stop_after:
+                    raise _Stop()
+        elif periph == 0xA:
+            before = self.gpio.output
+            self.gpio.write((addr >> 2) & 0xF, data, self.sync())
+            if self.gpio.output != before:
+                self.log.append((self.clock(), "gpio", self.gpio.output))
+        elif periph == 0xB:
+            self.timer.write((addr >> 2) & 0x7, data, self.sync())
+        else:
+            self.unmapped += 1
+
+
+# ===========================================================================
+# SoC
+# ===========================================================================
+
+class L2IPSoC:
+    """
+    rom_words : imagem da ROM (palavras a partir de 0x0)
+    data      : [(endereço, bytes)] pré-carregados na RAM (.rodata/.data)
+    cpi       : ciclos de clock por instrução
+    inputs    : [(ciclo, valor)] entradas externas do GPIO
+    """
+
+    def __init__(self, rom_words, data=(), cpi: int = 1, inputs=(), fast_forward: bool = True):
+        self.bus = L2IPBus(lambda: self.cpu.cycles)
+        self.cpu = RV32IM(rom_words, self.bus, rom_depth=ROM_WORDS, cpi=cpi)
+        for addr, blob in data:
+            self.bus.ram.load_bytes(addr, blob)
+        self.bus.schedule_inputs(inputs)
+        self.skipper = LoopSkipper(self) if fast_forward else None
+
+    @property
+    def cycles(self) -> int:
+        return self.cpu.cycles
+
+    def run(self, max_steps: int = 10_000_000, until_leds: int = None) -> str:
+        """
+        Executa até max_steps instruções, ecall/ebreak, um laço 'j .' ou (com
+        until_leds) a N-ésima mudança dos LEDs. Devolve o motivo da parada.
+        Um desvio para trás que repete o mesmo alvo HOT_LOOP vezes passa o laço
+        ao LoopSkipper, que pode pular iterações ociosas.
+        """
+        cpu = self.cpu
+        cache = cpu._cache
+        compile_ = cpu._compile
+        skipper = self.skipper
+        self.bus.stop_after = None if until_leds is None else self.bus.led_changes + until_leds
+        end = cpu.retired + max_steps
+        pc = cpu.pc
+        reason = None
+        try:
+            while reason is None:
+                back, hits = -1, 0
+                for _ in range(max(end - cpu.retired, 0)):
+                    f = cache.get(pc)
+                    if f is None:
+                        f = cache[pc] = compile_(pc)
+                    next_pc = f()
+                    cpu.retired += 1
+                    if next_pc <= pc:
+                        if next_pc == pc:
+                            reason = cpu.halted or "self-loop"
+                            break
+                        if next_pc != back:
+                            back, hits = next_pc, 0
+                        else:
+                            hits += 1
+                            if hits == HOT_LOOP and skipper is not None:
+                                cpu.pc = next_pc
+                                skipper.try_skip(next_pc, end)
+                                pc = cpu.pc
+                                break
+                    pc = next_pc
+                else:
+                    reason = "max-steps"
+        except _Stop:
+            # o store que atingiu a condição já foi feito: conclui a instrução
+            pc = (pc + 4) & MASK32
+            cpu.retired += 1
+            reason = "leds"
+        cpu.pc = pc
+        if reason in ("ecall", "ebreak", "self-loop"):
+            cpu.halted = reason
+        self.bus.stop_after = None
+        self.bus.sync()
+        return reason
+
+
+def _read_data_image(path) -> bytes:
+    path = Path(path)
+    if path.suffix.lower() == ".hex":
+        return words_to_bytes(read_hex(path))
+    return path.read_bytes()
+
+
+def load_firmware(image, data=None, data_base: int = RAM_BASE, cpi: int = 1, inputs=(),
+                  fast_forward: bool = True) -> L2IPSoC:
+    """
+    Cria o SoC a partir de um ELF ou de firmware_rom.{hex,bin}. Sem 'data', um
+    firmware_rom.* usa o firmware_data.* ao lado, se existir (carregado em data_base).
+    """
+    image = Path(image)
+    rom, segments, _symbols = load_program(image)
+    if data is None and image.stem.endswith("_rom"):
+        sibling = image.with_name(image.stem[:-4] + "_data" + image.suffix)
+        data = sibling if sibling.exists() else None
+    if data is not None:
+        segments = list(segments) + [(data_base, _read_data_image(data))]
+    return L2IPSoC(rom, segments, cpi=cpi, inputs=inputs, fast_forward=fast_forward)
+
+
+# ===========================================================================
+# CLI
+# ===========================================================================
+
+def _parse_pins(text: str):
+    try:
+        cycle, value = text.split(":", 1)
+        return int(cycle, 0), int(value, 0) & MASK32
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"esperado CICLO:VALOR (recebido '{text}')")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Emulador do SoC L2IP (core + LEDs + GPIO + TIMER)")
+    p.add_argument("image", help="firmware.elf ou firmware_rom.{hex,bin}")
+    p.add_argument("--data", help="Imagem da RAM (firmware_data.{hex,bin}); padrão: ao lado da ROM")
+    p.add_argument("--data-base", type=lambda s: int(s, 0), default=RAM_BASE)
+    p.add_argument("--max-steps", type=int, default=10_000_000, help="Limite de instruções")
+    p.add_argument("--cpi", type=int, default=1, help="Ciclos de clock por instrução")
+    p.add_argument("--clock-mhz", type=float, default=CLOCK_MHZ, help="Clock usado para converter ciclos em tempo")
+    p.add_argument("--pins", type=_parse_pins, action="append", default=[], metavar="CICLO:VALOR",
+                   help="Entradas externas do GPIO a partir de CICLO (repetível)")
+    p.add_argument("--until-leds", type=int, metavar="N", help="Para na N-ésima mudança dos LEDs")
+    p.add_argument("--expect-leds", metavar="V1,V2,...",
+                   help="Sequência esperada de valores dos LEDs (sai com 1 se divergir)")
+    p.add_argument("--no-fast-forward", action="store_true",
+                   help="Executa todas as iterações dos laços de espera (sem o fastforward)")
+    p.add_argument("--log-json", metavar="ARQ", help="Grava o log de LEDs/GPIO em JSON")
+    p.add_argument("--quiet", action="store_true", help="Não lista o log")
+    args = p.parse_args()
+
+    expect = None
+    if args.expect_leds:
+        expect = [int(v, 0) for v in args.expect_leds.split(",") if v.strip()]
+    until = args.until_leds if args.until_leds is not None else (len(expect) if expect else None)
+
+    try:
+        soc = load_firmware(args.image, args.data, args.data_base, args.cpi, args.pins,
+                            not args.no_fast_forward)
+        t0 = time.perf_counter()
+        reason = soc.run(args.max_steps, until)
+        wall = time.perf_counter() - t0
+    except Exception as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    bus, cpu = soc.bus, soc.cpu
+    us_per_cycle = 1.0 / args.clock_mhz
+    if not args.quiet:
+        print(f"  {'ciclo':>12}{'t (ms)':>12}  dispositivo  valor")
+        for cycle, what, value in bus.log:
+            shown = f"{value:08b}" if what == "led" else f"0x{value:08x}"
+            print(f"  {cycle:>12}{cycle * us_per_cycle / 1000:>12.3f}  {what:<11}  {shown}")
+
+    # MIPS interpretados (instruções executadas de fato) e efetivos (com as puladas pelo fastforward)
+    skipped = soc.skipper.skipped if soc.skipper is not None else 0
+    rate = (lambda n: n / wall / 1e6) if wall > 0 else (lambda n: float("inf"))
+    mips = f"{rate(cpu.retired - skipped):.2f} MIPS"
+    if skipped:
+        mips += f" interpretados, {rate(cpu.retired):.2f} efetivos"
+    print(f"{cpu.retired} instruções, {soc.cycles} ciclos "
+          f"({soc.cycles * us_per_cycle / 1000:.3f} ms a {args.clock_mhz:g} MHz), parada: {reason}, "
+          f"pc={cpu.pc:#010x}, {wall:.2f}s ({mips})", file=sys.stderr)
+    print(f"  LEDs={bus.leds:08b}  GPIO dir=0x{bus.gpio.dir:08x} out=0x{bus.gpio.out:08x} "
+          f"pins=0x{bus.gpio.pins:08x} irq={bus.gpio.irq}  TIMER counter={bus.timer.counter} "
+          f"overflows={bus.timer.overflows} irq={bus.timer.irq}", file=sys.stderr)
+    if soc.skipper is not None and soc.skipper.skipped:
+        loops = soc.skipper.loops
+        print(f"  fastforward: {soc.skipper.skipped} instruções puladas em {len(loops)} laço(s) "
+              f"(" + ", ".join(f"0x{h:08x} {v['kind']}" for h, v in sorted(loops.items())) + ")",
+              file=sys.stderr)
+    if bus.unmapped:
+        print(f"  aviso: {bus.unmapped} acesso(s) fora do mapa de memória", file=sys.stderr)
+
+    if args.log_json:
+        Path(args.log_json).write_text(json.dumps({
+            "image": args.image, "stop": reason, "instructions": cpu.retired, "cycles": soc.cycles,
+            "log": [{"cycle": c, "device": d, "value": v} for c, d, v in bus.log],
+        }, indent=2) + "\n")
+
+    if expect is not None:
+        got = [v for _, d, v in bus.log if d == "led"][:len(expect)]
+        if got != expect:
+            print(f"LEDs divergem: esperado {[hex(v) for v in expect]}, obtido {[hex(v) for v in got]}",
+                  file=sys.stderr)
+            sys.exit(1)
+        print(f"LEDs conferem ({len(expect)} valores)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+pipeline_model.py — contagem de ciclos do rv32im_pipeline_core a partir do trace dinâmico.
+
+Consome os Retire do ISS (rv32im_iss) e aplica as mesmas regras do hardware:
+  - load-use: a hazard_detection_unit compara o rd do load em ID/EX com os campos
+    crus rs1/rs2 (bits 19:15 e 24:20) da instrução em IF/ID -> 1 bolha
+  - desvio tomado (branch tomado, JAL, JALR): resolvido em EX, flush de IF/ID e
+    ID/EX -> 2 ciclos
+  - M-extension: muldiv_busy segura o pipeline por (latência - 1) ciclos
+  - enchimento do pipeline de 5 estágios: +4 ciclos
+
+Uso:
+  python3 -m tests.python.utils.pipeline_model tests/FPGA/core/asm_tests/full.elf --m-latency 3
+"""
+import sys
+import json
+import argparse
+from pathlib import Path
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+    from tests.python.utils.rv32im_iss import from_image
+    from tests.python.utils.encoding import OP_LOAD, OP_STORE, OP_BRANCH, OP_JAL, OP_JALR, OP_REG
+else:
+    from .rv32im_iss import from_image
+    from .encoding import OP_LOAD, OP_STORE, OP_BRANCH, OP_JAL, OP_JALR, OP_REG
+
+PIPELINE_FILL = 4
+BRANCH_PENALTY = 2
+
+
+def is_muldiv(insn: int) -> bool:
+    return (insn & 0x7F) == OP_REG and (insn >> 25) == 0x01
+
+
+class PipelineStats:
+    def __init__(self, m_latency: int = 1, branch_penalty: int = BRANCH_PENALTY, fill: int = PIPELINE_FILL):
+        self.m_latency = m_latency
+        self.branch_penalty = branch_penalty
+        self.fill = fill
+        self.instructions = 0
+        self.loads = 0
+        self.stores = 0
+        self.branches = 0
+        self.branches_taken = 0
+        self.jumps = 0
+        self.m_ops = 0
+        self.load_use_stalls = 0
+        self._prev = None       # (rd do load anterior ou 0)
+
+    def feed(self, r):
+        insn = r.insn
+        opcode = insn & 0x7F
+        self.instructions += 1
+
+        # load-use: rd do load anterior contra os campos crus da instrução atual (como na HDU)
+        if self._prev and self._prev in ((insn >> 15) & 31, (insn >> 20) & 31):
+            self.load_use_stalls += 1
+
+        self._prev = 0
+        if opcode == OP_LOAD:
+            self.loads += 1
+            self._prev = (insn >> 7) & 31
+        elif opcode == OP_STORE:
+            self.stores += 1
+        elif opcode == OP_BRANCH:
+            self.branches += 1
+            if r.next_pc != (r.pc + 4) & 0xFFFFFFFF:
+                self.branches_taken += 1
+        elif opcode in (OP_JAL, OP_JALR):
+            self.jumps += 1
+        elif is_muldiv(insn):
+            self.m_ops += 1
+
+    def consume(self, trace):
+        for r in trace:
+            self.feed(r)
+        return self
+
+    # ------------------------------------------------------------------
+    @property
+    def flush_cycles(self) -> int:
+        return (self.branches_taken + self.jumps) * self.branch_penalty
+
+    @property
+    def m_busy_cycles(self) -> int:
+        return self.m_ops * max(self.m_latency - 1, 0)
+
+    @property
+    def cycles(self) -> int:
+        if not self.instructions:
+            return 0
+        return self.instructions + self.fill + self.load_use_stalls + self.flush_cycles + self.m_busy_cycles
+
+    @property
+    def cpi(self) -> float:
+        return self.cycles / self.instructions if self.instructions else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "instructions":      self.instructions,
+            "loads":             self.loads,
+            "stores":            self.stores,
+            "branches":          self.branches,
+            "branches_taken":    self.branches_taken,
+            "jumps":             self.jumps,
+            "m_ops":             self.m_ops,
+            "load_use_stalls":   self.load_use_stalls,
+            "flush_cycles":      self.flush_cycles,
+            "m_busy_cycles":     self.m_busy_cycles,
+            "cycles":            self.cycles,
+            "cpi":               round(self.cpi, 3),
+        }
+
+
+def measure(image, m_latency: int = 1, max_steps: int = 10_000_000, ram_words: int = 4096) -> tuple:
+    """Executa 'image' no ISS e retorna (PipelineStats, motivo da parada)."""
+    cpu = from_image(image, ram_words=ram_words)
+    stats = PipelineStats(m_latency=m_latency).consume(cpu.iter_trace(max_steps))
+    return stats, cpu.halted or "max-steps"
+
+
+def main():
+    p = argparse.ArgumentParser(description="Ciclos do pipeline medidos pelo trace dinâmico do ISS")
+    p.add_argument("image", help="Programa (.elf, .hex ou .bin)")
+    p.add_argument("--m-latency", type=int, default=1, help="Ciclos de cada instrução M no multdiv")
+    p.add_argument("--max-steps", type=int, default=10_000_000)
+    args = p.parse_args()
+
+    stats, halted = measure(args.image, args.m_latency, args.max_steps)
+    print(json.dumps(dict(stats.to_dict(), halted=halted), indent=2))
+
+
+if __name__ == "__main__":
+    main()
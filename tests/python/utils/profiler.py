@@ -0,0 +1,199 @@
+"""
+profiler.py — perfil dinâmico (instruction mix) de um programa executado no ISS.
+
+Roda a imagem (full.elf, firmware do L2IP, codes/build/*.hex) no rv32im_iss e
+gera um JSON com:
+  mix         contagem dinâmica por mnemônico e por classe (alu, load, store, ...)
+  hot_blocks  blocos básicos dinâmicos mais executados (entrada, tamanho, símbolo)
+  branches    taxa de desvio tomado por branch (PC) e por mnemônico
+  memory      histogramas de endereços de load/store em faixas de --bucket bytes
+
+Os blocos básicos são dinâmicos: um bloco começa no PC de entrada e termina na
+primeira instrução de controle (branch, JAL, JALR, ECALL/EBREAK). Um salto para o
+meio de um bloco já visto abre um bloco novo com outra entrada.
+
+Uso (da raiz do repo):
+  python3 -m tests.python.utils.profiler tests/FPGA/core/asm_tests/full.elf -o /tmp/full_profile.json
+  python3 -m tests.python.utils.profiler build/firmware.elf --ram-words 4096 --top 10 --bucket 256
+"""
+import sys
+import json
+import bisect
+import argparse
+from collections import Counter
+from pathlib import Path
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+    from tests.python.utils.images import load_program
+    from tests.python.utils.rv32im_iss import RAM, RV32IM
+    from tests.python.utils.encoding import mnemonic, insn_class
+else:
+    from .images import load_program
+    from .rv32im_iss import RAM, RV32IM
+    from .encoding import mnemonic, insn_class
+
+CONTROL = ("branch", "jump", "system")
+
+
+class SymbolTable:
+    """Endereço -> 'símbolo+offset' (símbolo mais próximo abaixo)."""
+
+    def __init__(self, symbols: dict):
+        pairs = sorted((addr, name) for name, addr in symbols.items() if name and not name.startswith("$"))
+        self.addrs = [a for a, _n in pairs]
+        self.names = [n for _a, n in pairs]
+
+    def lookup(self, addr: int):
+        i = bisect.bisect_right(self.addrs, addr) - 1
+        if i < 0:
+            return None
+        off = addr - self.addrs[i]
+        return self.names[i] if off == 0 else f"{self.names[i]}+0x{off:x}"
+
+
+class Profile:
+    def __init__(self, bucket: int = 64):
+        self.bucket = bucket
+        self.instructions = 0
+        self.mnemonics = Counter()
+        self.classes = Counter()
+        self.block_count = Counter()        # entrada -> execuções
+        self.block_len = {}                 # entrada -> instruções (último tamanho visto)
+        self.branch_exec = Counter()        # pc -> execuções
+        self.branch_taken = Counter()       # pc -> tomados
+        self.branch_name = {}
+        self.loads = Counter()              # faixa -> acessos
+        self.stores = Counter()
+        self._block = None
+        self._block_n = 0
+
+    def feed(self, r):
+        insn = r.insn
+        name = mnemonic(insn)
+        cls = insn_class(insn)
+        self.instructions += 1
+        self.mnemonics[name] += 1
+        self.classes[cls] += 1
+
+        if self._block is None:
+            self._block = r.pc
+            self._block_n = 0
+        self._block_n += 1
+
+        if cls == "branch":
+            self.branch_exec[r.pc] += 1
+            self.branch_name[r.pc] = name
+            if r.next_pc != (r.pc + 4) & 0xFFFFFFFF:
+                self.branch_taken[r.pc] += 1
+        elif r.mem_op == "L":
+            self.loads[r.mem_addr // self.bucket * self.bucket] += 1
+        elif r.mem_op == "S":
+            self.stores[r.mem_addr // self.bucket * self.bucket] += 1
+
+        if cls in CONTROL:
+            self._close_block()
+
+    def _close_block(self):
+        if self._block is not None:
+            self.block_count[self._block] += 1
+            self.block_len[self._block] = self._block_n
+            self._block = None
+
+    def consume(self, trace):
+        for r in trace:
+            self.feed(r)
+        self._close_block()
+        return self
+
+    # ------------------------------------------------------------------
+    def to_dict(self, symbols: SymbolTable = None, top: int = 20) -> dict:
+        n = self.instructions or 1
+        sym = symbols.lookup if symbols else (lambda _a: None)
+
+        blocks = sorted(self.block_count, key=lambda a: self.block_count[a] * self.block_len[a], reverse=True)
+        hot = []
+        for a in blocks[:top]:
+            dyn = self.block_count[a] * self.block_len[a]
+            hot.append({"entry": f"0x{a:08x}", "symbol": sym(a), "length": self.block_len[a],
+                        "executions": self.block_count[a], "instructions": dyn,
+                        "pct": round(100 * dyn / n, 2)})
+
+        per_pc = []
+        by_name = {}
+        for pc in sorted(self.branch_exec):
+            ex, tk = self.branch_exec[pc], self.branch_taken[pc]
+            per_pc.append({"pc": f"0x{pc:08x}", "symbol": sym(pc), "op": self.branch_name[pc],
+                           "executed": ex, "taken": tk, "taken_ratio": round(tk / ex, 3)})
+            agg = by_name.setdefault(self.branch_name[pc], [0, 0])
+            agg[0] += ex
+            agg[1] += tk
+        total_ex = sum(self.branch_exec.values())
+        total_tk = sum(self.branch_taken.values())
+
+        def histogram(counter):
+            return {f"0x{a:08x}": c for a, c in sorted(counter.items())}
+
+        return {
+            "instructions": self.instructions,
+            "mix": {
+                "by_mnemonic": {k: {"count": v, "pct": round(100 * v / n, 2)}
+                                for k, v in self.mnemonics.most_common()},
+                "by_class": {k: {"count": v, "pct": round(100 * v / n, 2)}
+                             for k, v in self.classes.most_common()},
+            },
+            "hot_blocks": hot,
+            "branches": {
+                "executed": total_ex,
+                "taken": total_tk,
+                "taken_ratio": round(total_tk / total_ex, 3) if total_ex else None,
+                "by_mnemonic": {k: {"executed": e, "taken": t, "taken_ratio": round(t / e, 3)}
+                                for k, (e, t) in sorted(by_name.items())},
+                "by_pc": per_pc,
+            },
+            "memory": {
+                "bucket_bytes": self.bucket,
+                "loads": sum(self.loads.values()),
+                "stores": sum(self.stores.values()),
+                "load_histogram": histogram(self.loads),
+                "store_histogram": histogram(self.stores),
+            },
+        }
+
+
+def profile(image, ram_words: int = 512, max_steps: int = 10_000_000, bucket: int = 64, top: int = 20) -> dict:
+    """Executa 'image' no ISS e devolve o perfil como dict (pronto para JSON)."""
+    rom, data_segments, symbols = load_program(image)
+    ram = RAM(ram_words)
+    for addr, data in data_segments:
+        ram.load_bytes(addr, data)
+    cpu = RV32IM(rom, ram)
+    prof = Profile(bucket).consume(cpu.iter_trace(max_steps))
+    out = {"program": str(image), "halted": cpu.halted or "max-steps"}
+    out.update(prof.to_dict(SymbolTable(symbols), top))
+    return out
+
+
+def main():
+    p = argparse.ArgumentParser(description="Perfil dinâmico de instruções (ISS RV32IM) em JSON")
+    p.add_argument("image", help="Programa (.elf, .hex ou .bin)")
+    p.add_argument("-o", "--output", metavar="ARQ", help="Grava o JSON neste arquivo (padrão: stdout)")
+    p.add_argument("--ram-words", type=int, default=4096, help="Palavras de 32 bits da RAM")
+    p.add_argument("--max-steps", type=int, default=10_000_000)
+    p.add_argument("--bucket", type=int, default=64, help="Tamanho da faixa dos histogramas de endereço (bytes)")
+    p.add_argument("--top", type=int, default=20, help="Quantidade de blocos quentes no relatório")
+    args = p.parse_args()
+
+    if args.bucket <= 0:
+        p.error("--bucket deve ser positivo")
+    report = profile(args.image, args.ram_words, args.max_steps, args.bucket, args.top)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+        print(f"{report['instructions']} instruções ({report['halted']}) -> {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
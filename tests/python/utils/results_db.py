@@ -0,0 +1,269 @@
+"""
+results_db.py — histórico dos resultados do runner em SQLite.
+
+Cada execução do runner.py acrescenta uma linha em 'runs' (data, commit, comando)
+e, por suíte, status, tempo total, divisão build/execução e tempo simulado; os
+testcases do results.xml vão para 'tests'. O kpi_report.py lê a última execução
+de cada suíte daqui em vez de procurar results.xml em sim_build/.
+
+O comando 'trend' compara o tempo de execução (sem build) da última rodada de cada
+suíte com a mediana das N anteriores e aponta as que ficaram mais lentas.
+
+Banco padrão: tests/python/sim_build/results.db (ou $RESULTS_DB).
+
+Uso:
+  python3 -m tests.python.utils.results_db runs
+  python3 -m tests.python.utils.results_db trend --window 5 --threshold 0.2
+  python3 -m tests.python.utils.results_db history five
+"""
+import os
+import sys
+import socket
+import sqlite3
+import argparse
+import statistics
+import subprocess
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+DEFAULT_DB = Path(__file__).resolve().parents[1] / "sim_build" / "results.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at  TEXT NOT NULL,
+    git_commit  TEXT,
+    git_dirty   INTEGER,
+    host        TEXT,
+    command     TEXT,
+    jobs        INTEGER,
+    wall_s      REAL
+);
+CREATE TABLE IF NOT EXISTS suites (
+    run_id      INTEGER NOT NULL REFERENCES runs(id),
+    suite       TEXT NOT NULL,
+    toplevel    TEXT,
+    status      TEXT NOT NULL,
+    tests       INTEGER,
+    failed      INTEGER,
+    wall_s      REAL,
+    build_s     REAL,
+    run_s       REAL,
+    build_cached INTEGER,
+    sim_time_ns REAL,
+    error       TEXT,
+    PRIMARY KEY (run_id, suite)
+);
+CREATE TABLE IF NOT EXISTS tests (
+    run_id      INTEGER NOT NULL REFERENCES runs(id),
+    suite       TEXT NOT NULL,
+    test        TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    sim_time_ns REAL,
+    wall_s      REAL
+);
+CREATE INDEX IF NOT EXISTS suites_by_name ON suites(suite, run_id);
+"""
+
+
+def db_path(path=None) -> Path:
+    return Path(path or os.environ.get("RESULTS_DB") or DEFAULT_DB)
+
+
+def connect(path=None) -> sqlite3.Connection:
+    path = db_path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(path, timeout=30)
+    con.row_factory = sqlite3.Row
+    con.executescript(SCHEMA)
+    return con
+
+
+def git_commit(repo: Path = REPO_ROOT) -> tuple:
+    """(hash do HEAD, árvore modificada?) ou (None, None) fora de um repositório git."""
+    try:
+        head = subprocess.run(["git", "rev-parse", "HEAD"], cwd=repo, capture_output=True,
+                              text=True, timeout=30).stdout.strip() or None
+        if head is None:
+            return None, None
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD", "--"], cwd=repo,
+                               capture_output=True, timeout=60).returncode != 0
+        return head, dirty
+    except (OSError, subprocess.SubprocessError):
+        return None, None
+
+
+def parse_results_xml(path, classname: str = None) -> list:
+    """
+    Testcases de um results.xml do cocotb: [{test, status, sim_time_ns, wall_s}].
+    classname (módulo de teste) filtra uma suíte de uma simulação compartilhada.
+    """
+    try:
+        root = ET.parse(path).getroot()
+    except (OSError, ET.ParseError):
+        return []
+    cases = []
+    for tc in root.iter("testcase"):
+        if classname is not None and tc.get("classname") != classname:
+            continue
+        if tc.find("failure") is not None or tc.find("error") is not None:
+            status = "FAIL"
+        elif tc.find("skipped") is not None:
+            status = "SKIP"
+        else:
+            status = "PASS"
+        sim = tc.get("sim_time_ns")
+        wall = tc.get("time")
+        cases.append({"test": tc.get("name", "?"), "status": status,
+                      "sim_time_ns": float(sim) if sim else None,
+                      "wall_s": float(wall) if wall else None})
+    return cases
+
+
+def record_run(summaries: list, command: str = None, jobs: int = 1, wall: float = None,
+               path=None) -> int:
+    """
+    Grava uma execução do runner. 'summaries' são os dicionários de run_suite
+    (name, status, tests, failed, elapsed, build_s, run_s, results_xml, ...).
+    Devolve o id da execução.
+    """
+    commit, dirty = git_commit()
+    con = connect(path)
+    with con:
+        cur = con.execute(
+            "INSERT INTO runs (started_at, git_commit, git_dirty, host, command, jobs, wall_s) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (datetime.now().isoformat(timespec="seconds"), commit,
+             None if dirty is None else int(dirty), socket.gethostname(), command, jobs, wall))
+        run_id = cur.lastrowid
+        for s in summaries:
+            cases = parse_results_xml(s["results_xml"], s.get("classname")) if s.get("results_xml") else []
+            sim_ns = [c["sim_time_ns"] for c in cases if c["sim_time_ns"] is not None]
+            con.execute(
+                "INSERT INTO suites (run_id, suite, toplevel, status, tests, failed, wall_s, build_s, "
+                "run_s, build_cached, sim_time_ns, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, s["name"], s.get("toplevel"), s["status"], s.get("tests"), s.get("failed"),
+                 s.get("elapsed"), s.get("build_s"), s.get("run_s"),
+                 None if s.get("build_cached") is None else int(s["build_cached"]),
+                 sum(sim_ns) if sim_ns else None, s.get("error")))
+            con.executemany(
+                "INSERT INTO tests (run_id, suite, test, status, sim_time_ns, wall_s) VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, s["name"], c["test"], c["status"], c["sim_time_ns"], c["wall_s"]) for c in cases])
+    con.close()
+    return run_id
+
+
+def latest(path=None, suites=None) -> dict:
+    """Última execução registrada de cada suíte: {suite: row}."""
+    if not db_path(path).exists():
+        return {}
+    con = connect(path)
+    rows = con.execute(
+        "SELECT s.*, r.started_at, r.git_commit FROM suites s JOIN runs r ON r.id = s.run_id "
+        "WHERE s.run_id = (SELECT MAX(run_id) FROM suites WHERE suite = s.suite)").fetchall()
+    con.close()
+    return {r["suite"]: dict(r) for r in rows if suites is None or r["suite"] in suites}
+
+
+def history(suite: str, limit: int = 20, path=None) -> list:
+    con = connect(path)
+    rows = con.execute(
+        "SELECT s.*, r.started_at, r.git_commit, r.git_dirty FROM suites s JOIN runs r ON r.id = s.run_id "
+        "WHERE s.suite = ? ORDER BY s.run_id DESC LIMIT ?", (suite, limit)).fetchall()
+    con.close()
+    return [dict(r) for r in rows]
+
+
+def trend(window: int = 5, threshold: float = 0.2, min_delta: float = 0.5, path=None) -> list:
+    """
+    Para cada suíte: tempo de execução da última rodada aprovada contra a mediana
+    das 'window' anteriores também aprovadas. regressed = mais lenta que
+    mediana * (1 + threshold) e pelo menos min_delta segundos acima.
+    Usa run_s (sem build) quando existe; senão o tempo total.
+    """
+    con = connect(path)
+    suites = [r[0] for r in con.execute("SELECT DISTINCT suite FROM suites ORDER BY suite")]
+    out = []
+    for suite in suites:
+        rows = con.execute(
+            "SELECT s.run_id, COALESCE(s.run_s, s.wall_s) AS t, r.git_commit FROM suites s "
+            "JOIN runs r ON r.id = s.run_id WHERE s.suite = ? AND s.status = 'PASS' "
+            "ORDER BY s.run_id DESC LIMIT ?", (suite, window + 1)).fetchall()
+        if not rows or rows[0]["t"] is None:
+            continue
+        last = rows[0]
+        previous = [r["t"] for r in rows[1:] if r["t"] is not None]
+        base = statistics.median(previous) if previous else None
+        ratio = last["t"] / base if base else None
+        out.append({
+            "suite": suite, "last_s": round(last["t"], 3), "last_commit": last["git_commit"],
+            "baseline_s": round(base, 3) if base is not None else None, "samples": len(previous),
+            "ratio": round(ratio, 3) if ratio is not None else None,
+            "regressed": bool(base is not None and last["t"] > base * (1 + threshold)
+                              and last["t"] - base >= min_delta),
+        })
+    con.close()
+    return out
+
+
+def print_trend(rows: list):
+    if not rows:
+        print("Nenhuma execução aprovada registrada.")
+        return
+    print(f"  {'suíte':<24}{'último (s)':>12}{'mediana (s)':>13}{'razão':>8}{'amostras':>10}")
+    for r in rows:
+        base = f"{r['baseline_s']:.2f}" if r["baseline_s"] is not None else "-"
+        ratio = f"{r['ratio']:.2f}" if r["ratio"] is not None else "-"
+        flag = "  <- REGRESSÃO" if r["regressed"] else ""
+        print(f"  {r['suite']:<24}{r['last_s']:>12.2f}{base:>13}{ratio:>8}{r['samples']:>10}{flag}")
+    n = sum(r["regressed"] for r in rows)
+    print(f"\n{n} suíte(s) com regressão de tempo" if n else "\nSem regressões de tempo")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Histórico de resultados do runner (SQLite)")
+    p.add_argument("--db", default=None, help=f"Banco de resultados (padrão: $RESULTS_DB ou {DEFAULT_DB})")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("runs", help="Lista as últimas execuções").add_argument("--limit", type=int, default=10)
+    t = sub.add_parser("trend", help="Aponta suítes cujo tempo de execução regrediu")
+    t.add_argument("--window", type=int, default=5, help="Execuções anteriores usadas na mediana")
+    t.add_argument("--threshold", type=float, default=0.2, help="Aumento relativo tolerado (0.2 = 20%%)")
+    t.add_argument("--min-delta", type=float, default=0.5, help="Aumento mínimo em segundos")
+    h = sub.add_parser("history", help="Histórico de uma suíte")
+    h.add_argument("suite")
+    h.add_argument("--limit", type=int, default=20)
+    args = p.parse_args()
+
+    if not db_path(args.db).exists():
+        print(f"Erro: banco '{db_path(args.db)}' não encontrado (rode o runner.py primeiro)", file=sys.stderr)
+        sys.exit(2)
+
+    if args.cmd == "runs":
+        con = connect(args.db)
+        for r in con.execute(
+                "SELECT r.*, COUNT(s.suite) AS n, SUM(s.status = 'PASS') AS ok FROM runs r "
+                "LEFT JOIN suites s ON s.run_id = r.id GROUP BY r.id ORDER BY r.id DESC LIMIT ?", (args.limit,)):
+            commit = (r["git_commit"] or "?")[:10] + ("+" if r["git_dirty"] else "")
+            wall = f"{r['wall_s']:.1f}s" if r["wall_s"] is not None else "-"
+            print(f"  #{r['id']:<5} {r['started_at']}  {commit:<12} {r['ok'] or 0}/{r['n']} PASS  {wall:>8}  {r['command'] or ''}")
+        con.close()
+    elif args.cmd == "trend":
+        rows = trend(args.window, args.threshold, args.min_delta, args.db)
+        print_trend(rows)
+        sys.exit(1 if any(r["regressed"] for r in rows) else 0)
+    else:
+        rows = history(args.suite, args.limit, args.db)
+        if not rows:
+            print(f"Nenhum registro para '{args.suite}'.")
+        for r in rows:
+            commit = (r["git_commit"] or "?")[:10] + ("+" if r["git_dirty"] else "")
+            fmt = lambda v: f"{v:.2f}" if v is not None else "-"
+            print(f"  #{r['run_id']:<5} {r['started_at']}  {commit:<12} {r['status']:5} "
+                  f"total={fmt(r['wall_s'])}s build={fmt(r['build_s'])}s exec={fmt(r['run_s'])}s "
+                  f"sim={fmt(r['sim_time_ns'])}ns")
+
+
+if __name__ == "__main__":
+    main()
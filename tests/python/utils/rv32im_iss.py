@@ -0,0 +1,570 @@
+"""
+rv32im_iss.py — modelo de referência (golden model) RV32IM em Python puro.
+
+Executa as mesmas imagens usadas pelos testes (codes/build/*.hex, full.elf) e gera:
+  - o trace arquitetural (PC, escrita em rd, acessos à memória) de cada instrução
+  - a imagem final da RAM
+
+A memória segue o hardware (StoreManager / ExtenderRAM): o endereço de palavra é
+addr[31:2] e os bits addr[1:0] só escolhem byte/meia-palavra dentro da palavra.
+Acessos desalinhados não geram exceção, são truncados como no core.
+
+Uso (da raiz do repo):
+  python3 -m tests.python.utils.rv32im_iss tests/FPGA/core/asm_tests/full.elf \\
+      --golden-json /tmp/full.json
+  python3 -m tests.python.utils.rv32im_iss tests/python/unittests/instructions/codes/build/six.hex \\
+      --max-steps 20 --trace -
+"""
+import sys
+import json
+import argparse
+from array import array
+from pathlib import Path
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+    from tests.python.utils.images import load_program
+    from tests.python.utils.encoding import (OP_LUI, OP_AUIPC, OP_JAL, OP_JALR, OP_BRANCH, OP_LOAD,
+                                             OP_STORE, OP_IMM, OP_REG, OP_FENCE, OP_SYSTEM, ECALL, EBREAK)
+else:
+    from .images import load_program
+    from .encoding import (OP_LUI, OP_AUIPC, OP_JAL, OP_JALR, OP_BRANCH, OP_LOAD,
+                           OP_STORE, OP_IMM, OP_REG, OP_FENCE, OP_SYSTEM, ECALL, EBREAK)
+
+MASK32 = 0xFFFFFFFF
+
+
+def sext(value: int, bits: int) -> int:
+    """Extensão de sinal de 'bits' para int Python (com sinal)."""
+    value &= (1 << bits) - 1
+    return value - (1 << bits) if value & (1 << (bits - 1)) else value
+
+
+def to_signed(value: int) -> int:
+    return value - 0x100000000 if value & 0x80000000 else value
+
+
+class IllegalInstruction(Exception):
+    def __init__(self, pc, insn):
+        super().__init__(f"instrução ilegal {insn:#010x} em pc={pc:#010x}")
+        self.pc = pc
+        self.insn = insn
+
+
+# ===========================================================================
+# Memória
+# ===========================================================================
+
+class RAM:
+    """
+    RAM de palavras de 32 bits. Como no RAM_simulation, só os bits baixos do
+    endereço de palavra são usados (a memória "dá a volta").
+    """
+
+    def __init__(self, words: int = 512, base: int = 0):
+        if words & (words - 1):
+            raise ValueError("words deve ser potência de 2")
+        self.words = words
+        self.base = base
+        self.mem = array("I", bytes(4 * words))
+        self.written = set()  # índices de byte escritos (para gerar gabaritos)
+
+    def index(self, addr: int) -> int:
+        return ((addr - self.base) >> 2) & (self.words - 1)
+
+    def read_word(self, addr: int) -> int:
+        return self.mem[self.index(addr)]
+
+    def write_word(self, addr: int, data: int, mask: int):
+        i = self.index(addr)
+        if mask == 0xF:
+            self.mem[i] = data
+        else:
+            bm = (0xFF if mask & 1 else 0) | (0xFF00 if mask & 2 else 0) | \
+                 (0xFF0000 if mask & 4 else 0) | (0xFF000000 if mask & 8 else 0)
+            self.mem[i] = (self.mem[i] & ~bm & MASK32) | (data & bm)
+        base = i * 4
+        for b in range(4):
+            if mask & (1 << b):
+                self.written.add(base + b)
+
+    def load_bytes(self, addr: int, data: bytes):
+        """Pré-carga (seções .data/.rodata de um ELF, backdoor)."""
+        for off in range(0, len(data), 4):
+            chunk = data[off:off + 4]
+            word = int.from_bytes(chunk.ljust(4, b"\0"), "little")
+            self.write_word(addr + off, word, (1 << len(chunk)) - 1)
+        self.written.clear()
+
+    def image(self) -> bytes:
+        """Conteúdo completo, little-endian, a partir de 'base'."""
+        return self.mem.tobytes() if sys.byteorder == "little" else \
+            b"".join(w.to_bytes(4, "little") for w in self.mem)
+
+    def written_bytes(self) -> dict:
+        """{endereço: byte} apenas dos bytes escritos por stores."""
+        img = self.image()
+        return {self.base + a: img[a] for a in sorted(self.written)}
+
+
+# ===========================================================================
+# Formatação de store/load (espelha StoreManager.vhd e ExtenderRAM.vhd)
+# ===========================================================================
+
+def store_format(funct3: int, ea: int, value: int):
+    """Retorna (dado posicionado na palavra, máscara de bytes)."""
+    lsb = ea & 3
+    if funct3 == 0b010:                      # SW
+        return value & MASK32, 0b1111
+    if funct3 == 0b001:                      # SH
+        half = value & 0xFFFF
+        return (half << 16, 0b1100) if lsb & 2 else (half, 0b0011)
+    if funct3 == 0b000:                      # SB
+        return (value & 0xFF) << (8 * lsb), 1 << lsb
+    return 0, 0
+
+
+def load_extend(funct3: int, ea: int, word: int) -> int:
+    lsb = ea & 3
+    if funct3 == 0b010:                      # LW
+        return word
+    if funct3 in (0b001, 0b101):             # LH / LHU
+        half = (word >> 16) & 0xFFFF if lsb & 2 else word & 0xFFFF
+        return (sext(half, 16) & MASK32) if funct3 == 0b001 else half
+    if funct3 in (0b000, 0b100):             # LB / LBU
+        byte = (word >> (8 * lsb)) & 0xFF
+        return (sext(byte, 8) & MASK32) if funct3 == 0b000 else byte
+    return 0
+
+
+# ===========================================================================
+# Trace
+# ===========================================================================
+
+class Retire:
+    """Uma instrução aposentada."""
+    __slots__ = ("pc", "insn", "rd", "rd_value", "mem_op", "mem_addr", "mem_data", "mem_mask", "next_pc")
+
+    def __init__(self, pc, insn, rd, rd_value, mem_op, mem_addr, mem_data, mem_mask, next_pc):
+        self.pc = pc
+        self.insn = insn
+        self.rd = rd                # None se a instrução não escreve em registrador (ou rd = x0)
+        self.rd_value = rd_value
+        self.mem_op = mem_op        # None, "L" ou "S"
+        self.mem_addr = mem_addr    # endereço efetivo (byte)
+        self.mem_data = mem_data    # store: palavra posicionada como na porta da RAM; load: palavra lida
+        self.mem_mask = mem_mask    # store: byteena
+        self.next_pc = next_pc
+
+    def to_dict(self) -> dict:
+        d = {"pc": self.pc, "insn": self.insn, "next_pc": self.next_pc}
+        if self.rd is not None:
+            d["rd"] = self.rd
+            d["rd_value"] = self.rd_value
+        if self.mem_op:
+            d["mem"] = {"op": self.mem_op, "addr": self.mem_addr,
+                        "data": self.mem_data, "mask": self.mem_mask}
+        return d
+
+    def __repr__(self):
+        parts = [f"pc={self.pc:#010x}", f"insn={self.insn:#010x}"]
+        if self.rd is not None:
+            parts.append(f"x{self.rd}={self.rd_value:#010x}")
+        if self.mem_op == "S":
+            parts.append(f"M[{self.mem_addr:#010x}]<={self.mem_data:#010x}/{self.mem_mask:04b}")
+        elif self.mem_op == "L":
+            parts.append(f"load M[{self.mem_addr:#010x}]")
+        return "Retire(" + ", ".join(parts) + ")"
+
+
+# ===========================================================================
+# Núcleo
+# ===========================================================================
+
+class RV32IM:
+    """
+    ISS RV32IM (Harvard: ROM de instruções + barramento de dados).
+
+    ram       : objeto com read_word(addr) e write_word(addr, data, mask)
+    rom_depth : número de palavras da ROM; se dado, o PC "dá a volta" como
+                no ROM_simulation (memoryAddrWidth)
+    cpi       : ciclos de clock por instrução usados em 'cycles'
+                (3 no core multi-ciclo: clk_gen_3way)
+    """
+
+    def __init__(self, rom_words, ram=None, pc: int = 0, rom_depth: int = None, cpi: int = 3):
+        self.rom = list(rom_words)
+        self.rom_depth = rom_depth
+        self.ram = ram if ram is not None else RAM()
+        self.x = [0] * 32
+        self.pc = pc
+        self.cpi = cpi
+        self.retired = 0
+        self.halted = None        # motivo da parada: "ecall", "ebreak", "self-loop"
+        self._cache = {}
+        self._mem = None          # último acesso (op, addr, data, mask), para o trace
+
+    # ----------------------------------------------------------------------
+    @property
+    def cycles(self) -> int:
+        return self.retired * self.cpi
+
+    def fetch(self, pc: int) -> int:
+        i = pc >> 2
+        if self.rom_depth:
+            i &= self.rom_depth - 1
+        return self.rom[i] if i < len(self.rom) else 0
+
+    def load_rom(self, rom_words, pc: int = 0):
+        """Troca o programa (invalida o cache de decodificação) e reinicia o PC."""
+        self.rom = list(rom_words)
+        self._cache.clear()
+        self.reset(pc)
+
+    def reset(self, pc: int = 0):
+        self.x = [0] * 32
+        self.pc = pc
+        self.retired = 0
+        self.halted = None
+        self._cache.clear()
+
+    # ----------------------------------------------------------------------
+    def _compile(self, pc: int):
+        """Decodifica a instrução em 'pc' numa closure que executa e devolve o próximo PC."""
+        insn = self.fetch(pc)
+        x = self.x
+        ram = self.ram
+        opcode = insn & 0x7F
+        rd = (insn >> 7) & 31
+        f3 = (insn >> 12) & 7
+        rs1 = (insn >> 15) & 31
+        rs2 = (insn >> 20) & 31
+        f7 = insn >> 25
+        pc4 = (pc + 4) & MASK32
+        writes = rd != 0
+
+        if opcode == OP_LUI:
+            val = insn & 0xFFFFF000
+            def f():
+                if writes:
+                    x[rd] = val
+                return pc4
+        elif opcode == OP_AUIPC:
+            val = (pc + (insn & 0xFFFFF000)) & MASK32
+            def f():
+                if writes:
+                    x[rd] = val
+                return pc4
+        elif opcode == OP_JAL:
+            imm = sext(((insn >> 31) << 20) | (((insn >> 12) & 0xFF) << 12) |
+                       (((insn >> 20) & 1) << 11) | (((insn >> 21) & 0x3FF) << 1), 21)
+            target = (pc + imm) & MASK32
+            def f():
+                if writes:
+                    x[rd] = pc4
+                return target
+        elif opcode == OP_JALR and f3 == 0:
+            imm = sext(insn >> 20, 12)
+            def f():
+                target = (x[rs1] + imm) & 0xFFFFFFFE
+                if writes:
+                    x[rd] = pc4
+                return target
+        elif opcode == OP_BRANCH and f3 not in (2, 3):
+            imm = sext(((insn >> 31) << 12) | (((insn >> 7) & 1) << 11) |
+                       (((insn >> 25) & 0x3F) << 5) | (((insn >> 8) & 0xF) << 1), 13)
+            target = (pc + imm) & MASK32
+            if f3 == 0:
+                def f(): return target if x[rs1] == x[rs2] else pc4
+            elif f3 == 1:
+                def f(): return target if x[rs1] != x[rs2] else pc4
+            elif f3 == 4:
+                def f(): return target if to_signed(x[rs1]) < to_signed(x[rs2]) else pc4
+            elif f3 == 5:
+                def f(): return target if to_signed(x[rs1]) >= to_signed(x[rs2]) else pc4
+            elif f3 == 6:
+                def f(): return target if x[rs1] < x[rs2] else pc4
+            else:
+                def f(): return target if x[rs1] >= x[rs2] else pc4
+        elif opcode == OP_LOAD and f3 in (0, 1, 2, 4, 5):
+            imm = sext(insn >> 20, 12)
+            def f():
+                ea = (x[rs1] + imm) & MASK32
+                word = ram.read_word(ea)
+                self._mem = ("L", ea, word, 0)
+                if writes:
+                    x[rd] = load_extend(f3, ea, word)
+                return pc4
+        elif opcode == OP_STORE and f3 in (0, 1, 2):
+            imm = sext(((insn >> 25) << 5) | ((insn >> 7) & 0x1F), 12)
+            def f():
+                ea = (x[rs1] + imm) & MASK32
+                data, mask = store_format(f3, ea, x[rs2])
+                ram.write_word(ea, data, mask)
+                self._mem = ("S", ea, data, mask)
+                return pc4
+        elif opcode == OP_IMM:
+            f = self._compile_alu(insn, rd, f3, rs1, None, sext(insn >> 20, 12), f7, pc4)
+        elif opcode == OP_REG:
+            f = self._compile_alu(insn, rd, f3, rs1, rs2, None, f7, pc4)
+        elif opcode == OP_FENCE:
+            def f(): return pc4
+        elif opcode == OP_SYSTEM and insn in (ECALL, EBREAK):
+            reason = "ecall" if insn == ECALL else "ebreak"
+            def f():
+                self.halted = reason
+                return pc
+        else:
+            raise IllegalInstruction(pc, insn)
+
+        f.insn = insn
+        f.rd = rd if writes and opcode not in (OP_BRANCH, OP_STORE, OP_FENCE,
+                                               OP_SYSTEM) else None
+        return f
+
+    def _compile_alu(self, insn, rd, f3, rs1, rs2, imm, f7, pc4):
+        x = self.x
+        pc = pc4 - 4
+        if not rd:
+            # escrita em x0: sem efeito (divisão por zero etc. não gera trap em RV32M)
+            if rs2 is not None and f7 not in (0, 0x20, 0x01):
+                raise IllegalInstruction(pc, insn)
+            def f(): return pc4
+            return f
+
+        if rs2 is None:
+            # OP-IMM
+            shamt = imm & 31
+            if f3 == 0:
+                def f():
+                    x[rd] = (x[rs1] + imm) & MASK32; return pc4
+            elif f3 == 2:
+                def f():
+                    x[rd] = 1 if to_signed(x[rs1]) < imm else 0; return pc4
+            elif f3 == 3:
+                uimm = imm & MASK32
+                def f():
+                    x[rd] = 1 if x[rs1] < uimm else 0; return pc4
+            elif f3 == 4:
+                uimm = imm & MASK32
+                def f():
+                    x[rd] = x[rs1] ^ uimm; return pc4
+            elif f3 == 6:
+                uimm = imm & MASK32
+                def f():
+                    x[rd] = x[rs1] | uimm; return pc4
+            elif f3 == 7:
+                uimm = imm & MASK32
+                def f():
+                    x[rd] = x[rs1] & uimm; return pc4
+            elif f3 == 1 and f7 == 0:
+                def f():
+                    x[rd] = (x[rs1] << shamt) & MASK32; return pc4
+            elif f3 == 5 and f7 == 0:
+                def f():
+                    x[rd] = x[rs1] >> shamt; return pc4
+            elif f3 == 5 and f7 == 0x20:
+                def f():
+                    x[rd] = (to_signed(x[rs1]) >> shamt) & MASK32; return pc4
+            else:
+                raise IllegalInstruction(pc, insn)
+            return f
+
+        if f7 == 0x01:
+            return self._compile_muldiv(rd, f3, rs1, rs2, pc4)
+
+        key = (f7, f3)
+        if key == (0, 0):
+            def f():
+                x[rd] = (x[rs1] + x[rs2]) & MASK32; return pc4
+        elif key == (0x20, 0):
+            def f():
+                x[rd] = (x[rs1] - x[rs2]) & MASK32; return pc4
+        elif key == (0, 1):
+            def f():
+                x[rd] = (x[rs1] << (x[rs2] & 31)) & MASK32; return pc4
+        elif key == (0, 2):
+            def f():
+                x[rd] = 1 if to_signed(x[rs1]) < to_signed(x[rs2]) else 0; return pc4
+        elif key == (0, 3):
+            def f():
+                x[rd] = 1 if x[rs1] < x[rs2] else 0; return pc4
+        elif key == (0, 4):
+            def f():
+                x[rd] = x[rs1] ^ x[rs2]; return pc4
+        elif key == (0, 5):
+            def f():
+                x[rd] = x[rs1] >> (x[rs2] & 31); return pc4
+        elif key == (0x20, 5):
+            def f():
+                x[rd] = (to_signed(x[rs1]) >> (x[rs2] & 31)) & MASK32; return pc4
+        elif key == (0, 6):
+            def f():
+                x[rd] = x[rs1] | x[rs2]; return pc4
+        elif key == (0, 7):
+            def f():
+                x[rd] = x[rs1] & x[rs2]; return pc4
+        else:
+            raise IllegalInstruction(pc, insn)
+        return f
+
+    def _compile_muldiv(self, rd, f3, rs1, rs2, pc4):
+        x = self.x
+
+        if f3 == 0:                                   # MUL
+            def f():
+                x[rd] = (x[rs1] * x[rs2]) & MASK32; return pc4
+        elif f3 == 1:                                 # MULH
+            def f():
+                x[rd] = ((to_signed(x[rs1]) * to_signed(x[rs2])) >> 32) & MASK32; return pc4
+        elif f3 == 2:                                 # MULHSU
+            def f():
+                x[rd] = ((to_signed(x[rs1]) * x[rs2]) >> 32) & MASK32; return pc4
+        elif f3 == 3:                                 # MULHU
+            def f():
+                x[rd] = ((x[rs1] * x[rs2]) >> 32) & MASK32; return pc4
+        elif f3 == 4:                                 # DIV
+            def f():
+                a, b = to_signed(x[rs1]), to_signed(x[rs2])
+                if b == 0:
+                    x[rd] = MASK32
+                elif a == -0x80000000 and b == -1:
+                    x[rd] = 0x80000000
+                else:
+                    q = abs(a) // abs(b)
+                    x[rd] = (-q if (a < 0) != (b < 0) else q) & MASK32
+                return pc4
+        elif f3 == 5:                                 # DIVU
+            def f():
+                b = x[rs2]
+                x[rd] = MASK32 if b == 0 else x[rs1] // b
+                return pc4
+        elif f3 == 6:                                 # REM
+            def f():
+                a, b = to_signed(x[rs1]), to_signed(x[rs2])
+                if b == 0:
+                    x[rd] = a & MASK32
+                elif a == -0x80000000 and b == -1:
+                    x[rd] = 0
+                else:
+                    r = abs(a) % abs(b)
+                    x[rd] = (-r if a < 0 else r) & MASK32
+                return pc4
+        else:                                         # REMU
+            def f():
+                b = x[rs2]
+                x[rd] = x[rs1] if b == 0 else x[rs1] % b
+                return pc4
+        return f
+
+    # ----------------------------------------------------------------------
+    def step(self, trace: bool = True):
+        """Executa uma instrução. Retorna um Retire (ou None com trace=False)."""
+        pc = self.pc
+        f = self._cache.get(pc)
+        if f is None:
+            f = self._cache[pc] = self._compile(pc)
+        self._mem = None
+        next_pc = f()
+        self.pc = next_pc
+        self.retired += 1
+        if not trace:
+            return None
+        rd = f.rd
+        mem = self._mem
+        if mem:
+            return Retire(pc, f.insn, rd, self.x[rd] if rd else None, *mem, next_pc)
+        return Retire(pc, f.insn, rd, self.x[rd] if rd else None, None, None, None, None, next_pc)
+
+    def run(self, max_steps: int = 1_000_000, trace: bool = False, stop_on_self_loop: bool = True):
+        """
+        Executa até ecall/ebreak, um laço 'j .' (se stop_on_self_loop) ou max_steps.
+        Retorna a lista de Retire (vazia com trace=False).
+        """
+        out = []
+        cache = self._cache
+        for _ in range(max_steps):
+            pc = self.pc
+            if trace:
+                r = self.step(True)
+                out.append(r)
+                next_pc = r.next_pc
+            else:
+                f = cache.get(pc)
+                if f is None:
+                    f = cache[pc] = self._compile(pc)
+                next_pc = f()
+                self.pc = next_pc
+                self.retired += 1
+            if self.halted:
+                break
+            if next_pc == pc and stop_on_self_loop:
+                self.halted = "self-loop"
+                break
+        return out
+
+    def iter_trace(self, max_steps: int = 1_000_000, stop_on_self_loop: bool = True):
+        """Como run(trace=True), mas gera os Retire um a um (memória constante)."""
+        for _ in range(max_steps):
+            r = self.step(True)
+            yield r
+            if self.halted:
+                return
+            if r.next_pc == r.pc and stop_on_self_loop:
+                self.halted = "self-loop"
+                return
+
+    # ----------------------------------------------------------------------
+    def regs(self) -> list:
+        return list(self.x)
+
+
+def from_image(path, ram_words: int = 512, rom_depth: int = None, cpi: int = 3) -> RV32IM:
+    """Cria um ISS a partir de .hex/.bin/.elf (seções de dados do ELF vão para a RAM)."""
+    rom, data_segments, _symbols = load_program(path)
+    ram = RAM(ram_words)
+    for addr, data in data_segments:
+        ram.load_bytes(addr, data)
+    return RV32IM(rom, ram, rom_depth=rom_depth, cpi=cpi)
+
+
+# ===========================================================================
+# CLI
+# ===========================================================================
+
+def main():
+    p = argparse.ArgumentParser(description="ISS RV32IM (golden model) para as imagens de teste")
+    p.add_argument("image", help="Programa (.hex, .bin ou .elf)")
+    p.add_argument("--max-steps", type=int, default=1_000_000)
+    p.add_argument("--ram-words", type=int, default=4096, help="Palavras de 32 bits da RAM")
+    p.add_argument("--trace", metavar="ARQ", help="Grava o trace (JSON lines); '-' = stdout")
+    p.add_argument("--golden-json", metavar="ARQ",
+                   help="Grava os bytes escritos na RAM no formato de asm_tests/*.json")
+    p.add_argument("--ram-bin", metavar="ARQ", help="Grava a imagem completa da RAM (binário)")
+    args = p.parse_args()
+
+    cpu = from_image(args.image, ram_words=args.ram_words)
+    trace = cpu.run(args.max_steps, trace=bool(args.trace))
+
+    if args.trace:
+        out = sys.stdout if args.trace == "-" else open(args.trace, "w")
+        for r in trace:
+            out.write(json.dumps(r.to_dict()) + "\n")
+        if out is not sys.stdout:
+            out.close()
+
+    if args.golden_json:
+        golden = {f"0x{a:08x}": v for a, v in cpu.ram.written_bytes().items()}
+        Path(args.golden_json).write_text(json.dumps(golden, indent=2) + "\n")
+
+    if args.ram_bin:
+        Path(args.ram_bin).write_bytes(cpu.ram.image())
+
+    print(f"{cpu.retired} instruções, parada: {cpu.halted or 'max-steps'}, pc={cpu.pc:#010x}",
+          file=sys.stderr)
+    for i in range(0, 32, 4):
+        print("  " + "  ".join(f"x{j:<2}={cpu.x[j]:08x}" for j in range(i, i + 4)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
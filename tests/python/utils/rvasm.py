@@ -0,0 +1,576 @@
+"""
+rvasm.py — montador RV32IM em Python puro para os programas de teste.
+
+Cobre o subconjunto usado nos .S do repositório (codes/*.S, asm_tests/full.S):
+  - instruções RV32I + M, rótulos simbólicos e locais numéricos (1: ... j 1b / 1f)
+  - pseudo-instruções: nop li la lla mv not neg seqz snez sltz sgtz j jr ret call tail
+    beqz bnez blez bgez bltz bgtz bgt ble bgtu bleu, jal/jalr com um operando
+  - expressões com constantes, símbolos, .equ/.set, %hi() e %lo()
+  - diretivas: .text .data .rodata .bss .section .globl .word .half .byte .space/.zero
+    .align/.p2align/.balign .ascii/.asciz/.string (.option/.type/.size são ignoradas)
+
+A saída imita 'as' + 'ld -Ttext=0x0' + memimg --hex: .text a partir de 0 e as seções
+de dados logo depois (alinhadas em 4), uma palavra %08X por linha, como o hread do
+ROM_simulation espera. Com --data-base os dados vão para uma imagem separada.
+
+Os resultados ficam em sim_build/_cache/asm/ indexados pelo hash do fonte e das
+opções, então rodar de novo o mesmo .S não remonta nada.
+
+Uso:
+  python3 -m tests.python.utils.rvasm tests/FPGA/core/asm_tests/full.S -o build/full.hex
+  python3 -m tests.python.utils.rvasm codes/six.S -o build/six.hex --listing -
+"""
+import os
+import re
+import ast
+import sys
+import hashlib
+import argparse
+from pathlib import Path
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+    from tests.python.utils.encoding import (encode, split_li, parse_reg, EncodingError, INSTRUCTIONS, LOADS)
+else:
+    from .encoding import encode, split_li, parse_reg, EncodingError, INSTRUCTIONS, LOADS
+
+VERSION = 1
+CACHE_DIR = Path(__file__).resolve().parents[1] / "sim_build" / "_cache" / "asm"
+
+TEXT, DATA = "text", "data"
+DATA_ORDER = (".rodata", ".data", ".bss")
+
+
+class AsmError(Exception):
+    pass
+
+
+# ===========================================================================
+# Expressões
+# ===========================================================================
+
+_BINOPS = {
+    ast.Add: lambda a, b: a + b, ast.Sub: lambda a, b: a - b, ast.Mult: lambda a, b: a * b,
+    ast.FloorDiv: lambda a, b: a // b, ast.Div: lambda a, b: int(a / b), ast.Mod: lambda a, b: a % b,
+    ast.LShift: lambda a, b: a << b, ast.RShift: lambda a, b: a >> b,
+    ast.BitOr: lambda a, b: a | b, ast.BitAnd: lambda a, b: a & b, ast.BitXor: lambda a, b: a ^ b,
+}
+_UNOPS = {ast.USub: lambda a: -a, ast.UAdd: lambda a: a, ast.Invert: lambda a: ~a}
+_FUNCS = {"__hi": lambda v: split_li(v)[0], "__lo": lambda v: split_li(v)[1]}
+
+_CHAR_RE = re.compile(r"'(\\?.)'")
+_RELOC_RE = re.compile(r"%(hi|lo)\s*\(")
+_LOCAL_REF_RE = re.compile(r"\b(\d+)([bf])\b")
+
+
+class Unresolved(Exception):
+    """Símbolo ainda não definido (primeira passada)."""
+
+
+def _char(m):
+    c = m.group(1)
+    return str(ord(c[-1]) if not c.startswith("\\") else ord({"n": "\n", "t": "\t", "0": "\0"}.get(c[1], c[1])))
+
+
+def evaluate(text: str, symbols: dict) -> int:
+    src = _RELOC_RE.sub(lambda m: f"__{m.group(1)}(", _CHAR_RE.sub(_char, text.strip()))
+    try:
+        tree = ast.parse(src, mode="eval")
+    except SyntaxError:
+        raise AsmError(f"expressão inválida: '{text}'") from None
+
+    def ev(node):
+        if isinstance(node, ast.Expression):
+            return ev(node.body)
+        if isinstance(node, ast.Constant) and isinstance(node.value, int):
+            return node.value
+        if isinstance(node, ast.Name):
+            if node.id in symbols:
+                return symbols[node.id]
+            raise Unresolved(node.id)
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+            return _BINOPS[type(node.op)](ev(node.left), ev(node.right))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNOPS:
+            return _UNOPS[type(node.op)](ev(node.operand))
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _FUNCS \
+                and len(node.args) == 1:
+            return _FUNCS[node.func.id](ev(node.args[0]))
+        raise AsmError(f"expressão não suportada: '{text}'")
+
+    return ev(tree)
+
+
+def _split_operands(text: str) -> list:
+    out, depth, cur = [], 0, ""
+    for ch in text:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            out.append(cur.strip())
+            cur = ""
+        else:
+            cur += ch
+    if cur.strip():
+        out.append(cur.strip())
+    return out
+
+
+def _strip_comment(line: str) -> str:
+    in_str = False
+    for i, ch in enumerate(line):
+        if ch == '"' and (i == 0 or line[i - 1] != "\\"):
+            in_str = not in_str
+        elif not in_str and (ch == "#" or line.startswith("//", i)):
+            return line[:i]
+    return line
+
+
+# ===========================================================================
+# Pseudo-instruções
+# ===========================================================================
+
+BRANCH_ZERO = {"beqz": ("beq", False), "bnez": ("bne", False), "bgez": ("bge", False),
+               "bltz": ("blt", False), "blez": ("bge", True), "bgtz": ("blt", True)}
+BRANCH_SWAP = {"bgt": "blt", "ble": "bge", "bgtu": "bltu", "bleu": "bgeu"}
+
+
+def _fits12(v: int) -> bool:
+    v &= 0xFFFFFFFF
+    v = v - (1 << 32) if v & 0x80000000 else v
+    return -2048 <= v <= 2047
+
+
+class Statement:
+    __slots__ = ("section", "offset", "kind", "name", "args", "size", "line")
+
+    def __init__(self, section, offset, kind, name, args, size, line):
+        self.section = section
+        self.offset = offset
+        self.kind = kind        # "insn" | "data" | "align" | "space"
+        self.name = name
+        self.args = args
+        self.size = size
+        self.line = line
+
+
+class Assembler:
+    def __init__(self, text_base: int = 0, data_base: int = None):
+        self.text_base = text_base
+        self.data_base = data_base
+        self.symbols = {}
+        self.labels = {}            # nome -> (seção, offset)
+        self.local_count = {}       # rótulos numéricos: definições vistas até aqui
+        self.sections = {}          # nome -> tamanho
+        self.statements = []
+        self.section = ".text"
+        self.lineno = 0
+        self.source = "<fonte>"
+
+    # -- primeira passada -----------------------------------------------------------
+    def error(self, msg):
+        raise AsmError(f"{self.source}:{self.lineno}: {msg}")
+
+    def _offset(self) -> int:
+        return self.sections.setdefault(self.section, 0)
+
+    def _add(self, kind, name, args, size):
+        off = self._offset()
+        self.statements.append(Statement(self.section, off, kind, name, args, size, self.lineno))
+        self.sections[self.section] = off + size
+
+    def _local_refs(self, text: str) -> str:
+        def repl(m):
+            n = m.group(1)
+            seen = self.local_count.get(n, 0)
+            k = seen - 1 if m.group(2) == "b" else seen
+            if k < 0:
+                self.error(f"rótulo local {n}b sem definição anterior")
+            return f"__L{n}_{k}"
+        return _LOCAL_REF_RE.sub(repl, text)
+
+    def _define(self, name):
+        if name.isdigit():
+            k = self.local_count.get(name, 0)
+            self.local_count[name] = k + 1
+            name = f"__L{name}_{k}"
+        elif name in self.labels or name in self.symbols:
+            self.error(f"símbolo redefinido: '{name}'")
+        self.labels[name] = (self.section, self._offset())
+
+    def parse(self, text: str, source: str = "<fonte>"):
+        self.source = source
+        for self.lineno, raw in enumerate(text.splitlines(), 1):
+            line = _strip_comment(raw)
+            for stmt in line.split(";"):
+                self._parse_statement(stmt.strip())
+
+    def _parse_statement(self, s: str):
+        while True:
+            m = re.match(r"^([A-Za-z_.$][\w.$]*|\d+)\s*:(.*)$", s)
+            if not m:
+                break
+            self._define(m.group(1))
+            s = m.group(2).strip()
+        if not s:
+            return
+        parts = s.split(None, 1)
+        op = parts[0].lower()
+        rest = parts[1] if len(parts) > 1 else ""
+        if op.startswith("."):
+            self._directive(op, rest)
+            return
+        args = _split_operands(self._local_refs(rest))
+        self._add("insn", op, args, self._insn_size(op, args))
+
+    def _insn_size(self, op, args) -> int:
+        if op in ("la", "lla", "call", "tail"):
+            return 8
+        if op == "li":
+            if len(args) != 2:
+                self.error("li espera 'li rd, valor'")
+            try:
+                v = evaluate(args[1], self.symbols)
+            except Unresolved:
+                return 8        # valor ainda desconhecido: reserva lui + addi
+            if _fits12(v):
+                return 4
+            return 4 if split_li(v)[1] == 0 else 8
+        return 4
+
+    def _directive(self, op, rest):
+        args = _split_operands(rest) if rest else []
+        if op in (".text", ".data", ".rodata", ".bss"):
+            self.section = op
+        elif op == ".section":
+            name = args[0].split()[0] if args else ".text"
+            self.section = ".text" if name.startswith(".text") else \
+                next((d for d in DATA_ORDER if name.startswith(d)), ".data")
+        elif op in (".equ", ".set"):
+            if len(args) != 2:
+                self.error(f"{op} espera 'NOME, valor'")
+            try:
+                self.symbols[args[0]] = evaluate(args[1], self.symbols)
+            except Unresolved as e:
+                self.error(f"{op} {args[0]}: símbolo indefinido '{e}'")
+        elif op in (".word", ".4byte", ".long"):
+            self._add("data", 4, args, 4 * len(args))
+        elif op in (".half", ".2byte", ".short"):
+            self._add("data", 2, args, 2 * len(args))
+        elif op in (".byte",):
+            self._add("data", 1, args, len(args))
+        elif op in (".space", ".zero", ".skip"):
+            n = evaluate(args[0], self.symbols)
+            fill = evaluate(args[1], self.symbols) if len(args) > 1 else 0
+            self._add("space", fill & 0xFF, [], n)
+        elif op in (".ascii", ".asciz", ".string"):
+            data = b""
+            for a in args:
+                try:
+                    data += ast.literal_eval(a).encode("latin-1")
+                except (ValueError, SyntaxError):
+                    self.error(f"string inválida: {a}")
+                if op != ".ascii":
+                    data += b"\0"
+            self._add("space", data, [], len(data))
+        elif op in (".align", ".p2align", ".balign"):
+            n = evaluate(args[0], self.symbols)
+            align = n if op == ".balign" else 1 << n
+            off = self._offset()
+            pad = (-off) % align
+            self._add("align", align, [], pad)
+        elif op in (".globl", ".global", ".local", ".type", ".size", ".option", ".file",
+                    ".ident", ".attribute", ".weak", ".end", ".cfi_startproc", ".cfi_endproc"):
+            pass
+        else:
+            self.error(f"diretiva não suportada: {op}")
+
+    # -- layout ------------------------------------------------------------------------
+    def layout(self) -> dict:
+        """Endereço base de cada seção (igual ao 'ld -Ttext=<text_base>' sem script)."""
+        bases = {".text": self.text_base}
+        addr = self.data_base if self.data_base is not None else \
+            (self.text_base + self.sections.get(".text", 0) + 3) & ~3
+        for name in DATA_ORDER:
+            if name in self.sections:
+                bases[name] = addr
+                addr = (addr + self.sections[name] + 3) & ~3
+        return bases
+
+    # -- segunda passada --------------------------------------------------------------
+    def assemble(self) -> tuple:
+        """(texto: bytes, dados: bytes, base_dos_dados)."""
+        bases = self.layout()
+        syms = dict(self.symbols)
+        for name, (sec, off) in self.labels.items():
+            syms[name] = bases[sec] + off
+
+        out = {name: bytearray(size) for name, size in self.sections.items()}
+        for st in self.statements:
+            self.lineno = st.line
+            buf = out[st.section]
+            pc = bases[st.section] + st.offset
+            try:
+                if st.kind == "insn":
+                    words = self._encode(st.name, st.args, pc, syms, st.size)
+                    if 4 * len(words) != st.size:
+                        self.error(f"tamanho de '{st.name}' mudou entre as passadas")
+                    for i, w in enumerate(words):
+                        buf[st.offset + 4 * i:st.offset + 4 * i + 4] = w.to_bytes(4, "little")
+                elif st.kind == "data":
+                    for i, a in enumerate(st.args):
+                        v = evaluate(a, syms) & ((1 << (8 * st.name)) - 1)
+                        pos = st.offset + i * st.name
+                        buf[pos:pos + st.name] = v.to_bytes(st.name, "little")
+                elif st.kind == "space":
+                    fill = st.name if isinstance(st.name, bytes) else bytes([st.name]) * st.size
+                    buf[st.offset:st.offset + st.size] = fill
+                elif st.kind == "align" and st.section == ".text":
+                    # preenche com nop, como o 'as'
+                    for p in range(st.offset, st.offset + st.size - 3, 4):
+                        buf[p:p + 4] = (0x00000013).to_bytes(4, "little")
+            except Unresolved as e:
+                self.error(f"símbolo indefinido: '{e}'")
+            except EncodingError as e:
+                self.error(str(e))
+
+        text = bytes(out.get(".text", b""))
+        data = b""
+        data_base = None
+        for name in DATA_ORDER:
+            if name in out:
+                if data_base is None:
+                    data_base = bases[name]
+                data = data.ljust(bases[name] - data_base, b"\0") + bytes(out[name])
+        return text, data, data_base
+
+    # -- instruções ----------------------------------------------------------------------
+    def _encode(self, op, a, pc, syms, size: int = 4) -> list:
+        R = parse_reg
+        ev = lambda t: evaluate(t, syms)
+
+        def need(n):
+            if len(a) != n:
+                self.error(f"'{op}' espera {n} operando(s), recebeu {len(a)}")
+
+        def mem(t):
+            m = re.match(r"^(.*)\(\s*(\w+)\s*\)$", t.strip())
+            if not m:
+                self.error(f"operando de memória inválido: '{t}' (use imm(reg))")
+            return (ev(m.group(1)) if m.group(1).strip() else 0), R(m.group(2))
+
+        def rel(t):
+            return ev(t) - pc
+
+        # pseudo-instruções
+        if op == "nop":
+            return [encode("addi", 0, 0)]
+        if op == "li":
+            need(2)
+            rd, v = R(a[0]), ev(a[1]) & 0xFFFFFFFF
+            if size == 4 and _fits12(v):
+                return [encode("addi", rd, 0, imm=v - (1 << 32) if v & 0x80000000 else v)]
+            hi, lo = split_li(v)
+            if size == 8:
+                # a primeira passada reservou lui + addi (valor ainda indefinido): mantém as duas
+                return [encode("lui", rd, imm=hi), encode("addi", rd, rd, imm=lo)]
+            return [encode("lui", rd, imm=hi)] + ([encode("addi", rd, rd, imm=lo)] if lo else [])
+        if op in ("la", "lla"):
+            need(2)
+            rd = R(a[0])
+            hi, lo = split_li(rel(a[1]))
+            return [encode("auipc", rd, imm=hi), encode("addi", rd, rd, imm=lo)]
+        if op in ("call", "tail"):
+            need(1)
+            link = 1 if op == "call" else 6
+            hi, lo = split_li(rel(a[0]))
+            return [encode("auipc", link, imm=hi), encode("jalr", 1 if op == "call" else 0, link, imm=lo)]
+        if op == "mv":
+            need(2)
+            return [encode("addi", R(a[0]), R(a[1]))]
+        if op == "not":
+            need(2)
+            return [encode("xori", R(a[0]), R(a[1]), imm=-1)]
+        if op == "neg":
+            need(2)
+            return [encode("sub", R(a[0]), 0, R(a[1]))]
+        if op == "seqz":
+            need(2)
+            return [encode("sltiu", R(a[0]), R(a[1]), imm=1)]
+        if op == "snez":
+            need(2)
+            return [encode("sltu", R(a[0]), 0, R(a[1]))]
+        if op == "sltz":
+            need(2)
+            return [encode("slt", R(a[0]), R(a[1]), 0)]
+        if op == "sgtz":
+            need(2)
+            return [encode("slt", R(a[0]), 0, R(a[1]))]
+        if op in BRANCH_ZERO:
+            need(2)
+            real, swap = BRANCH_ZERO[op]
+            rs1, rs2 = (0, R(a[0])) if swap else (R(a[0]), 0)
+            return [encode(real, rs1=rs1, rs2=rs2, imm=rel(a[1]))]
+        if op in BRANCH_SWAP:
+            need(3)
+            return [encode(BRANCH_SWAP[op], rs1=R(a[1]), rs2=R(a[0]), imm=rel(a[2]))]
+        if op == "j":
+            need(1)
+            return [encode("jal", 0, imm=rel(a[0]))]
+        if op == "jr":
+            need(1)
+            return [encode("jalr", 0, R(a[0]))]
+        if op == "ret":
+            return [encode("jalr", 0, 1)]
+
+        if op not in INSTRUCTIONS:
+            self.error(f"instrução desconhecida: '{op}'")
+        fmt = INSTRUCTIONS[op][0]
+
+        if op == "jal":
+            if len(a) == 1:
+                return [encode("jal", 1, imm=rel(a[0]))]
+            need(2)
+            return [encode("jal", R(a[0]), imm=rel(a[1]))]
+        if op == "jalr":
+            if len(a) == 1:
+                return [encode("jalr", 1, R(a[0]))]
+            if len(a) == 2:
+                imm, rs1 = mem(a[1])
+                return [encode("jalr", R(a[0]), rs1, imm=imm)]
+            need(3)
+            return [encode("jalr", R(a[0]), R(a[1]), imm=ev(a[2]))]
+        if fmt == "R":
+            need(3)
+            return [encode(op, R(a[0]), R(a[1]), R(a[2]))]
+        if op in LOADS:
+            need(2)
+            imm, rs1 = mem(a[1])
+            return [encode(op, R(a[0]), rs1, imm=imm)]
+        if fmt == "S":
+            need(2)
+            imm, rs1 = mem(a[1])
+            return [encode(op, rs1=rs1, rs2=R(a[0]), imm=imm)]
+        if fmt in ("I", "SH"):
+            need(3)
+            return [encode(op, R(a[0]), R(a[1]), imm=ev(a[2]))]
+        if fmt == "B":
+            need(3)
+            return [encode(op, rs1=R(a[0]), rs2=R(a[1]), imm=rel(a[2]))]
+        if fmt == "U":
+            need(2)
+            return [encode(op, R(a[0]), imm=ev(a[1]))]
+        return [encode(op)]
+
+
+# ===========================================================================
+# API
+# ===========================================================================
+
+def assemble_text(text: str, source: str = "<fonte>", text_base: int = 0, data_base: int = None):
+    """Fonte -> (texto, dados, base_dos_dados)."""
+    asm = Assembler(text_base, data_base)
+    asm.parse(text, source)
+    return asm.assemble()
+
+
+def image_words(text: bytes, data: bytes, data_base, text_base: int = 0) -> list:
+    """Imagem única (texto + dados contíguos), como objcopy -O binary, em palavras."""
+    blob = bytes(text)
+    if data:
+        blob = blob.ljust(data_base - text_base, b"\0") + data
+    blob = blob.ljust((len(blob) + 3) & ~3, b"\0")
+    return [int.from_bytes(blob[i:i + 4], "little") for i in range(0, len(blob), 4)]
+
+
+def hex_text(words) -> str:
+    return "".join(f"{w:08X}\n" for w in words)
+
+
+def cache_key(source: bytes, text_base: int, data_base) -> str:
+    h = hashlib.sha256()
+    h.update(f"rvasm:{VERSION}:{text_base}:{data_base}\n".encode())
+    h.update(source)
+    return h.hexdigest()
+
+
+def assemble_file(path, text_base: int = 0, cache_dir: Path = CACHE_DIR) -> Path:
+    """
+    Monta 'path' (.S) para um .hex no cache (sim_build/_cache/asm/<nome>-<hash>.hex)
+    e devolve o caminho. Se o hash do fonte não mudou o arquivo já existente é usado.
+    """
+    path = Path(path)
+    src = path.read_bytes()
+    out = Path(cache_dir) / f"{path.stem}-{cache_key(src, text_base, None)[:16]}.hex"
+    if out.exists():
+        return out
+    text, data, data_base = assemble_text(src.decode(), str(path), text_base)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(hex_text(image_words(text, data, data_base, text_base)))
+    tmp.replace(out)
+    return out
+
+
+def listing(text: bytes, base: int = 0) -> str:
+    return "".join(f"{base + i:08x}: {int.from_bytes(text[i:i + 4], 'little'):08x}\n"
+                   for i in range(0, len(text), 4))
+
+
+def main():
+    p = argparse.ArgumentParser(description="Montador RV32IM em Python (.S -> .hex do ROM_simulation)")
+    p.add_argument("source", help="Arquivo .S")
+    p.add_argument("-o", "--output", metavar="ARQ", help="Grava o .hex (uma palavra por linha)")
+    p.add_argument("--bin", metavar="ARQ", help="Grava também a imagem binária little-endian")
+    p.add_argument("--text-base", type=lambda s: int(s, 0), default=0)
+    p.add_argument("--data-base", type=lambda s: int(s, 0), default=None,
+                   help="Endereço dos dados; com ele os dados vão para <saída>_data.hex em vez de seguir o .text")
+    p.add_argument("--listing", metavar="ARQ", help="Endereço + palavra de cada instrução ('-' = stdout)")
+    p.add_argument("--no-cache", action="store_true", help="Monta sempre (ignora sim_build/_cache/asm)")
+    args = p.parse_args()
+
+    src = Path(args.source)
+    if not src.is_file():
+        print(f"Erro: arquivo '{src}' não encontrado", file=sys.stderr)
+        sys.exit(2)
+
+    try:
+        if args.output and args.data_base is None and not (args.bin or args.listing or args.no_cache):
+            cached = assemble_file(src, args.text_base)
+            Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+            Path(args.output).write_bytes(cached.read_bytes())
+            print(f"Gerado: {args.output} (cache {cached.name})")
+            return
+        text, data, data_base = assemble_text(src.read_text(), str(src), args.text_base, args.data_base)
+    except AsmError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.data_base is not None:
+        words = image_words(text, b"", None, args.text_base)
+        data_words = image_words(data, b"", None) if data else []
+    else:
+        words = image_words(text, data, data_base, args.text_base)
+        data_words = []
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(hex_text(words))
+        print(f"Gerado: {args.output} ({len(words)} palavras)")
+        if data_words:
+            data_out = Path(args.output).with_name(Path(args.output).stem + "_data.hex")
+            data_out.write_text(hex_text(data_words))
+            print(f"Gerado: {data_out} ({len(data_words)} palavras, base 0x{data_base:08X})")
+    if args.bin:
+        Path(args.bin).write_bytes(b"".join(w.to_bytes(4, "little") for w in words))
+    if args.listing:
+        lst = listing(text, args.text_base)
+        if args.listing == "-":
+            sys.stdout.write(lst)
+        else:
+            Path(args.listing).write_text(lst)
+
+
+if __name__ == "__main__":
+    main()
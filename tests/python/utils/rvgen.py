@@ -0,0 +1,439 @@
+"""
+rvgen.py — gerador de programas RV32IM aleatórios com restrições, para regressões longas.
+
+Cada semente gera um programa válido que cabe na ROM_simulation (512 palavras) e
+só usa uma janela limitada da RAM_simulation. A densidade de hazards é controlada:
+  --raw        probabilidade de um operando ler o rd da instrução anterior
+  --load-use   probabilidade de um load ser seguido imediatamente por um uso do rd
+  --branch     peso de blocos de desvio (saltos para frente e laços curtos com contador)
+  --muldiv     peso de cadeias de instruções M dependentes (até --mul-chain)
+  --mem        peso de loads/stores na janela [--mem-base, --mem-base + --mem-bytes)
+
+Papel fixo dos registradores: x28 acumulador da assinatura, x29 contador de laço,
+x30 base da janela de memória, x31 temporário (divisor não nulo, constantes).
+
+Auto-verificação: no fim o programa faz o XOR de x1..x29 e das palavras da janela
+em x28, compara com o valor previsto pelo ISS (embutido no próprio programa) e
+grava PASS_MAGIC ou FAIL_MAGIC em RESULT_ADDR antes de parar em 'j .'. As suítes de
+--tests-json usam o testbench unittests/instructions/random_program.py, que lê essa
+palavra pelo backdoor da RAM. O modelo padrão (suíte cosim) é o rv32i3stage_core;
+o rv32im_pipeline_core ainda não tem MEM/WB e não passa nesses programas.
+
+Para cada programa são gravados NOME.S (listagem legível), NOME.hex (formato do
+ROM_FILE) e NOME.json (bytes escritos na RAM, formato de asm_tests/*.json).
+
+Uso:
+  python3 -m tests.python.utils.rvgen --seed 1000 --count 200 --out tests/python/sim_build/random \\
+      --tests-json tests/python/sim_build/random/tests.json
+  python3 tests/python/runner.py all --tests tests/python/sim_build/random/tests.json -j 0
+"""
+import sys
+import copy
+import json
+import random
+import argparse
+from pathlib import Path
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+    from tests.python.utils.encoding import (encode, split_li, INSTRUCTIONS, LOADS, STORES, BRANCHES,
+                                             ALU_RR, ALU_RI, SHIFTS_I, MULDIV)
+    from tests.python.utils.rv32im_iss import RAM, RV32IM
+else:
+    from .encoding import (encode, split_li, INSTRUCTIONS, LOADS, STORES, BRANCHES,
+                           ALU_RR, ALU_RI, SHIFTS_I, MULDIV)
+    from .rv32im_iss import RAM, RV32IM
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+TESTS_JSON = REPO_ROOT / "tests" / "python" / "tests.json"
+TEST_MODULE = "tests.python.unittests.instructions.random_program"
+
+ROM_WORDS = 512             # ROM_simulation: memoryAddrWidth = 9
+RAM_WORDS = 512             # RAM_simulation: memoryAddrWidth = 9
+RESULT_ADDR = 0x7FC         # última palavra da RAM
+PASS_MAGIC = 0x600DC0DE
+FAIL_MAGIC = 0x0BADC0DE
+
+ACC, LOOP, BASE, TMP = 28, 29, 30, 31
+POOL = tuple(range(1, 28))
+WIDTH = {"lb": 1, "lbu": 1, "sb": 1, "lh": 2, "lhu": 2, "sh": 2, "lw": 4, "sw": 4}
+
+
+class GenerationError(Exception):
+    pass
+
+
+class GenConfig:
+    def __init__(self, length=200, raw=0.5, load_use=0.3, branch=0.15, muldiv=0.15, mem=0.25,
+                 mul_chain=4, loop_iters=(2, 6), mem_base=0x400, mem_bytes=128):
+        self.length = length
+        self.raw = raw
+        self.load_use = load_use
+        self.branch = branch
+        self.muldiv = muldiv
+        self.mem = mem
+        self.mul_chain = mul_chain
+        self.loop_iters = loop_iters
+        self.mem_base = mem_base
+        self.mem_bytes = mem_bytes
+        self.validate()
+
+    def validate(self):
+        for name in ("raw", "load_use"):
+            if not 0.0 <= getattr(self, name) <= 1.0:
+                raise GenerationError(f"{name} deve estar em [0, 1]")
+        if min(self.branch, self.muldiv, self.mem) < 0:
+            raise GenerationError("pesos não podem ser negativos")
+        if self.mem_bytes <= 0 or self.mem_bytes % 4 or self.mem_base % 4:
+            raise GenerationError("janela de memória deve ser alinhada e múltipla de 4 bytes")
+        if self.mem_base + self.mem_bytes > RESULT_ADDR:
+            raise GenerationError(f"janela de memória invade RESULT_ADDR (0x{RESULT_ADDR:X})")
+        if self.mem_bytes > 2047:
+            raise GenerationError("janela de memória maior que o imediato de 12 bits")
+        lo, hi = self.loop_iters
+        if not 1 <= lo <= hi <= 2047:
+            raise GenerationError("loop_iters inválido")
+
+    def to_dict(self):
+        return dict(vars(self), loop_iters=list(self.loop_iters))
+
+
+# ===========================================================================
+# Programa (instruções + rótulos) e montagem
+# ===========================================================================
+
+class Program:
+    def __init__(self):
+        self.items = []         # ("insn", mn, rd, rs1, rs2, imm, label_alvo) | ("label", nome)
+        self._next_label = 0
+
+    def new_label(self, prefix="L") -> str:
+        self._next_label += 1
+        return f"{prefix}{self._next_label}"
+
+    def label(self, name):
+        self.items.append(("label", name))
+
+    def insn(self, mn, rd=0, rs1=0, rs2=0, imm=0, target=None):
+        self.items.append(("insn", mn, rd, rs1, rs2, imm, target))
+
+    def li(self, rd, value):
+        """lui + addi (sempre duas instruções, para o tamanho não depender do valor)."""
+        hi, lo = split_li(value)
+        self.insn("lui", rd, imm=hi)
+        self.insn("addi", rd, rd, imm=lo)
+
+    def __len__(self):
+        return sum(1 for it in self.items if it[0] == "insn")
+
+    def assemble(self) -> list:
+        labels, pc = {}, 0
+        for it in self.items:
+            if it[0] == "label":
+                labels[it[1]] = pc
+            else:
+                pc += 4
+        words, pc = [], 0
+        for it in self.items:
+            if it[0] == "label":
+                continue
+            _, mn, rd, rs1, rs2, imm, target = it
+            if target is not None:
+                imm = labels[target] - pc
+            words.append(encode(mn, rd, rs1, rs2, imm))
+            pc += 4
+        return words
+
+    def listing(self, header=()) -> str:
+        out = [f"# {line}" for line in header]
+        out += ["    .section .text", "    .globl _start", "", "_start:"]
+        for it in self.items:
+            if it[0] == "label":
+                out.append(f"{it[1]}:")
+                continue
+            _, mn, rd, rs1, rs2, imm, target = it
+            fmt = INSTRUCTIONS[mn][0]
+            if target is not None:
+                ops = f"x{rs1}, x{rs2}, {target}" if fmt == "B" else f"x{rd}, {target}"
+            elif mn in LOADS or mn == "jalr":
+                ops = f"x{rd}, {imm}(x{rs1})"
+            elif fmt == "S":
+                ops = f"x{rs2}, {imm}(x{rs1})"
+            elif fmt == "R":
+                ops = f"x{rd}, x{rs1}, x{rs2}"
+            elif fmt in ("I", "SH"):
+                ops = f"x{rd}, x{rs1}, {imm}"
+            elif fmt == "U":
+                ops = f"x{rd}, 0x{imm:X}"
+            else:
+                ops = ""
+            out.append(f"    {mn:<7}{ops}".rstrip())
+        return "\n".join(out) + "\n"
+
+
+# ===========================================================================
+# Gerador
+# ===========================================================================
+
+class RandomProgram:
+    def __init__(self, cfg: GenConfig, seed: int):
+        self.cfg = cfg
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.p = Program()
+        self.last_rd = None
+
+    # -- escolha de operandos ------------------------------------------------
+    def src(self) -> int:
+        if self.last_rd is not None and self.rng.random() < self.cfg.raw:
+            return self.last_rd
+        return self.rng.choice(POOL)
+
+    def dst(self) -> int:
+        rd = self.rng.choice(POOL)
+        self.last_rd = rd
+        return rd
+
+    # -- blocos ----------------------------------------------------------------
+    def alu(self, rs1=None):
+        r = self.rng
+        kind = r.random()
+        rs1 = self.src() if rs1 is None else rs1
+        if kind < 0.45:
+            rs2 = self.src()
+            self.p.insn(r.choice(ALU_RR), self.dst(), rs1, rs2)
+        elif kind < 0.85:
+            self.p.insn(r.choice(ALU_RI), self.dst(), rs1, imm=r.randint(-2048, 2047))
+        elif kind < 0.95:
+            self.p.insn(r.choice(SHIFTS_I), self.dst(), rs1, imm=r.randint(0, 31))
+        else:
+            self.p.insn("lui", self.dst(), imm=r.randint(0, 0xFFFFF))
+
+    def mem(self):
+        r = self.rng
+        if r.random() < 0.5:
+            mn = r.choice(STORES)
+            off = r.randrange(0, self.cfg.mem_bytes, WIDTH[mn])
+            self.p.insn(mn, rs1=BASE, rs2=self.src(), imm=off)
+            return
+        mn = r.choice(LOADS)
+        off = r.randrange(0, self.cfg.mem_bytes, WIDTH[mn])
+        rd = self.dst()
+        self.p.insn(mn, rd, BASE, imm=off)
+        if r.random() < self.cfg.load_use:
+            self.alu(rs1=rd)
+
+    def muldiv_chain(self):
+        r = self.rng
+        prev = None
+        for _ in range(r.randint(1, self.cfg.mul_chain)):
+            mn = r.choice(MULDIV)
+            rs1 = prev if prev is not None else self.src()
+            rs2 = self.src()
+            if mn in ("div", "divu", "rem", "remu"):
+                # divisor nunca nulo: o resultado de divisão por zero não é o foco aqui
+                self.p.insn("ori", TMP, rs2, imm=1)
+                rs2 = TMP
+            prev = self.dst()
+            self.p.insn(mn, prev, rs1, rs2)
+
+    def forward_branch(self):
+        r = self.rng
+        skip = self.p.new_label("Lskip")
+        if r.random() < 0.2:
+            self.p.insn("jal", 0, target=skip)
+        else:
+            self.p.insn(r.choice(BRANCHES), rs1=self.src(), rs2=self.src(), target=skip)
+        for _ in range(r.randint(1, 3)):
+            self.alu()
+        self.p.label(skip)
+
+    def loop(self):
+        r = self.rng
+        top = self.p.new_label("Lloop")
+        self.p.insn("addi", LOOP, 0, imm=r.randint(*self.cfg.loop_iters))
+        self.p.label(top)
+        for _ in range(r.randint(2, 6)):
+            self.step(allow_branch=False)
+        self.p.insn("addi", LOOP, LOOP, imm=-1)
+        self.p.insn("bne", rs1=LOOP, rs2=0, target=top)
+
+    def step(self, allow_branch=True):
+        c = self.cfg
+        weights = [1.0, c.mem, c.muldiv, c.branch if allow_branch else 0.0]
+        kind = self.rng.choices(("alu", "mem", "muldiv", "branch"), weights)[0]
+        if kind == "alu":
+            self.alu()
+        elif kind == "mem":
+            self.mem()
+        elif kind == "muldiv":
+            self.muldiv_chain()
+        elif self.rng.random() < 0.5:
+            self.forward_branch()
+        else:
+            self.loop()
+
+    # -- programa completo -------------------------------------------------------
+    def build(self, expected: int = 0) -> Program:
+        self.rng.seed(self.seed)
+        self.p = Program()
+        self.last_rd = None
+        p = self.p
+
+        p.li(BASE, self.cfg.mem_base)
+        for reg in POOL:
+            v = self.rng.choice((self.rng.getrandbits(32), self.rng.randint(-16, 16), 0x80000000, 0xFFFFFFFF))
+            p.li(reg, v)
+
+        body_start = len(p)
+        while len(p) - body_start < self.cfg.length:
+            self.step()
+
+        # assinatura
+        p.insn("addi", ACC, 0, imm=0)
+        for reg in POOL + (LOOP,):
+            p.insn("xor", ACC, ACC, reg)
+        for off in range(0, self.cfg.mem_bytes, 4):
+            p.insn("lw", TMP, BASE, imm=off)
+            p.insn("xor", ACC, ACC, TMP)
+
+        fail, done = p.new_label("Lfail"), p.new_label("Ldone")
+        p.li(TMP, expected)
+        p.insn("bne", rs1=ACC, rs2=TMP, target=fail)
+        p.li(TMP, PASS_MAGIC)
+        p.insn("sw", rs1=0, rs2=TMP, imm=RESULT_ADDR)
+        p.insn("jal", 0, target=done)
+        p.label(fail)
+        p.li(TMP, FAIL_MAGIC)
+        p.insn("sw", rs1=0, rs2=TMP, imm=RESULT_ADDR)
+        p.label(done)
+        p.insn("jal", 0, target=done)
+        return p
+
+
+def _run(words, max_steps):
+    cpu = RV32IM(words, RAM(RAM_WORDS))
+    cpu.run(max_steps)
+    if cpu.halted != "self-loop":
+        raise GenerationError(f"programa não terminou em 'j .' ({cpu.halted or 'max-steps'})")
+    return cpu
+
+
+class Generated:
+    def __init__(self, name, seed, program, words, golden, signature, steps):
+        self.name = name
+        self.seed = seed
+        self.program = program
+        self.words = words
+        self.golden = golden        # {endereço: byte} escrito na RAM
+        self.signature = signature
+        self.steps = steps
+
+
+def generate(seed: int, cfg: GenConfig = None, max_steps: int = 1_000_000) -> Generated:
+    """
+    Gera o programa da semente 'seed'. Duas montagens: a primeira (assinatura 0)
+    roda no ISS para obter o valor final de x28; a segunda embute esse valor.
+    """
+    cfg = cfg or GenConfig()
+    gen = RandomProgram(cfg, seed)
+    words = gen.build(0).assemble()
+    if len(words) > ROM_WORDS:
+        raise GenerationError(f"semente {seed}: {len(words)} palavras não cabem na ROM ({ROM_WORDS}); "
+                              f"reduza --length ou --mem-bytes")
+    signature = _run(words, max_steps).x[ACC]
+
+    program = gen.build(signature)
+    words = program.assemble()
+    cpu = _run(words, max_steps)
+    if cpu.ram.read_word(RESULT_ADDR) != PASS_MAGIC:
+        raise GenerationError(f"semente {seed}: auto-verificação falhou no próprio ISS")
+    return Generated(f"rand_{seed}", seed, program, words, cpu.ram.written_bytes(), signature, cpu.retired)
+
+
+def write_outputs(g: Generated, out_dir: Path, cfg: GenConfig) -> Path:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    header = [f"{g.name}: gerado por tests/python/utils/rvgen.py (semente {g.seed})",
+              f"assinatura esperada em x28: 0x{g.signature:08X}; "
+              f"resultado em 0x{RESULT_ADDR:X} (PASS=0x{PASS_MAGIC:08X})",
+              f"{len(g.words)} palavras, {g.steps} instruções executadas"]
+    (out_dir / f"{g.name}.S").write_text(g.program.listing(header))
+    hex_path = out_dir / f"{g.name}.hex"
+    hex_path.write_text("".join(f"{w:08X}\n" for w in g.words))
+    golden = {f"0x{a:08x}": v for a, v in sorted(g.golden.items())}
+    (out_dir / f"{g.name}.json").write_text(json.dumps(golden, indent=2) + "\n")
+    return hex_path
+
+
+def suite_entries(hex_paths, template: str = "cosim", tests_json: Path = TESTS_JSON,
+                  test_module: str = TEST_MODULE) -> dict:
+    """
+    Suítes no formato de tests.json, uma por programa: fontes e toplevel de
+    'template', testbench 'test_module' (espera PASS_MAGIC em RESULT_ADDR).
+    """
+    base = json.loads(Path(tests_json).read_text())[template]
+    out = {}
+    for path in hex_paths:
+        path = Path(path).resolve()
+        entry = copy.deepcopy(base)
+        try:
+            rom = str(path.relative_to(REPO_ROOT))
+        except ValueError:
+            rom = str(path)
+        entry.setdefault("parameters", {})["ROM_FILE"] = rom
+        entry["test_module"] = test_module
+        entry["test_dir"] = f"random/{path.stem}"
+        out[path.stem] = entry
+    return out
+
+
+def main():
+    p = argparse.ArgumentParser(description="Gerador de programas RV32IM aleatórios (ROM_FILE .hex) auto-verificáveis")
+    p.add_argument("--seed", type=int, default=1, help="Primeira semente")
+    p.add_argument("--count", type=int, default=1, help="Quantidade de programas (sementes consecutivas)")
+    p.add_argument("--out", default=str(REPO_ROOT / "tests/python/sim_build/random"), help="Diretório de saída")
+    p.add_argument("--length", type=int, default=200, help="Instruções (estáticas) no corpo do programa")
+    p.add_argument("--raw", type=float, default=0.5)
+    p.add_argument("--load-use", type=float, default=0.3)
+    p.add_argument("--branch", type=float, default=0.15)
+    p.add_argument("--muldiv", type=float, default=0.15)
+    p.add_argument("--mem", type=float, default=0.25)
+    p.add_argument("--mul-chain", type=int, default=4, help="Tamanho máximo das cadeias de instruções M")
+    p.add_argument("--loop-iters", default="2:6", metavar="MIN:MAX", help="Iterações dos laços gerados")
+    p.add_argument("--mem-base", type=lambda s: int(s, 0), default=0x400)
+    p.add_argument("--mem-bytes", type=lambda s: int(s, 0), default=128)
+    p.add_argument("--tests-json", metavar="ARQ",
+                   help="Grava suítes (formato tests.json) para runner.py --tests")
+    p.add_argument("--template", default="cosim",
+                   help="Suíte de tests.json cujas fontes e toplevel são copiadas (precisa de um core "
+                        "com MEM/WB: o rv32im_pipeline_core nunca grava RESULT_ADDR)")
+    p.add_argument("--test-module", default=TEST_MODULE, help="Testbench das suítes geradas")
+    args = p.parse_args()
+
+    try:
+        lo, hi = (int(v) for v in args.loop_iters.split(":"))
+        cfg = GenConfig(args.length, args.raw, args.load_use, args.branch, args.muldiv, args.mem,
+                        args.mul_chain, (lo, hi), args.mem_base, args.mem_bytes)
+    except (ValueError, GenerationError) as e:
+        p.error(str(e))
+
+    out_dir = Path(args.out)
+    hex_paths = []
+    for seed in range(args.seed, args.seed + args.count):
+        try:
+            g = generate(seed, cfg)
+        except GenerationError as e:
+            print(f"Erro: {e}", file=sys.stderr)
+            sys.exit(2)
+        hex_paths.append(write_outputs(g, out_dir, cfg))
+    print(f"{len(hex_paths)} programa(s) em {out_dir}")
+
+    if args.tests_json:
+        suites = suite_entries(hex_paths, args.template, test_module=args.test_module)
+        Path(args.tests_json).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.tests_json).write_text(json.dumps(suites, indent=2) + "\n")
+        print(f"Suítes gravadas em {args.tests_json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+sim_profile.py — perfil do lado Python de um testbench cocotb (runner.py --profile).
+
+O runner acrescenta este módulo ao MODULE do cocotb; ao ser importado dentro do
+simulador ele instala os ganchos (só se SIM_PROFILE_DIR estiver definido):
+  - tempo Python x simulador: cada entrada do GPI no scheduler (Scheduler._react)
+    é cronometrada; o resto do tempo de parede do teste ficou no simulador
+  - disparos de trigger por tipo (Timer, RisingEdge, ReadOnly, ...)
+  - leituras (.value) e escritas (.value = / setimmediatevalue) de sinais pelo VPI,
+    no total e por sinal
+  - modo 'cprofile': cProfile ligado durante todo o teste, salvo por teste em
+    <teste>.pstat e em <teste>.folded (pilhas colapsadas, para flamegraph.pl/speedscope)
+
+Saída em SIM_PROFILE_DIR (sim_build/<grupo>/<nome>/profile/): profile.json com os
+números de cada teste, mais os .pstat/.folded.
+
+Uso fora do simulador:
+  python3 -m tests.python.utils.sim_profile tests/python/sim_build/instructions/five/profile
+  python3 -m tests.python.utils.sim_profile .../profile --pstat test_branches --top 30
+"""
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import argparse
+from collections import Counter
+from pathlib import Path
+
+MODES = ("counts", "cprofile")
+MODULE = __name__ if __name__ != "__main__" else "tests.python.utils.sim_profile"
+TOP_SIGNALS = 20
+
+
+# ===========================================================================
+# Pilhas colapsadas a partir do cProfile
+# ===========================================================================
+
+def _label(func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name.strip("<>").replace(" ", "_") or "builtin"
+    return f"{Path(filename).stem}:{name}:{line}"
+
+
+def folded_stacks(stats: pstats.Stats, min_us: float = 1.0, max_depth: int = 64) -> dict:
+    """
+    Converte um pstats em pilhas colapsadas {"a;b;c": microssegundos}.
+    O cProfile só guarda arestas chamador->chamado, então o tempo de cada função
+    é repartido entre os filhos na proporção do tempo acumulado de cada aresta.
+    """
+    raw = stats.stats
+    children = {}
+    for callee, (_, _, _, _, callers) in raw.items():
+        for caller, (_, _, _, edge_ct) in callers.items():
+            children.setdefault(caller, []).append((callee, edge_ct))
+    roots = [f for f, v in raw.items() if not v[4]]
+
+    out = Counter()
+
+    def walk(func, path, weight):
+        cc, nc, tt, ct, _ = raw[func]
+        if ct <= 0 or weight * 1e6 < min_us:
+            return
+        path = path + [_label(func)]
+        self_us = weight * (tt / ct) * 1e6
+        if self_us >= min_us:
+            out[";".join(path)] += self_us
+        if len(path) >= max_depth:
+            return
+        for callee, edge_ct in children.get(func, ()):
+            if callee in stack or callee not in raw:
+                continue
+            stack.add(callee)
+            walk(callee, path, weight * edge_ct / ct)
+            stack.discard(callee)
+
+    for root in roots:
+        stack = {root}
+        walk(root, [], raw[root][3])
+    return dict(out)
+
+
+def write_folded(stacks: dict, path: Path, extra: dict = None):
+    lines = [f"{k} {int(round(v))}" for k, v in sorted(stacks.items()) if round(v) > 0]
+    for k, v in (extra or {}).items():
+        if round(v) > 0:
+            lines.append(f"{k} {int(round(v))}")
+    path.write_text("\n".join(lines) + "\n")
+
+
+# ===========================================================================
+# Ganchos dentro do simulador
+# ===========================================================================
+
+class _Hooks:
+    def __init__(self, out_dir: Path, mode: str):
+        self.out_dir = out_dir
+        self.mode = mode
+        self.tests = []
+        self.profiler = None
+        self._reset()
+
+    def _reset(self):
+        self.python_s = 0.0
+        self.reacts = 0
+        self.triggers = Counter()
+        self.reads = Counter()
+        self.writes = Counter()
+        self.start = time.perf_counter()
+        if self.mode == "cprofile":
+            if self.profiler is not None:
+                self.profiler.disable()
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def install(self):
+        import cocotb.handle as handle
+        from cocotb.scheduler import Scheduler
+        from cocotb.regression import RegressionManager
+        hooks = self
+
+        orig_react = Scheduler._react
+
+        def _react(sched, trigger):
+            if sched._is_reacting:
+                return orig_react(sched, trigger)
+            hooks.reacts += 1
+            hooks.triggers[type(trigger).__name__] += 1
+            t0 = time.perf_counter()
+            try:
+                return orig_react(sched, trigger)
+            finally:
+                hooks.python_s += time.perf_counter() - t0
+
+        Scheduler._react = _react
+
+        leaf_classes = [getattr(handle, n) for n in ("ConstantObject", "ModifiableObject", "RealObject",
+                                                      "EnumObject", "IntegerObject", "StringObject")
+                        if hasattr(handle, n)]
+        for cls in leaf_classes:
+            prop = cls.__dict__.get("value")
+            if isinstance(prop, property) and prop.fget is not None:
+                def fget(h, _get=prop.fget):
+                    hooks.reads[h._path] += 1
+                    return _get(h)
+                cls.value = property(fget, prop.fset, prop.fdel, prop.__doc__)
+            set_value = cls.__dict__.get("_set_value")
+            if set_value is not None:
+                def _set_value(h, value, call_sim, _set=set_value):
+                    hooks.writes[h._path] += 1
+                    return _set(h, value, call_sim)
+                cls._set_value = _set_value
+
+        orig_record = RegressionManager._record_result
+
+        def _record_result(manager, test, outcome, wall_time_s, sim_time_ns):
+            hooks.finish_test(test.__qualname__, wall_time_s, sim_time_ns)
+            return orig_record(manager, test, outcome, wall_time_s, sim_time_ns)
+
+        RegressionManager._record_result = _record_result
+
+    def finish_test(self, name: str, wall_s: float, sim_ns: float):
+        if self.profiler is not None:
+            self.profiler.disable()
+        wall_s = wall_s or (time.perf_counter() - self.start)
+        python_s = min(self.python_s, wall_s)
+        entry = {
+            "test": name,
+            "wall_s": round(wall_s, 6),
+            "python_s": round(python_s, 6),
+            "simulator_s": round(wall_s - python_s, 6),
+            "python_pct": round(100 * python_s / wall_s, 1) if wall_s else None,
+            "sim_time_ns": sim_ns,
+            "gpi_callbacks": self.reacts,
+            "triggers": dict(self.triggers.most_common()),
+            "signal_reads": sum(self.reads.values()),
+            "signal_writes": sum(self.writes.values()),
+            "top_reads": dict(self.reads.most_common(TOP_SIGNALS)),
+            "top_writes": dict(self.writes.most_common(TOP_SIGNALS)),
+        }
+        if self.profiler is not None:
+            stem = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+            self.profiler.create_stats()
+            stats = pstats.Stats(self.profiler)
+            stats.dump_stats(self.out_dir / f"{stem}.pstat")
+            write_folded(folded_stacks(stats), self.out_dir / f"{stem}.folded",
+                         {"[simulador]": entry["simulator_s"] * 1e6})
+            entry["pstat"] = f"{stem}.pstat"
+            entry["folded"] = f"{stem}.folded"
+        self.tests.append(entry)
+        (self.out_dir / "profile.json").write_text(
+            json.dumps({"mode": self.mode, "tests": self.tests}, indent=2) + "\n")
+        self._reset()
+
+
+def _install_from_env():
+    out = os.environ.get("SIM_PROFILE_DIR")
+    if not out:
+        return None
+    mode = os.environ.get("SIM_PROFILE", "cprofile")
+    out_dir = Path(out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    hooks = _Hooks(out_dir, mode if mode in MODES else "cprofile")
+    hooks.install()
+    return hooks
+
+
+if __name__ != "__main__":
+    _HOOKS = _install_from_env()
+
+
+# ===========================================================================
+# Relatório
+# ===========================================================================
+
+def load(path) -> dict:
+    path = Path(path)
+    if path.is_dir():
+        path = path / "profile.json"
+    return json.loads(path.read_text())
+
+
+def print_report(data: dict, signals: int = 5):
+    print(f"\nPerfil do testbench (modo {data['mode']}):")
+    print(f"  {'teste':<30}{'parede s':>10}{'Python s':>10}{'sim s':>9}{'Py %':>7}"
+          f"{'callbacks':>11}{'leituras':>10}{'escritas':>10}")
+    for t in data["tests"]:
+        pct = f"{t['python_pct']:.1f}" if t["python_pct"] is not None else "-"
+        print(f"  {t['test']:<30}{t['wall_s']:>10.3f}{t['python_s']:>10.3f}{t['simulator_s']:>9.3f}"
+              f"{pct:>7}{t['gpi_callbacks']:>11}{t['signal_reads']:>10}{t['signal_writes']:>10}")
+    for t in data["tests"]:
+        trig = ", ".join(f"{k}={v}" for k, v in t["triggers"].items())
+        print(f"\n  {t['test']}: triggers {trig or '-'}")
+        for what in ("top_reads", "top_writes"):
+            top = list(t[what].items())[:signals]
+            if top:
+                print(f"    {'lidos' if what == 'top_reads' else 'escritos'}: "
+                      + ", ".join(f"{k.split('.', 1)[-1]}={v}" for k, v in top))
+        if t.get("folded"):
+            print(f"    flamegraph: {t['folded']}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Relatório do perfil gerado por runner.py --profile")
+    p.add_argument("path", help="Diretório profile/ (ou o profile.json)")
+    p.add_argument("--signals", type=int, default=5, help="Sinais mais acessados por teste")
+    p.add_argument("--pstat", metavar="TESTE", help="Mostra as funções mais caras do .pstat de um teste")
+    p.add_argument("--top", type=int, default=25)
+    args = p.parse_args()
+
+    try:
+        data = load(args.path)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        sys.exit(2)
+    print_report(data, args.signals)
+    if args.pstat:
+        base = Path(args.path) if Path(args.path).is_dir() else Path(args.path).parent
+        entry = next((t for t in data["tests"] if t["test"] == args.pstat and t.get("pstat")), None)
+        if entry is None:
+            print(f"Erro: sem .pstat para o teste '{args.pstat}'", file=sys.stderr)
+            sys.exit(2)
+        print()
+        pstats.Stats(str(base / entry["pstat"])).sort_stats("tottime").print_stats(args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Opções de waveform para o runner (GHDL).
+
+- formato: none | ghw | vcd
+- filtro de escopo: padrões no estilo cocotb (dut.core.*) ou GHDL (/top/core/*),
+  convertidos para um arquivo --read-wave-opt
+- janela de tempo: o GHDL não liga/desliga o dump durante a simulação, então a
+  janela é aplicada ao VCD logo após a execução (trim em streaming)
+"""
+import re
+from pathlib import Path
+
+WAVE_FORMATS = ("none", "ghw", "vcd")
+
+_TIME_UNITS = {"fs": 1, "ps": 10**3, "ns": 10**6, "us": 10**9, "ms": 10**12, "sec": 10**15, "s": 10**15}
+
+
+def parse_time(text: str) -> int:
+    """'100ns' -> 100_000_000 (em fs)."""
+    m = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*(fs|ps|ns|us|ms|sec|s)\s*", text)
+    if not m:
+        raise ValueError(f"Tempo inválido: '{text}' (use ex.: 250ns, 10us)")
+    return int(float(m.group(1)) * _TIME_UNITS[m.group(2)])
+
+
+def parse_window(text: str) -> tuple:
+    """'START:END' -> (start_fs, end_fs); qualquer lado pode ficar vazio."""
+    if ":" not in text:
+        raise ValueError(f"Janela inválida: '{text}' (use START:END, ex.: 1us:5us)")
+    a, b = text.split(":", 1)
+    start = parse_time(a) if a.strip() else 0
+    end = parse_time(b) if b.strip() else None
+    if end is not None and end < start:
+        raise ValueError(f"Janela inválida: fim antes do início em '{text}'")
+    return start, end
+
+
+def scope_to_ghdl(pattern: str, toplevel: str) -> str:
+    """dut.core.* -> /<toplevel>/core/*  (padrões já no formato GHDL passam direto)."""
+    if pattern.startswith("/"):
+        return pattern
+    parts = pattern.split(".")
+    if parts[0] == "dut":
+        parts[0] = toplevel
+    else:
+        parts.insert(0, toplevel)
+    return "/" + "/".join(parts)
+
+
+def write_wave_opt(path: Path, scopes: list, toplevel: str) -> Path:
+    lines = ["$ version 1.1"] + [scope_to_ghdl(s, toplevel) for s in scopes]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def wave_plusargs(fmt: str, test_dir: Path, toplevel: str, scopes: list = None) -> tuple:
+    """Retorna (plusargs para ghdl -r, caminho do arquivo de ondas ou None)."""
+    if fmt == "none":
+        return [], None
+    if fmt not in WAVE_FORMATS:
+        raise ValueError(f"Formato de waveform desconhecido: {fmt}")
+
+    wave_file = test_dir / f"waves.{fmt}"
+    plusargs = [f"--wave={wave_file}" if fmt == "ghw" else f"--vcd={wave_file}"]
+    if scopes:
+        opt = write_wave_opt(test_dir / "waves.opt", scopes, toplevel)
+        plusargs.append(f"--read-wave-opt={opt}")
+    return plusargs, wave_file
+
+
+def trim_vcd(path: Path, start: int, end: int = None):
+    """
+    Recorta um VCD para [start, end] (fs) sem carregar o arquivo em memória.
+    O estado dos sinais em 'start' é emitido num bloco $dumpvars.
+    """
+    path = Path(path)
+    tmp = path.with_suffix(".vcd.tmp")
+    scale = 1
+    state = {}
+    emitted_start = False
+
+    with open(path) as src, open(tmp, "w") as dst:
+        header = []
+        for line in src:
+            header.append(line)
+            if "$enddefinitions" in line:
+                break
+        # $timescale pode vir numa linha só ou quebrado em várias
+        m = re.search(r"\$timescale\s*(\d+)\s*(fs|ps|ns|us|ms|s)\b", "".join(header))
+        if m:
+            scale = int(m.group(1)) * _TIME_UNITS[m.group(2)]
+        dst.writelines(header)
+
+        t = 0
+        for line in src:
+            s = line.strip()
+            if s.startswith("#"):
+                t = int(s[1:]) * scale
+                if end is not None and t > end:
+                    break
+                if t >= start and not emitted_start:
+                    dst.write(f"#{start // scale}\n$dumpvars\n")
+                    for ident, value in state.items():
+                        dst.write(f"{value}{ident}\n")
+                    dst.write("$end\n")
+                    emitted_start = True
+                    if t == start:
+                        continue
+                if emitted_start:
+                    dst.write(line)
+                continue
+            if not s or s.startswith("$"):
+                if emitted_start and s:
+                    dst.write(line)
+                continue
+            if emitted_start:
+                dst.write(line)
+                continue
+            # antes da janela: só guarda o último valor de cada sinal
+            if s[0] in "bBrR":
+                value, ident = s.split(None, 1)
+                state[ident] = value + " "
+            else:
+                state[s[1:]] = s[0]
+
+    tmp.replace(path)